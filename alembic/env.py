@@ -9,7 +9,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 
 from app.database import Base
-from app.models import Respondent, Study, ScreenerCriteria, StudyAssignment
+from app.models import Respondent, Study, ScreenerCriteria, StudyAssignment, StudyAssignmentKey, Job, CacheVersion, StudyMatch, OutboxEvent, RespondentStats, RespondentArchive, StudyQuota, RespondentBlockKey, RespondentDuplicate
 
 config = context.config
 
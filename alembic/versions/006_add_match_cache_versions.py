@@ -0,0 +1,38 @@
+"""Add match cache version counters
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('studies', sa.Column('criteria_version', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('studies', sa.Column('assignment_version', sa.Integer(), nullable=False, server_default='1'))
+
+    op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(50), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.execute(
+        "INSERT INTO cache_versions (name, version) VALUES ('respondent_pool', 0), ('assignments', 0)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cache_versions')
+    op.drop_column('studies', 'assignment_version')
+    op.drop_column('studies', 'criteria_version')
@@ -0,0 +1,46 @@
+"""Create study_matches table
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('studies', sa.Column('matches_refreshed_at', sa.DateTime(), nullable=True))
+
+    op.create_table(
+        'study_matches',
+        sa.Column('study_id', sa.Integer(), nullable=False),
+        sa.Column('respondent_id', sa.Integer(), nullable=False),
+        sa.Column('respondent_created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('study_id', 'respondent_id'),
+        sa.ForeignKeyConstraint(['study_id'], ['studies.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['respondent_id'], ['respondents.id'], ondelete='CASCADE')
+    )
+
+    # Paging by newest respondent within a study, and cleanup by respondent
+    op.create_index(
+        'ix_study_matches_study_created',
+        'study_matches',
+        ['study_id', sa.text('respondent_created_at DESC'), sa.text('respondent_id DESC')],
+    )
+    op.create_index('ix_study_matches_respondent_id', 'study_matches', ['respondent_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_study_matches_respondent_id', table_name='study_matches')
+    op.drop_index('ix_study_matches_study_created', table_name='study_matches')
+    op.drop_table('study_matches')
+    op.drop_column('studies', 'matches_refreshed_at')
@@ -0,0 +1,24 @@
+"""Add (updated_at, id) index for the respondent change feed
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_respondents_updated_id', 'respondents', ['updated_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_respondents_updated_id', table_name='respondents')
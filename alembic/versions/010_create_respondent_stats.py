@@ -0,0 +1,56 @@
+"""Create respondent_stats table and respondent history index
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'respondent_stats',
+        sa.Column('respondent_id', sa.Integer(), nullable=False),
+        sa.Column('invited_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('no_show_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_participation_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['respondent_id'], ['respondents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('respondent_id')
+    )
+
+    # Backfill from existing assignments; kept up to date by the app afterwards
+    op.execute("""
+        INSERT INTO respondent_stats
+            (respondent_id, invited_count, completed_count, no_show_count, last_participation_at)
+        SELECT respondent_id,
+               count(*),
+               count(*) FILTER (WHERE status = 'completed'),
+               count(*) FILTER (WHERE status = 'no_show'),
+               max(completed_at) FILTER (WHERE status = 'completed')
+        FROM study_assignments
+        GROUP BY respondent_id
+    """)
+
+    # Keyset paging of a respondent's history, newest first
+    op.create_index(
+        'ix_study_assignments_respondent_invited',
+        'study_assignments',
+        ['respondent_id', 'invited_at', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_study_assignments_respondent_invited', table_name='study_assignments')
+    op.drop_table('respondent_stats')
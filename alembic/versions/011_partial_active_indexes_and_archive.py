@@ -0,0 +1,87 @@
+"""Partial WHERE is_active respondent indexes and respondents_archive table
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text('is_active')
+
+# name -> columns; every screening/list index now skips inactive rows
+PARTIAL_INDEXES = {
+    'ix_respondents_active_state': ['state'],
+    'ix_respondents_active_age': ['age'],
+    'ix_respondents_active_income': ['household_income'],
+    'ix_respondents_active_state_age': ['state', 'age'],
+    'ix_respondents_active_created': ['created_at'],
+}
+
+# Full indexes from 001 that the partial ones replace
+FULL_INDEXES = {
+    'ix_respondents_state': ['state'],
+    'ix_respondents_age': ['age'],
+    'ix_respondents_household_income': ['household_income'],
+    'ix_respondents_is_active': ['is_active'],
+    'ix_respondents_state_age': ['state', 'age'],
+    'ix_respondents_active_state': ['is_active', 'state'],
+}
+
+
+def upgrade() -> None:
+    for name in FULL_INDEXES:
+        op.drop_index(name, table_name='respondents')
+    for name, columns in PARTIAL_INDEXES.items():
+        op.create_index(name, 'respondents', columns, postgresql_where=ACTIVE)
+
+    op.create_table(
+        'respondents_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('first_name', sa.String(100), nullable=False),
+        sa.Column('last_name', sa.String(100), nullable=False),
+        sa.Column('email', sa.String(255), nullable=False),
+        sa.Column('phone', sa.String(20), nullable=True),
+        sa.Column('city', sa.String(100), nullable=True),
+        sa.Column('state', sa.String(2), nullable=True),
+        sa.Column('zip_code', sa.String(10), nullable=True),
+        sa.Column('age', sa.Integer(), nullable=True),
+        sa.Column('gender', sa.String(20), nullable=True),
+        sa.Column('ethnicity', sa.String(50), nullable=True),
+        sa.Column('household_income', sa.String(50), nullable=True),
+        sa.Column('occupation', sa.String(100), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default='false'),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_respondents_archive_email', 'respondents_archive', ['email'], unique=True)
+
+
+def downgrade() -> None:
+    # Bring archived respondents back before dropping their table
+    op.execute("""
+        INSERT INTO respondents
+            (id, first_name, last_name, email, phone, city, state, zip_code, age, gender,
+             ethnicity, household_income, occupation, is_active, created_at, updated_at)
+        SELECT id, first_name, last_name, email, phone, city, state, zip_code, age, gender,
+               ethnicity, household_income, occupation, is_active, created_at, updated_at
+        FROM respondents_archive
+    """)
+    op.drop_index('ix_respondents_archive_email', table_name='respondents_archive')
+    op.drop_table('respondents_archive')
+
+    for name in PARTIAL_INDEXES:
+        op.drop_index(name, table_name='respondents')
+    for name, columns in FULL_INDEXES.items():
+        op.create_index(name, 'respondents', columns)
@@ -0,0 +1,141 @@
+"""Partition study_assignments by month on invited_at
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+INDEXES = {
+    'ix_study_assignments_study_id': ['study_id'],
+    'ix_study_assignments_respondent_id': ['respondent_id'],
+    'ix_study_assignments_status': ['status'],
+    'ix_study_assignments_respondent_invited': ['respondent_id', 'invited_at', 'id'],
+}
+
+FOREIGN_KEYS = ['study_assignments_study_id_fkey', 'study_assignments_respondent_id_fkey']
+
+COLUMNS = "id, study_id, respondent_id, status, invited_at, confirmed_at, completed_at, notes"
+
+SYNC_KEYS_FUNCTION = """
+CREATE OR REPLACE FUNCTION study_assignment_keys_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM study_assignment_keys
+        WHERE study_id = OLD.study_id AND respondent_id = OLD.respondent_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO study_assignment_keys (study_id, respondent_id)
+        VALUES (NEW.study_id, NEW.respondent_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+SYNC_KEYS_TRIGGER = """
+CREATE OR REPLACE TRIGGER study_assignment_keys_sync
+AFTER INSERT OR DELETE OR UPDATE OF study_id, respondent_id ON study_assignments
+FOR EACH ROW EXECUTE FUNCTION study_assignment_keys_sync()
+"""
+
+
+def _month(value: date, offset: int = 0) -> date:
+    index = value.year * 12 + value.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_table(partitioned: bool) -> None:
+    """Create study_assignments with its columns only (no keys or indexes)."""
+    op.execute(f"""
+        CREATE TABLE study_assignments (
+            id INTEGER NOT NULL DEFAULT nextval('study_assignments_id_seq'),
+            study_id INTEGER NOT NULL REFERENCES studies(id) ON DELETE CASCADE,
+            respondent_id INTEGER NOT NULL REFERENCES respondents(id) ON DELETE CASCADE,
+            status VARCHAR(20) NOT NULL DEFAULT 'invited',
+            invited_at TIMESTAMP NOT NULL DEFAULT timezone('utc', now()),
+            confirmed_at TIMESTAMP,
+            completed_at TIMESTAMP,
+            notes TEXT
+        ) {"PARTITION BY RANGE (invited_at)" if partitioned else ""}
+    """)
+
+
+def upgrade() -> None:
+    # Free the names the partitioned table will use
+    op.rename_table('study_assignments', 'study_assignments_legacy')
+    op.drop_constraint('uq_study_respondent', 'study_assignments_legacy', type_='unique')
+    for name in INDEXES:
+        op.drop_index(name, table_name='study_assignments_legacy')
+    for name in FOREIGN_KEYS:
+        op.drop_constraint(name, 'study_assignments_legacy', type_='foreignkey')
+    op.execute("ALTER TABLE study_assignments_legacy RENAME CONSTRAINT study_assignments_pkey TO study_assignments_legacy_pkey")
+
+    _create_table(partitioned=True)
+    op.execute("ALTER TABLE study_assignments ADD CONSTRAINT study_assignments_pkey PRIMARY KEY (id, invited_at)")
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'study_assignments', columns)
+    op.create_index('ix_study_assignments_study_respondent', 'study_assignments', ['study_id', 'respondent_id'])
+
+    # Cross-partition uniqueness of (study_id, respondent_id)
+    op.create_table(
+        'study_assignment_keys',
+        sa.Column('study_id', sa.Integer(), nullable=False),
+        sa.Column('respondent_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('study_id', 'respondent_id', name='uq_study_respondent')
+    )
+    op.execute(SYNC_KEYS_FUNCTION)
+    op.execute(SYNC_KEYS_TRIGGER)
+
+    # Monthly partitions from the oldest assignment to a few months ahead
+    bind = op.get_bind()
+    oldest = bind.execute(sa.text("SELECT min(invited_at) FROM study_assignments_legacy")).scalar()
+    month = _month(oldest.date() if oldest else date.today())
+    last = _month(date.today(), MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE study_assignments_{month:%Y_%m} PARTITION OF study_assignments "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_month(month, 1).isoformat()}')"
+        )
+        month = _month(month, 1)
+    op.execute("CREATE TABLE study_assignments_default PARTITION OF study_assignments DEFAULT")
+
+    op.execute(f"INSERT INTO study_assignments ({COLUMNS}) SELECT {COLUMNS} FROM study_assignments_legacy")
+    op.execute("ALTER SEQUENCE study_assignments_id_seq OWNED BY study_assignments.id")
+    op.drop_table('study_assignments_legacy')
+
+
+def downgrade() -> None:
+    op.rename_table('study_assignments', 'study_assignments_partitioned')
+    op.execute("ALTER TABLE study_assignments_partitioned RENAME CONSTRAINT study_assignments_pkey TO study_assignments_partitioned_pkey")
+    op.drop_index('ix_study_assignments_study_respondent', table_name='study_assignments_partitioned')
+    for name in INDEXES:
+        op.drop_index(name, table_name='study_assignments_partitioned')
+    for name in FOREIGN_KEYS:
+        op.drop_constraint(name, 'study_assignments_partitioned', type_='foreignkey')
+
+    _create_table(partitioned=False)
+    op.execute("ALTER TABLE study_assignments ADD CONSTRAINT study_assignments_pkey PRIMARY KEY (id)")
+    op.execute(f"INSERT INTO study_assignments ({COLUMNS}) SELECT {COLUMNS} FROM study_assignments_partitioned")
+    op.execute("ALTER SEQUENCE study_assignments_id_seq OWNED BY study_assignments.id")
+
+    op.execute("DROP TABLE study_assignments_partitioned")
+    op.drop_table('study_assignment_keys')
+    op.execute("DROP FUNCTION study_assignment_keys_sync()")
+
+    op.create_unique_constraint('uq_study_respondent', 'study_assignments', ['study_id', 'respondent_id'])
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'study_assignments', columns)
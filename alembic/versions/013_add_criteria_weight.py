@@ -0,0 +1,26 @@
+"""Add weight to screener_criteria for preferred (scored) criteria
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL keeps every existing criterion a hard filter
+    op.add_column('screener_criteria', sa.Column('weight', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('screener_criteria', 'weight')
@@ -0,0 +1,37 @@
+"""Create study_quotas table
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+revision: str = '014'
+down_revision: Union[str, None] = '013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'study_quotas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('study_id', sa.Integer(), nullable=False),
+        sa.Column('field_name', sa.String(50), nullable=False),
+        sa.Column('buckets', JSONB(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['study_id'], ['studies.id'], ondelete='CASCADE')
+    )
+    op.create_index('ix_study_quotas_study_id', 'study_quotas', ['study_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_study_quotas_study_id', table_name='study_quotas')
+    op.drop_table('study_quotas')
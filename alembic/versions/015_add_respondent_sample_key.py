@@ -0,0 +1,34 @@
+"""Add respondents.sample_key for seeded random sampling
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '015'
+down_revision: Union[str, None] = '014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A volatile default rewrites the table once, giving every existing row
+    # its own key
+    op.add_column('respondents', sa.Column('sample_key', sa.Float(), nullable=False, server_default=sa.text('random()')))
+    op.add_column('respondents_archive', sa.Column('sample_key', sa.Float(), nullable=False, server_default=sa.text('random()')))
+    op.create_index(
+        'ix_respondents_active_sample_key', 'respondents', ['sample_key'],
+        postgresql_where=sa.text('is_active'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_respondents_active_sample_key', table_name='respondents')
+    op.drop_column('respondents_archive', 'sample_key')
+    op.drop_column('respondents', 'sample_key')
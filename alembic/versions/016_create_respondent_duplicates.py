@@ -0,0 +1,55 @@
+"""Create respondent_block_keys and respondent_duplicates tables
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+revision: str = '016'
+down_revision: Union[str, None] = '015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'respondent_block_keys',
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('key', sa.String(255), nullable=False),
+        sa.Column('respondent_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('kind', 'key', 'respondent_id'),
+        sa.ForeignKeyConstraint(['respondent_id'], ['respondents.id'], ondelete='CASCADE')
+    )
+    op.create_index('ix_respondent_block_keys_respondent_id', 'respondent_block_keys', ['respondent_id'])
+
+    op.create_table(
+        'respondent_duplicates',
+        sa.Column('respondent_id', sa.Integer(), nullable=False),
+        sa.Column('duplicate_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('reasons', JSONB(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('detected_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('reviewed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('respondent_id', 'duplicate_id'),
+        sa.ForeignKeyConstraint(['respondent_id'], ['respondents.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['duplicate_id'], ['respondents.id'], ondelete='CASCADE'),
+        sa.CheckConstraint('respondent_id < duplicate_id', name='ck_respondent_duplicates_order')
+    )
+    op.create_index('ix_respondent_duplicates_duplicate_id', 'respondent_duplicates', ['duplicate_id'])
+    op.create_index('ix_respondent_duplicates_status_score', 'respondent_duplicates', ['status', 'score'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_respondent_duplicates_status_score', table_name='respondent_duplicates')
+    op.drop_index('ix_respondent_duplicates_duplicate_id', table_name='respondent_duplicates')
+    op.drop_table('respondent_duplicates')
+    op.drop_index('ix_respondent_block_keys_respondent_id', table_name='respondent_block_keys')
+    op.drop_table('respondent_block_keys')
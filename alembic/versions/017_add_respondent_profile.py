@@ -0,0 +1,38 @@
+"""Add respondents.profile JSONB attributes with a GIN index
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+revision: str = '017'
+down_revision: Union[str, None] = '016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant default is stored in the catalog; no table rewrite
+    op.add_column('respondents', sa.Column('profile', JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")))
+    op.add_column('respondents_archive', sa.Column('profile', JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")))
+    # jsonb_path_ops: smaller and faster than the default opclass for the
+    # @> containment and @? path checks that profile criteria compile to
+    op.create_index(
+        'ix_respondents_active_profile', 'respondents', ['profile'],
+        postgresql_using='gin',
+        postgresql_ops={'profile': 'jsonb_path_ops'},
+        postgresql_where=sa.text('is_active'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_respondents_active_profile', table_name='respondents')
+    op.drop_column('respondents_archive', 'profile')
+    op.drop_column('respondents', 'profile')
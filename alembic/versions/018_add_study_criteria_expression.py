@@ -0,0 +1,26 @@
+"""Add studies.criteria_expression for AND/OR/NOT criteria trees
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+revision: str = '018'
+down_revision: Union[str, None] = '017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('studies', sa.Column('criteria_expression', JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('studies', 'criteria_expression')
@@ -0,0 +1,49 @@
+"""Add respondents.change_xid for a commit-ordered change feed
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '019'
+down_revision: Union[str, None] = '018'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANGE_XID_FUNCTION = """
+CREATE OR REPLACE FUNCTION respondents_stamp_change_xid() RETURNS trigger AS $$
+BEGIN
+    NEW.change_xid := pg_current_xact_id();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+CHANGE_XID_TRIGGER = """
+CREATE OR REPLACE TRIGGER respondents_stamp_change_xid
+BEFORE INSERT OR UPDATE ON respondents
+FOR EACH ROW EXECUTE FUNCTION respondents_stamp_change_xid()
+"""
+
+
+def upgrade() -> None:
+    # Existing rows get xid 0 (a constant default, so no table rewrite): they
+    # sort before every later write and are all delivered to a fresh sync
+    op.execute("ALTER TABLE respondents ADD COLUMN change_xid xid8 NOT NULL DEFAULT '0'")
+    op.execute("ALTER TABLE respondents ALTER COLUMN change_xid SET DEFAULT pg_current_xact_id()")
+    op.create_index('ix_respondents_change_xid_id', 'respondents', ['change_xid', 'id'])
+    op.execute(CHANGE_XID_FUNCTION)
+    op.execute(CHANGE_XID_TRIGGER)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS respondents_stamp_change_xid ON respondents")
+    op.execute("DROP FUNCTION IF EXISTS respondents_stamp_change_xid()")
+    op.drop_index('ix_respondents_change_xid_id', table_name='respondents')
+    op.drop_column('respondents', 'change_xid')
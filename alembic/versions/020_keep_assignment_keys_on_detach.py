@@ -0,0 +1,107 @@
+"""Keep study_assignment_keys for detached partitions, with invited_at
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '020'
+down_revision: Union[str, None] = '019'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNC_KEYS_FUNCTION = """
+CREATE OR REPLACE FUNCTION study_assignment_keys_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM study_assignment_keys
+        WHERE study_id = OLD.study_id AND respondent_id = OLD.respondent_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO study_assignment_keys (study_id, respondent_id, invited_at)
+        VALUES (NEW.study_id, NEW.respondent_id, NEW.invited_at);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+SYNC_KEYS_TRIGGER = """
+CREATE OR REPLACE TRIGGER study_assignment_keys_sync
+AFTER INSERT OR DELETE OR UPDATE OF study_id, respondent_id, invited_at ON study_assignments
+FOR EACH ROW EXECUTE FUNCTION study_assignment_keys_sync()
+"""
+
+OLD_SYNC_KEYS_FUNCTION = """
+CREATE OR REPLACE FUNCTION study_assignment_keys_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM study_assignment_keys
+        WHERE study_id = OLD.study_id AND respondent_id = OLD.respondent_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO study_assignment_keys (study_id, respondent_id)
+        VALUES (NEW.study_id, NEW.respondent_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+OLD_SYNC_KEYS_TRIGGER = """
+CREATE OR REPLACE TRIGGER study_assignment_keys_sync
+AFTER INSERT OR DELETE OR UPDATE OF study_id, respondent_id ON study_assignments
+FOR EACH ROW EXECUTE FUNCTION study_assignment_keys_sync()
+"""
+
+# Partitions detached before this revision released their keys; put them
+# back (a pair assigned again since keeps its live key)
+RESTORE_ARCHIVED_KEYS = """
+DO $$
+DECLARE
+    part regclass;
+BEGIN
+    FOR part IN
+        SELECT c.oid::regclass FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'archive' AND c.relkind = 'r'
+          AND c.relname LIKE 'study\\_assignments\\_%'
+    LOOP
+        EXECUTE format(
+            'INSERT INTO study_assignment_keys (study_id, respondent_id, invited_at) '
+            'SELECT study_id, respondent_id, invited_at FROM %s '
+            'ON CONFLICT DO NOTHING',
+            part
+        );
+    END LOOP;
+END $$
+"""
+
+
+def upgrade() -> None:
+    op.add_column('study_assignment_keys', sa.Column('invited_at', sa.DateTime(), nullable=True))
+    op.execute("""
+        UPDATE study_assignment_keys AS keys SET invited_at = a.invited_at
+        FROM study_assignments AS a
+        WHERE a.study_id = keys.study_id AND a.respondent_id = keys.respondent_id
+    """)
+    op.execute(RESTORE_ARCHIVED_KEYS)
+    op.alter_column('study_assignment_keys', 'invited_at', nullable=False)
+    op.create_index(
+        'ix_study_assignment_keys_respondent', 'study_assignment_keys', ['respondent_id', 'study_id']
+    )
+    op.execute(SYNC_KEYS_FUNCTION)
+    op.execute(SYNC_KEYS_TRIGGER)
+
+
+def downgrade() -> None:
+    op.execute(OLD_SYNC_KEYS_TRIGGER)
+    op.execute(OLD_SYNC_KEYS_FUNCTION)
+    op.drop_index('ix_study_assignment_keys_respondent', table_name='study_assignment_keys')
+    op.drop_column('study_assignment_keys', 'invited_at')
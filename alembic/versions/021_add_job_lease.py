@@ -0,0 +1,28 @@
+"""Add jobs.locked_until so jobs of dead workers are claimed again
+
+Revision ID: 021
+Revises: 020
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '021'
+down_revision: Union[str, None] = '020'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('locked_until', sa.DateTime(), nullable=True))
+    # Jobs left running by workers before this revision have no lease; let
+    # the next claim pick them up
+    op.execute("UPDATE jobs SET locked_until = timezone('utc', now()) WHERE status = 'running'")
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'locked_until')
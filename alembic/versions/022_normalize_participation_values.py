@@ -0,0 +1,38 @@
+"""Normalize stored participation criteria to the validated shapes
+
+Revision ID: 022
+Revises: 021
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '022'
+down_revision: Union[str, None] = '021'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Criteria saved before values were validated: a bare client name and a
+    # single study id. Matching now reads only the object and list forms.
+    op.execute("""
+        UPDATE screener_criteria
+        SET value = jsonb_build_object('client_name', value #>> '{}')
+        WHERE field_name = 'participation' AND operator = 'not_with_client'
+          AND jsonb_typeof(value) = 'string'
+    """)
+    op.execute("""
+        UPDATE screener_criteria
+        SET value = jsonb_build_array(value)
+        WHERE field_name = 'participation' AND operator = 'not_in_studies'
+          AND jsonb_typeof(value) = 'number'
+    """)
+
+
+def downgrade() -> None:
+    # The normalized forms are valid for the previous revision too
+    pass
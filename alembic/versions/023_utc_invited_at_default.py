@@ -0,0 +1,26 @@
+"""Default study_assignments.invited_at to UTC, like the ORM
+
+Revision ID: 023
+Revises: 022
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '023'
+down_revision: Union[str, None] = '022'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The ORM stamps datetime.utcnow(); rows inserted without invited_at
+    # must land in the same month partition it would pick
+    op.execute("ALTER TABLE study_assignments ALTER COLUMN invited_at SET DEFAULT timezone('utc', now())")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE study_assignments ALTER COLUMN invited_at SET DEFAULT now()")
@@ -0,0 +1,187 @@
+"""
+Admission control: per-route-class concurrency limits with bounded queues.
+
+Heavy match and export requests each get a few slots so a burst of them
+cannot take every pooled connection; light reads have their own, larger
+allowance and keep flowing. Requests over a class's queue cap are turned
+away immediately (429); queued requests that wait too long get a 503.
+Both carry Retry-After.
+"""
+import asyncio
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Never limited: probes and metrics must answer while the app is saturated
+EXEMPT_PATHS = {"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"}
+
+MATCH_SUFFIXES = ("/match", "/select", "/check")
+EXPORT_SUFFIXES = ("/batch-get", "/changes")
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Route class for a request, or None when it is exempt."""
+    if path in EXEMPT_PATHS or not path.startswith("/api/"):
+        return None
+    if path.endswith(MATCH_SUFFIXES):
+        return "match"
+    if path.endswith(EXPORT_SUFFIXES):
+        return "export"
+    if method not in ("GET", "HEAD", "OPTIONS"):
+        return "write"
+    return "read"
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, retry_after: float, detail: str):
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+@dataclass
+class ClassLimit:
+    concurrency: int
+    max_queue: int
+    queue_timeout: float
+
+
+class ConcurrencyLimiter:
+    """A semaphore with a cap on waiters, a wait timeout, and wait statistics."""
+
+    def __init__(self, name: str, limit: ClassLimit):
+        self.name = name
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit.concurrency)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.waited = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _retry_after(self) -> float:
+        # Roughly how long the backlog ahead of a new request should take
+        backlog = (self.queued + 1) / max(self.limit.concurrency, 1)
+        return max(1.0, min(self.limit.queue_timeout, backlog))
+
+    async def acquire(self) -> float:
+        """Take a slot, waiting in the queue if needed. Returns seconds waited."""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            self.in_flight += 1
+            self.admitted += 1
+            return 0.0
+
+        if self.queued >= self.limit.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(429, self._retry_after(), f"Too many concurrent {self.name} requests")
+
+        started = time.perf_counter()
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.limit.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise AdmissionRejected(503, self._retry_after(), f"Timed out waiting for a {self.name} slot")
+        finally:
+            self.queued -= 1
+
+        waited = time.perf_counter() - started
+        self.in_flight += 1
+        self.admitted += 1
+        self.waited += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return waited
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.limit.concurrency,
+            "max_queue": self.limit.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "queue_waits": self.waited,
+            "queue_wait_seconds_avg": round(self.wait_seconds_total / self.waited, 4) if self.waited else 0.0,
+            "queue_wait_seconds_max": round(self.wait_seconds_max, 4),
+        }
+
+
+class AdmissionController:
+    def __init__(self, limits: Dict[str, ClassLimit]):
+        self.limiters = {name: ConcurrencyLimiter(name, limit) for name, limit in limits.items()}
+
+    @classmethod
+    def from_settings(cls, settings) -> "AdmissionController":
+        return cls({
+            name: ClassLimit(
+                concurrency=getattr(settings, f"admission_{name}_concurrency"),
+                max_queue=getattr(settings, f"admission_{name}_queue"),
+                queue_timeout=settings.admission_queue_timeout,
+            )
+            for name in ("match", "export", "write", "read")
+        })
+
+    def stats(self) -> dict:
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an AdmissionController to HTTP requests."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_class = classify(scope["method"], scope["path"])
+        limiter = self.controller.limiters.get(route_class) if route_class else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            waited = await limiter.acquire()
+        except AdmissionRejected as rejected:
+            await self._reject(send, rejected)
+            return
+
+        async def send_with_wait(message):
+            if message["type"] == "http.response.start" and waited:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-queue-wait-ms", str(round(waited * 1000)).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_wait)
+        finally:
+            limiter.release()
+
+    @staticmethod
+    async def _reject(send, rejected: AdmissionRejected) -> None:
+        body = json.dumps({"detail": rejected.detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": rejected.status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(rejected.retry_after)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
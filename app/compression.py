@@ -0,0 +1,190 @@
+"""
+Response compression middleware: zstd or brotli when their libraries are
+installed, gzip otherwise, negotiated from Accept-Encoding.
+
+Bodies under the size threshold go out untouched, streamed or not. Streamed
+responses are buffered only up to that threshold and then compressed chunk
+by chunk, so a large page never has to be buffered whole.
+"""
+import zlib
+from typing import Callable, Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+class _Compressor:
+    """Uniform compress/flush over zlib, zstandard and brotli streams."""
+
+    def __init__(self, compress: Callable[[bytes], bytes], flush: Callable[[], bytes]):
+        self.compress = compress
+        self.flush = flush
+
+
+def _gzip(level: int) -> _Compressor:
+    stream = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return _Compressor(stream.compress, stream.flush)
+
+
+def _zstd(level: int) -> _Compressor:
+    stream = zstandard.ZstdCompressor(level=level).compressobj()
+    return _Compressor(stream.compress, stream.flush)
+
+
+def _brotli(level: int) -> _Compressor:
+    stream = brotli.Compressor(quality=level)
+    return _Compressor(stream.process, stream.finish)
+
+
+def available_encodings(
+    gzip_level: int = 5,
+    zstd_level: int = 3,
+    brotli_level: int = 4,
+) -> Dict[str, Callable[[], _Compressor]]:
+    """Encoding -> compressor factory, most preferred first."""
+    encodings = {}
+    if zstandard is not None:
+        encodings["zstd"] = lambda: _zstd(zstd_level)
+    if brotli is not None:
+        encodings["br"] = lambda: _brotli(brotli_level)
+    encodings["gzip"] = lambda: _gzip(gzip_level)
+    return encodings
+
+
+def choose_encoding(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """Pick the first supported encoding the client accepts (q > 0)."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    for encoding in supported:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 5,
+        zstd_level: int = 3,
+        brotli_level: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings(gzip_level, zstd_level, brotli_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept, list(self.encodings)) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        compressing_send = _CompressingSend(
+            send, encoding, self.encodings[encoding], self.minimum_size
+        )
+        await self.app(scope, receive, compressing_send)
+
+
+class _CompressingSend:
+    """
+    Wraps `send` for one response. Body chunks are held until minimum_size
+    bytes or the final chunk arrive, so small streamed bodies stay plain.
+    """
+
+    def __init__(self, send, encoding: str, factory: Callable[[], _Compressor], minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.factory = factory
+        self.minimum_size = minimum_size
+        self.start: Optional[dict] = None
+        self.buffered: List[bytes] = []
+        self.buffered_size = 0
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            headers = {key.lower(): value for key, value in message.get("headers", [])}
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+            self.passthrough = (
+                b"content-encoding" in headers
+                or message["status"] in (204, 304)
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start = message  # held until the body size is known
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            self.buffered.append(body)
+            self.buffered_size += len(body)
+            if more_body and self.buffered_size < self.minimum_size:
+                return
+            start, self.start = self.start, None
+            body, self.buffered = b"".join(self.buffered), []
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            self.compressor = self.factory()
+            headers, vary = [], [b"Accept-Encoding"]
+            for key, value in start.get("headers", []):
+                if key.lower() == b"vary":
+                    vary.insert(0, value)
+                elif key.lower() != b"content-length":
+                    headers.append((key, value))
+            headers.append((b"content-encoding", self.encoding.encode()))
+            headers.append((b"vary", b", ".join(vary)))
+            if not more_body:
+                compressed = self.compressor.compress(body) + self.compressor.flush()
+                headers.append((b"content-length", str(len(compressed)).encode()))
+                await self.send({**start, "headers": headers})
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send({**start, "headers": headers})
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -1,10 +1,21 @@
+import logging
+import time
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
+# Module-level so services can import the session factories; creating an
+# engine opens no connection until the first query
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
@@ -19,11 +30,133 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Optional read replica; reads fall back to the primary when unset
+read_engine = (
+    create_async_engine(
+        settings.read_database_url,
+        echo=settings.debug,
+        pool_pre_ping=True,
+    )
+    if settings.read_database_url
+    else None
+)
+
+
+def _is_connection_error(exc: Exception) -> bool:
+    """Refused or dropped connections, as opposed to errors in the query itself."""
+    if isinstance(exc, DBAPIError):
+        return exc.connection_invalidated
+    return isinstance(exc, OSError)
+
+
+class ReplicaSession(AsyncSession):
+    """
+    Read-replica session that moves to the primary when the replica connection
+    fails, re-running the failed statement there. Read routes only read, so
+    re-running is safe; later statements stay on the primary. Objects loaded
+    before the failure are detached with their attributes intact.
+    """
+
+    on_primary = False
+
+    async def execute(self, *args, **kwargs):
+        try:
+            return await super().execute(*args, **kwargs)
+        except (OSError, DBAPIError) as exc:
+            if self.on_primary or not _is_connection_error(exc):
+                raise
+            logger.warning("Read replica failed mid-request, retrying on primary", exc_info=True)
+        replica_monitor.mark_unhealthy()
+        # Rolling back would expire objects the route already loaded, and the
+        # next attribute access would lazy-load outside the event loop.
+        # Detached, they keep the values read from the replica.
+        self.expunge_all()
+        await self.rollback()
+        primary = AsyncSessionLocal.kw["bind"]
+        self.bind = primary
+        self.sync_session.bind = primary.sync_engine
+        self.on_primary = True
+        return await super().execute(*args, **kwargs)
+
+
+ReadSessionLocal = (
+    async_sessionmaker(
+        read_engine,
+        class_=ReplicaSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+    if read_engine is not None
+    else None
+)
+
+# Set on write responses so the same client reads its own writes from the primary
+READ_PRIMARY_COOKIE = "rpm_read_primary_until"
+
 
 class Base(DeclarativeBase):
     pass
 
 
+class ReplicaMonitor:
+    """Caches replica health so lag is checked at most once per interval."""
+
+    LAG_QUERY = text(
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    )
+
+    def __init__(self, max_lag: float, check_interval: float):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None
+        self._healthy = False
+        self._checked_at = 0.0
+
+    async def is_healthy(self) -> bool:
+        if read_engine is None:
+            return False
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._healthy
+
+        self._checked_at = now
+        try:
+            async with read_engine.connect() as conn:
+                lag = (await conn.execute(self.LAG_QUERY)).scalar()
+            self.lag = float(lag or 0)
+            self._healthy = self.lag <= self.max_lag
+        except Exception:
+            logger.warning("Read replica unavailable, routing reads to primary", exc_info=True)
+            self.lag = None
+            self._healthy = False
+        return self._healthy
+
+    def mark_unhealthy(self) -> None:
+        """Route reads to the primary until the next check is due."""
+        self.lag = None
+        self._healthy = False
+        self._checked_at = time.monotonic()
+
+
+replica_monitor = ReplicaMonitor(
+    max_lag=settings.replica_max_lag_seconds,
+    check_interval=settings.replica_check_interval,
+)
+
+
+def _prefers_primary(request: Request) -> bool:
+    """True while the client is inside its read-your-writes window."""
+    until = request.cookies.get(READ_PRIMARY_COOKIE)
+    if not until:
+        return False
+    try:
+        return float(until) > time.time()
+    except ValueError:
+        return False
+
+
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         try:
@@ -34,3 +167,26 @@ async def get_db() -> AsyncSession:
             raise
         finally:
             await session.close()
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """
+    Session for read-only routes: replica when healthy, else primary.
+
+    A replica connection failing during the request is retried on the
+    primary by ReplicaSession instead of reaching the client.
+    """
+    session_factory = AsyncSessionLocal
+    if (
+        ReadSessionLocal is not None
+        and not _prefers_primary(request)
+        and await replica_monitor.is_healthy()
+    ):
+        session_factory = ReadSessionLocal
+
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
+            await session.close()
@@ -1,6 +1,14 @@
 from app.models.respondent import Respondent
 from app.models.study import Study
 from app.models.screener_criteria import ScreenerCriteria
-from app.models.study_assignment import StudyAssignment
+from app.models.study_assignment import StudyAssignment, StudyAssignmentKey
+from app.models.job import Job
+from app.models.cache_version import CacheVersion
+from app.models.study_match import StudyMatch
+from app.models.outbox_event import OutboxEvent
+from app.models.respondent_stats import RespondentStats
+from app.models.respondent_archive import RespondentArchive
+from app.models.study_quota import StudyQuota
+from app.models.respondent_duplicate import RespondentBlockKey, RespondentDuplicate
 
-__all__ = ["Respondent", "Study", "ScreenerCriteria", "StudyAssignment"]
+__all__ = ["Respondent", "Study", "ScreenerCriteria", "StudyAssignment", "StudyAssignmentKey", "Job", "CacheVersion", "StudyMatch", "OutboxEvent", "RespondentStats", "RespondentArchive", "StudyQuota", "RespondentBlockKey", "RespondentDuplicate"]
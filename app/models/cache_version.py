@@ -0,0 +1,11 @@
+from sqlalchemy import String, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)  # e.g. "respondent_pool", "assignments"
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
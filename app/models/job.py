@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Integer, Boolean, DateTime, Text, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(50))  # e.g. "assign_respondents"
+    status: Mapped[str] = mapped_column(String(20), default="queued")  # queued, running, succeeded, failed, cancelled
+    params: Mapped[dict] = mapped_column(JSONB, default=dict)
+    result: Mapped[Optional[dict]] = mapped_column(JSONB)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    progress: Mapped[int] = mapped_column(Integer, default=0)
+    total: Mapped[Optional[int]] = mapped_column(Integer)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    # Extended by the worker while running; a lapsed lease means the worker died
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    __table_args__ = (
+        Index("ix_jobs_status_id", "status", "id"),
+    )
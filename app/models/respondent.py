@@ -1,6 +1,8 @@
 from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Integer, Boolean, DateTime, Index
+from sqlalchemy import String, Integer, Float, Boolean, DateTime, Index, DDL, event, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import UserDefinedType
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -9,6 +11,15 @@ if TYPE_CHECKING:
     from app.models.study_assignment import StudyAssignment
 
 
+class XID8(UserDefinedType):
+    """Postgres 64-bit transaction id; asyncpg reads it as an int."""
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw) -> str:
+        return "xid8"
+
+
 class Respondent(Base):
     __tablename__ = "respondents"
 
@@ -18,24 +29,68 @@ class Respondent(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     phone: Mapped[Optional[str]] = mapped_column(String(20))
     city: Mapped[Optional[str]] = mapped_column(String(100))
-    state: Mapped[Optional[str]] = mapped_column(String(2), index=True)
+    state: Mapped[Optional[str]] = mapped_column(String(2))
     zip_code: Mapped[Optional[str]] = mapped_column(String(10))
-    age: Mapped[Optional[int]] = mapped_column(Integer, index=True)
+    age: Mapped[Optional[int]] = mapped_column(Integer)
     gender: Mapped[Optional[str]] = mapped_column(String(20))
     ethnicity: Mapped[Optional[str]] = mapped_column(String(50))
-    household_income: Mapped[Optional[str]] = mapped_column(String(50), index=True)
+    household_income: Mapped[Optional[str]] = mapped_column(String(50))
     occupation: Mapped[Optional[str]] = mapped_column(String(100))
-    is_active: Mapped[bool] = mapped_column(Boolean, default=True, index=True)
+    # Free-form screening attributes (pets, car_owner, devices, ...), matched
+    # through "profile.<key>" criteria
+    profile: Mapped[dict] = mapped_column(JSONB, default=dict, server_default=text("'{}'::jsonb"))
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
+    # Uniform in [0, 1), fixed at insert: sort=random walks this index from a
+    # seeded start instead of sorting the match set
+    sample_key: Mapped[float] = mapped_column(Float, server_default=text("random()"))
+    # Transaction that last wrote the row, stamped by trigger; the change feed
+    # pages on (change_xid, id) so late commits cannot land behind a cursor
+    change_xid: Mapped[int] = mapped_column(XID8, server_default=text("pg_current_xact_id()"))
 
     assignments: Mapped[List["StudyAssignment"]] = relationship(
         "StudyAssignment", back_populates="respondent"
     )
 
+    # Screening and list indexes cover active respondents only; queries must
+    # compare is_active to a literal true for the planner to use them
     __table_args__ = (
-        Index("ix_respondents_state_age", "state", "age"),
-        Index("ix_respondents_active_state", "is_active", "state"),
+        Index("ix_respondents_active_state", "state", postgresql_where=text("is_active")),
+        Index("ix_respondents_active_age", "age", postgresql_where=text("is_active")),
+        Index("ix_respondents_active_income", "household_income", postgresql_where=text("is_active")),
+        Index("ix_respondents_active_state_age", "state", "age", postgresql_where=text("is_active")),
+        Index("ix_respondents_active_created", "created_at", postgresql_where=text("is_active")),
+        Index("ix_respondents_active_sample_key", "sample_key", postgresql_where=text("is_active")),
+        Index(
+            "ix_respondents_active_profile", "profile",
+            postgresql_using="gin",
+            postgresql_ops={"profile": "jsonb_path_ops"},
+            postgresql_where=text("is_active"),
+        ),
+        Index("ix_respondents_updated_id", "updated_at", "id"),
+        Index("ix_respondents_change_xid_id", "change_xid", "id"),
     )
+
+
+CHANGE_XID_FUNCTION = """
+CREATE OR REPLACE FUNCTION respondents_stamp_change_xid() RETURNS trigger AS $$
+BEGIN
+    NEW.change_xid := pg_current_xact_id();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+CHANGE_XID_TRIGGER = """
+CREATE OR REPLACE TRIGGER respondents_stamp_change_xid
+BEFORE INSERT OR UPDATE ON respondents
+FOR EACH ROW EXECUTE FUNCTION respondents_stamp_change_xid()
+"""
+
+# Migrations install these too; metadata.create_all (tests, fresh databases)
+# gets them from here
+event.listen(Respondent.__table__, "after_create", DDL(CHANGE_XID_FUNCTION))
+event.listen(Respondent.__table__, "after_create", DDL(CHANGE_XID_TRIGGER))
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Integer, Float, Boolean, DateTime, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class RespondentArchive(Base):
+    """Cold storage for long-inactive respondents; same columns as respondents."""
+
+    __tablename__ = "respondents_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    first_name: Mapped[str] = mapped_column(String(100))
+    last_name: Mapped[str] = mapped_column(String(100))
+    email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+    phone: Mapped[Optional[str]] = mapped_column(String(20))
+    city: Mapped[Optional[str]] = mapped_column(String(100))
+    state: Mapped[Optional[str]] = mapped_column(String(2))
+    zip_code: Mapped[Optional[str]] = mapped_column(String(10))
+    age: Mapped[Optional[int]] = mapped_column(Integer)
+    gender: Mapped[Optional[str]] = mapped_column(String(20))
+    ethnicity: Mapped[Optional[str]] = mapped_column(String(50))
+    household_income: Mapped[Optional[str]] = mapped_column(String(50))
+    occupation: Mapped[Optional[str]] = mapped_column(String(100))
+    profile: Mapped[dict] = mapped_column(JSONB, default=dict, server_default=text("'{}'::jsonb"))
+    is_active: Mapped[bool] = mapped_column(Boolean, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    updated_at: Mapped[datetime] = mapped_column(DateTime)
+    sample_key: Mapped[float] = mapped_column(Float, server_default=text("random()"))
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
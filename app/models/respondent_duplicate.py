@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Float, DateTime, ForeignKey, Index, CheckConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class RespondentBlockKey(Base):
+    """
+    Blocking keys for duplicate detection: only respondents sharing a key are compared.
+
+    Kinds: "phone" (last 10 digits), "name_zip" (lowercased last name + ZIP5),
+    "email_local" (email local part, lowercased, without dots or +tag).
+    """
+
+    __tablename__ = "respondent_block_keys"
+
+    kind: Mapped[str] = mapped_column(String(20), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    respondent_id: Mapped[int] = mapped_column(
+        ForeignKey("respondents.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+
+
+class RespondentDuplicate(Base):
+    """A scored candidate duplicate pair, stored once with respondent_id < duplicate_id."""
+
+    __tablename__ = "respondent_duplicates"
+
+    respondent_id: Mapped[int] = mapped_column(
+        ForeignKey("respondents.id", ondelete="CASCADE"), primary_key=True
+    )
+    duplicate_id: Mapped[int] = mapped_column(
+        ForeignKey("respondents.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    score: Mapped[float] = mapped_column(Float)  # 0..1
+    reasons: Mapped[list] = mapped_column(JSONB, default=list)  # e.g. ["phone", "last_name"]
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending, confirmed, dismissed
+    detected_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    reviewed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    __table_args__ = (
+        CheckConstraint("respondent_id < duplicate_id", name="ck_respondent_duplicates_order"),
+        Index("ix_respondent_duplicates_status_score", "status", "score"),
+    )
@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Integer, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class RespondentStats(Base):
+    """Per-respondent participation totals, maintained on every assignment write."""
+
+    __tablename__ = "respondent_stats"
+
+    respondent_id: Mapped[int] = mapped_column(
+        ForeignKey("respondents.id", ondelete="CASCADE"), primary_key=True
+    )
+    invited_count: Mapped[int] = mapped_column(Integer, default=0)
+    completed_count: Mapped[int] = mapped_column(Integer, default=0)
+    no_show_count: Mapped[int] = mapped_column(Integer, default=0)
+    last_participation_at: Mapped[Optional[datetime]] = mapped_column(DateTime)  # latest completed_at
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
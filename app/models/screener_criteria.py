@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import TYPE_CHECKING
-from sqlalchemy import String, DateTime, ForeignKey
+from typing import Optional, TYPE_CHECKING
+from sqlalchemy import String, Float, DateTime, ForeignKey
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -15,9 +15,10 @@ class ScreenerCriteria(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     study_id: Mapped[int] = mapped_column(ForeignKey("studies.id", ondelete="CASCADE"), index=True)
-    field_name: Mapped[str] = mapped_column(String(50))  # e.g. "age", "household_income", "state"
-    operator: Mapped[str] = mapped_column(String(20))  # eq, neq, gte, lte, in, between
+    field_name: Mapped[str] = mapped_column(String(50))  # e.g. "age", "household_income", "state", "participation"
+    operator: Mapped[str] = mapped_column(String(20))  # eq, neq, gte, lte, in, between, not_in_studies, not_with_client
     value: Mapped[dict] = mapped_column(JSONB)  # Flexible: "NY", [25, 45], ["75k-100k", "100k+"]
+    weight: Mapped[Optional[float]] = mapped_column(Float)  # set = preferred: adds to the match score instead of filtering
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     study: Mapped["Study"] = relationship("Study", back_populates="criteria")
@@ -2,12 +2,14 @@ from datetime import datetime, date
 from decimal import Decimal
 from typing import Optional, List, TYPE_CHECKING
 from sqlalchemy import String, Integer, DateTime, Date, Numeric, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 
 if TYPE_CHECKING:
     from app.models.screener_criteria import ScreenerCriteria
+    from app.models.study_quota import StudyQuota
     from app.models.study_assignment import StudyAssignment
 
 
@@ -24,10 +26,18 @@ class Study(Base):
     start_date: Mapped[Optional[date]] = mapped_column(Date)
     end_date: Mapped[Optional[date]] = mapped_column(Date)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # AND/OR/NOT tree of criteria, ANDed with the criteria list (see criteria_expression)
+    criteria_expression: Mapped[Optional[dict]] = mapped_column(JSONB)
+    criteria_version: Mapped[int] = mapped_column(Integer, default=1)  # bumped when criteria change
+    assignment_version: Mapped[int] = mapped_column(Integer, default=1)  # bumped when assignments are added
+    matches_refreshed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)  # set while study_matches is current
 
     criteria: Mapped[List["ScreenerCriteria"]] = relationship(
         "ScreenerCriteria", back_populates="study", cascade="all, delete-orphan"
     )
+    quotas: Mapped[List["StudyQuota"]] = relationship(
+        "StudyQuota", back_populates="study", cascade="all, delete-orphan"
+    )
     assignments: Mapped[List["StudyAssignment"]] = relationship(
         "StudyAssignment", back_populates="study", cascade="all, delete-orphan"
     )
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
-from sqlalchemy import String, DateTime, ForeignKey, Text, UniqueConstraint
+from sqlalchemy import String, DateTime, ForeignKey, Text, Index, PrimaryKeyConstraint, DDL, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -11,13 +11,23 @@ if TYPE_CHECKING:
 
 
 class StudyAssignment(Base):
+    """
+    Range-partitioned by month on invited_at (see app.services.partition_service).
+
+    Postgres cannot enforce UNIQUE (study_id, respondent_id) across partitions,
+    so a trigger mirrors each row's pair into study_assignment_keys, whose
+    primary key carries the uq_study_respondent guarantee.
+    """
+
     __tablename__ = "study_assignments"
 
-    id: Mapped[int] = mapped_column(primary_key=True)
+    # The table key is (id, invited_at) because the partition key must be in
+    # it; the ORM keeps identifying rows by id alone
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     study_id: Mapped[int] = mapped_column(ForeignKey("studies.id", ondelete="CASCADE"), index=True)
     respondent_id: Mapped[int] = mapped_column(ForeignKey("respondents.id", ondelete="CASCADE"), index=True)
     status: Mapped[str] = mapped_column(String(20), default="invited", index=True)  # invited, confirmed, completed, no_show, rejected
-    invited_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    invited_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, primary_key=True)
     confirmed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
     notes: Mapped[Optional[str]] = mapped_column(Text)
@@ -25,6 +35,64 @@ class StudyAssignment(Base):
     study: Mapped["Study"] = relationship("Study", back_populates="assignments")
     respondent: Mapped["Respondent"] = relationship("Respondent", back_populates="assignments")
 
+    __mapper_args__ = {"primary_key": [id]}
+
     __table_args__ = (
-        UniqueConstraint("study_id", "respondent_id", name="uq_study_respondent"),
+        Index("ix_study_assignments_study_respondent", "study_id", "respondent_id"),
+        Index("ix_study_assignments_respondent_invited", "respondent_id", "invited_at", "id"),
+        {"postgresql_partition_by": "RANGE (invited_at)"},
     )
+
+
+class StudyAssignmentKey(Base):
+    """
+    One row per (study_id, respondent_id) ever assigned, maintained by trigger.
+
+    Rows outlive detached partitions, so participation rules and duplicate
+    checks keep seeing archived history.
+    """
+
+    __tablename__ = "study_assignment_keys"
+
+    study_id: Mapped[int] = mapped_column()
+    respondent_id: Mapped[int] = mapped_column()
+    invited_at: Mapped[datetime] = mapped_column(DateTime)
+
+    # Named like the original unique constraint so violations read the same
+    __table_args__ = (
+        PrimaryKeyConstraint("study_id", "respondent_id", name="uq_study_respondent"),
+        Index("ix_study_assignment_keys_respondent", "respondent_id", "study_id"),
+    )
+
+
+SYNC_KEYS_FUNCTION = """
+CREATE OR REPLACE FUNCTION study_assignment_keys_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM study_assignment_keys
+        WHERE study_id = OLD.study_id AND respondent_id = OLD.respondent_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO study_assignment_keys (study_id, respondent_id, invited_at)
+        VALUES (NEW.study_id, NEW.respondent_id, NEW.invited_at);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+SYNC_KEYS_TRIGGER = """
+CREATE OR REPLACE TRIGGER study_assignment_keys_sync
+AFTER INSERT OR DELETE OR UPDATE OF study_id, respondent_id, invited_at ON study_assignments
+FOR EACH ROW EXECUTE FUNCTION study_assignment_keys_sync()
+"""
+
+# Migrations create monthly partitions; metadata.create_all (tests, fresh
+# databases) gets the catch-all default partition and the key trigger.
+event.listen(
+    StudyAssignment.__table__,
+    "after_create",
+    DDL("CREATE TABLE study_assignments_default PARTITION OF study_assignments DEFAULT"),
+)
+event.listen(Base.metadata, "after_create", DDL(SYNC_KEYS_FUNCTION))
+event.listen(Base.metadata, "after_create", DDL(SYNC_KEYS_TRIGGER))
@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy import DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class StudyMatch(Base):
+    """Materialized set of active respondents meeting a recruiting study's criteria."""
+
+    __tablename__ = "study_matches"
+
+    study_id: Mapped[int] = mapped_column(
+        ForeignKey("studies.id", ondelete="CASCADE"), primary_key=True
+    )
+    respondent_id: Mapped[int] = mapped_column(
+        ForeignKey("respondents.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    respondent_created_at: Mapped[datetime] = mapped_column(DateTime)  # copy of respondents.created_at for paging
+
+
+# Declared after the class so the columns can carry DESC ordering
+Index(
+    "ix_study_matches_study_created",
+    StudyMatch.study_id,
+    StudyMatch.respondent_created_at.desc(),
+    StudyMatch.respondent_id.desc(),
+)
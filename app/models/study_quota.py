@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import TYPE_CHECKING
+from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.database import Base
+
+if TYPE_CHECKING:
+    from app.models.study import Study
+
+
+class StudyQuota(Base):
+    """One quota dimension of a study, e.g. gender 50/50 or a spread of age bands."""
+
+    __tablename__ = "study_quotas"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    study_id: Mapped[int] = mapped_column(ForeignKey("studies.id", ondelete="CASCADE"), index=True)
+    field_name: Mapped[str] = mapped_column(String(50))  # Respondent column, e.g. "gender", "age"
+    buckets: Mapped[list] = mapped_column(JSONB)  # [{"label": "18-34", "operator": "between", "value": [18, 34], "share": 0.4}, ...]
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    study: Mapped["Study"] = relationship("Study", back_populates="quotas")
@@ -1,3 +1,3 @@
-from app.routers import respondents, studies, assignments
+from app.routers import respondents, studies, assignments, jobs
 
-__all__ = ["respondents", "studies", "assignments"]
+__all__ = ["respondents", "studies", "assignments", "jobs"]
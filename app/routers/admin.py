@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+
+router = APIRouter()
+
+
+@router.post("/seed")
+async def seed_database(db: AsyncSession = Depends(get_db)):
+    """Seed the database with sample data (for demo purposes)."""
+    # Imported on first use so demo data stays out of normal startup
+    from app.services.seed_service import seed_sample_data
+
+    return await seed_sample_data(db)
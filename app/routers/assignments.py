@@ -1,11 +1,14 @@
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from sqlalchemy import select, update, case, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.study_assignment import StudyAssignment
 from app.schemas.study_assignment import AssignmentUpdate, AssignmentResponse
+from app.services.match_cache import ASSIGNMENTS_VERSION, bump_version
+from app.services.respondent_stats_service import RespondentStatsService
+from app.services.webhook_service import OutboxService
 
 router = APIRouter()
 
@@ -17,37 +20,65 @@ async def update_assignment(
     db: AsyncSession = Depends(get_db),
 ):
     """Update assignment status (confirm, complete, no-show, etc.)."""
-    result = await db.execute(
-        select(StudyAssignment).where(StudyAssignment.id == assignment_id)
+    # The row as it was, locked; RETURNING hands back both versions so the
+    # whole transition is one round trip
+    old = (
+        select(StudyAssignment.id, StudyAssignment.status)
+        .where(StudyAssignment.id == assignment_id)
+        .with_for_update()
+        .subquery("old")
     )
-    assignment = result.scalar_one_or_none()
-    if not assignment:
-        raise HTTPException(status_code=404, detail="Assignment not found")
-
-    # Update status
-    old_status = assignment.status
-    assignment.status = data.status
+    values = {"status": data.status}
 
     # Set timestamps based on status transitions
-    if data.status == "confirmed" and old_status != "confirmed":
-        assignment.confirmed_at = datetime.utcnow()
-    elif data.status == "completed" and old_status != "completed":
-        assignment.completed_at = datetime.utcnow()
-        if not assignment.confirmed_at:
-            assignment.confirmed_at = datetime.utcnow()
+    now = datetime.utcnow()
+    if data.status == "confirmed":
+        values["confirmed_at"] = case(
+            (old.c.status != "confirmed", now), else_=StudyAssignment.confirmed_at
+        )
+    elif data.status == "completed":
+        entering = old.c.status != "completed"
+        values["completed_at"] = case((entering, now), else_=StudyAssignment.completed_at)
+        values["confirmed_at"] = case(
+            (and_(entering, StudyAssignment.confirmed_at.is_(None)), now),
+            else_=StudyAssignment.confirmed_at,
+        )
 
     if data.notes is not None:
-        assignment.notes = data.notes
+        values["notes"] = data.notes
 
-    await db.flush()
-    await db.refresh(assignment)
+    previous_status = old.c.status.label("previous_status")
+    result = await db.execute(
+        select(StudyAssignment, previous_status)
+        .from_statement(
+            update(StudyAssignment)
+            .where(StudyAssignment.id == old.c.id)
+            .values(**values)
+            .returning(StudyAssignment, previous_status)
+        )
+        .execution_options(populate_existing=True)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    assignment, old_status = row
+
+    await RespondentStatsService(db).record_status_change(
+        assignment.respondent_id, old_status, assignment.status, assignment.completed_at
+    )
+    if old_status != assignment.status:
+        # Participation stats feed match scores
+        await bump_version(db, ASSIGNMENTS_VERSION)
+    OutboxService(db).record_assignment(
+        "assignment.updated", assignment, previous_status=old_status
+    )
     return assignment
 
 
 @router.get("/{assignment_id}", response_model=AssignmentResponse)
 async def get_assignment(
     assignment_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single assignment by ID."""
     result = await db.execute(
@@ -1,15 +1,30 @@
-from typing import Optional
+from typing import Literal, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.schemas.respondent import (
     RespondentCreate,
     RespondentUpdate,
     RespondentResponse,
     RespondentListResponse,
+    RespondentChange,
+    RespondentChangesResponse,
+    RespondentBatchResponse,
+    DuplicatePairResponse,
+    DuplicateClustersResponse,
+    DuplicateScanRequest,
+    DuplicateReview,
 )
+from app.schemas.batch import BatchGetRequest
+from app.schemas.job import JobResponse
+from app.schemas.study_assignment import RespondentHistoryResponse, RespondentStatsResponse
+from app.services.duplicate_service import DuplicateService
+from app.services.job_service import JobService
 from app.services.respondent_service import RespondentService
+from app.streaming import stream_page
+from app.services.respondent_archive_service import RespondentArchiveService
+from app.services.respondent_stats_service import RespondentStatsService
 
 router = APIRouter()
 
@@ -22,12 +37,10 @@ async def create_respondent(
     """Create a new respondent."""
     service = RespondentService(db)
 
-    # Check for duplicate email
-    existing = await service.get_by_email(data.email)
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already registered")
-
+    # Nothing comes back when the email belongs to a live or archived respondent
     respondent = await service.create(data)
+    if respondent is None:
+        raise HTTPException(status_code=400, detail="Email already registered")
     return respondent
 
 
@@ -41,7 +54,7 @@ async def list_respondents(
     household_income: Optional[str] = None,
     gender: Optional[str] = None,
     is_active: Optional[bool] = True,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """List respondents with optional filters and pagination."""
     service = RespondentService(db)
@@ -55,46 +68,179 @@ async def list_respondents(
         gender=gender,
         is_active=is_active,
     )
-    return RespondentListResponse(
-        items=respondents,
+    return stream_page(
+        [RespondentResponse.model_validate(r) for r in respondents],
         total=total,
         limit=limit,
         offset=offset,
     )
 
 
+@router.post("/batch-get", response_model=RespondentBatchResponse)
+async def batch_get_respondents(
+    data: BatchGetRequest,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Get up to 1,000 respondents by id in one request."""
+    service = RespondentService(db)
+    respondents, missing = await service.get_many(data.ids)
+    return RespondentBatchResponse(items=respondents, missing=missing)
+
+
+@router.get("/changes", response_model=RespondentChangesResponse)
+async def list_respondent_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Created, updated and soft-deleted respondents since a cursor, for incremental sync."""
+    service = RespondentService(db)
+    try:
+        respondents, next_cursor, has_more = await service.list_changes(since=since, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    changes = []
+    for respondent in respondents:
+        if not respondent.is_active:
+            changes.append(RespondentChange(id=respondent.id, op="deleted", updated_at=respondent.updated_at))
+            continue
+        data = RespondentResponse.model_validate(respondent).model_dump(mode="json", exclude_none=True)
+        changes.append(RespondentChange(
+            id=respondent.id,
+            op="created" if respondent.created_at == respondent.updated_at else "updated",
+            updated_at=respondent.updated_at,
+            data=data,
+        ))
+
+    return RespondentChangesResponse(changes=changes, next_cursor=next_cursor, has_more=has_more)
+
+
+@router.get("/duplicates", response_model=DuplicateClustersResponse)
+async def list_duplicate_clusters(
+    status: Literal["pending", "confirmed", "dismissed"] = Query("pending"),
+    min_score: float = Query(0.0, ge=0, le=1),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Groups of likely duplicate respondents from the last scans, strongest first."""
+    clusters, total = await DuplicateService(db).clusters(
+        status=status, min_score=min_score, limit=limit, offset=offset
+    )
+    ids = [rid for cluster in clusters for rid in cluster["respondent_ids"]]
+    respondents, _ = await RespondentService(db).get_many(ids)
+    by_id = {respondent.id: respondent for respondent in respondents}
+
+    items = [
+        {
+            "respondents": [by_id[rid] for rid in cluster["respondent_ids"] if rid in by_id],
+            "pairs": cluster["pairs"],
+            "max_score": cluster["max_score"],
+        }
+        for cluster in clusters
+    ]
+    return DuplicateClustersResponse(items=items, total=total, limit=limit, offset=offset)
+
+
+@router.post("/duplicates/scan", response_model=JobResponse, status_code=202)
+async def scan_duplicates(
+    data: DuplicateScanRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Queue a duplicate scan (changed respondents, or the whole pool); poll GET /api/jobs/{id}."""
+    return await JobService(db).enqueue("detect_duplicates", {"full": data.full})
+
+
+@router.patch("/duplicates/{respondent_id}/{duplicate_id}", response_model=DuplicatePairResponse)
+async def review_duplicate(
+    respondent_id: int,
+    duplicate_id: int,
+    data: DuplicateReview,
+    db: AsyncSession = Depends(get_db),
+):
+    """Confirm or dismiss a duplicate pair. Dismissed pairs stay dismissed on later scans."""
+    pair = await DuplicateService(db).review(respondent_id, duplicate_id, data.status)
+    if pair is None:
+        raise HTTPException(status_code=404, detail="Duplicate pair not found")
+    return pair
+
+
 @router.get("/{respondent_id}", response_model=RespondentResponse)
 async def get_respondent(
     respondent_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Get a single respondent by ID."""
+    """Get a single respondent by ID; archived respondents are served read-only."""
     service = RespondentService(db)
     respondent = await service.get_by_id(respondent_id)
+    if not respondent:
+        respondent = await RespondentArchiveService(db).get(respondent_id)
     if not respondent:
         raise HTTPException(status_code=404, detail="Respondent not found")
     return respondent
 
 
-@router.put("/{respondent_id}", response_model=RespondentResponse)
-async def update_respondent(
+@router.get("/{respondent_id}/assignments", response_model=RespondentHistoryResponse)
+async def get_respondent_history(
     respondent_id: int,
-    data: RespondentUpdate,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Update a respondent."""
+    """Study participation history with summary stats, newest first."""
     service = RespondentService(db)
     respondent = await service.get_by_id(respondent_id)
     if not respondent:
         raise HTTPException(status_code=404, detail="Respondent not found")
 
-    # Check email uniqueness if changing email
-    if data.email and data.email != respondent.email:
-        existing = await service.get_by_email(data.email)
-        if existing:
-            raise HTTPException(status_code=400, detail="Email already registered")
+    try:
+        assignments, next_cursor = await service.list_history(respondent_id, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    stats = RespondentStatsResponse()
+    row = await RespondentStatsService(db).get(respondent_id)
+    if row:
+        resolved = row.completed_count + row.no_show_count
+        stats = RespondentStatsResponse(
+            total_invites=row.invited_count,
+            completions=row.completed_count,
+            no_shows=row.no_show_count,
+            no_show_rate=round(row.no_show_count / resolved, 4) if resolved else None,
+            last_participation_at=row.last_participation_at,
+        )
+
+    return RespondentHistoryResponse(
+        items=assignments,
+        stats=stats,
+        respondent_id=respondent_id,
+        next_cursor=next_cursor,
+    )
+
 
-    updated = await service.update(respondent, data)
+@router.put("/{respondent_id}", response_model=RespondentResponse)
+async def update_respondent(
+    respondent_id: int,
+    data: RespondentUpdate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Update a respondent; setting is_active=true restores an archived one."""
+    service = RespondentService(db)
+    updated = await service.update(respondent_id, data)
+    if updated is None and data.is_active:
+        if await RespondentArchiveService(db).restore(respondent_id):
+            updated = await service.update(respondent_id, data)
+    if updated is None:
+        # Failure path only: tell a missing respondent from a taken email
+        if await service.get_by_id(respondent_id) is None:
+            if await RespondentArchiveService(db).get(respondent_id):
+                raise HTTPException(
+                    status_code=409,
+                    detail="Respondent is archived; set is_active=true to restore it",
+                )
+            raise HTTPException(status_code=404, detail="Respondent not found")
+        raise HTTPException(status_code=400, detail="Email already registered")
     return updated
 
 
@@ -104,10 +250,7 @@ async def delete_respondent(
     db: AsyncSession = Depends(get_db),
 ):
     """Soft delete a respondent (set is_active=false)."""
-    service = RespondentService(db)
-    respondent = await service.get_by_id(respondent_id)
-    if not respondent:
+    deleted = await RespondentService(db).soft_delete(respondent_id)
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Respondent not found")
-
-    deleted = await service.soft_delete(respondent)
     return deleted
@@ -1,27 +1,64 @@
-from typing import Optional, List
+import secrets
+from typing import Dict, Literal, Optional, List
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from sqlalchemy import select, func, any_, Integer
+from sqlalchemy.dialects.postgresql import array
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, contains_eager
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.study import Study
 from app.models.screener_criteria import ScreenerCriteria
-from app.models.study_assignment import StudyAssignment
+from app.models.study_quota import StudyQuota
+from app.models.study_assignment import StudyAssignment, StudyAssignmentKey
 from app.schemas.study import (
+    CriteriaGroup,
     StudyCreate,
     StudyUpdate,
     StudyResponse,
     StudyDetailResponse,
     StudyListResponse,
+    StudyBatchResponse,
     AssignmentCounts,
+    QuotaSelectRequest,
+    QuotaSelectionResponse,
+    EligibilityCheckRequest,
+    EligibilityCheckResponse,
 )
-from app.schemas.respondent import RespondentResponse
-from app.schemas.study_assignment import AssignmentCreate, AssignmentResponse
+from app.schemas.batch import BatchGetRequest
+from app.schemas.study_assignment import (
+    AssignmentCreate,
+    AssignmentResponse,
+    AssignmentDetailResponse,
+    StudyRosterResponse,
+)
+from app.schemas.job import JobResponse
+from app.services.job_service import JobService
 from app.services.matching_service import MatchingService
+from app.services.quota_service import QuotaSelectionService
+from app.services.respondent_stats_service import RespondentStatsService
+from app.services.study_match_service import StudyMatchService
+from app.services.webhook_service import OutboxService
+from app.services.match_cache import bump_study_versions, get_match_page
+from app.streaming import encode_dict, stream_page
 
 router = APIRouter()
 
+# Generated seeds for sort=random stay within a JSON-safe, easy-to-copy range
+RANDOM_SEED_LIMIT = 2 ** 31
+
+
+def _criteria_expression(db: AsyncSession, data: Optional[CriteriaGroup]) -> Optional[dict]:
+    """Stored form of a criteria expression; 400 if any criterion in it cannot be compiled."""
+    if data is None:
+        return None
+    expression = data.model_dump()
+    try:
+        MatchingService(db).compile_expression(expression, prune_first=False)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return expression
+
 
 @router.post("", response_model=StudyResponse, status_code=201)
 async def create_study(
@@ -38,6 +75,7 @@ async def create_study(
         status=data.status,
         start_date=data.start_date,
         end_date=data.end_date,
+        criteria_expression=_criteria_expression(db, data.criteria_expression),
     )
     db.add(study)
     await db.flush()
@@ -49,10 +87,20 @@ async def create_study(
             field_name=criterion_data.field_name,
             operator=criterion_data.operator,
             value=criterion_data.value,
+            weight=criterion_data.weight,
         )
         db.add(criterion)
 
+    for quota_data in data.quotas:
+        db.add(StudyQuota(
+            study_id=study.id,
+            field_name=quota_data.field_name,
+            buckets=[bucket.model_dump() for bucket in quota_data.buckets],
+        ))
+
     await db.flush()
+    if study.status == "recruiting":
+        await StudyMatchService(db).schedule_rebuild(study)
     await db.refresh(study)
     return study
 
@@ -63,7 +111,7 @@ async def list_studies(
     offset: int = Query(0, ge=0),
     status: Optional[str] = None,
     client_name: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """List studies with optional filters and pagination."""
     query = select(Study)
@@ -86,49 +134,46 @@ async def list_studies(
     result = await db.execute(query)
     studies = list(result.scalars().all())
 
-    return StudyListResponse(
-        items=studies,
+    return stream_page(
+        [StudyResponse.model_validate(study) for study in studies],
         total=total,
         limit=limit,
         offset=offset,
     )
 
 
-@router.get("/{study_id}", response_model=StudyDetailResponse)
-async def get_study(
-    study_id: int,
-    db: AsyncSession = Depends(get_db),
-):
-    """Get a study with criteria and assignment counts."""
-    result = await db.execute(
-        select(Study)
-        .options(selectinload(Study.criteria))
-        .where(Study.id == study_id)
-    )
-    study = result.scalar_one_or_none()
-    if not study:
-        raise HTTPException(status_code=404, detail="Study not found")
-
-    # Get assignment counts by status
+async def _assignment_counts(
+    db: AsyncSession,
+    study_ids: List[int],
+) -> Dict[int, AssignmentCounts]:
+    """Assignment counts by status for many studies in one grouped query."""
     counts_result = await db.execute(
         select(
+            StudyAssignment.study_id,
             StudyAssignment.status,
             func.count(StudyAssignment.id).label("count"),
         )
-        .where(StudyAssignment.study_id == study_id)
-        .group_by(StudyAssignment.status)
-    )
-    counts_raw = {row.status: row.count for row in counts_result}
-
-    assignment_counts = AssignmentCounts(
-        invited=counts_raw.get("invited", 0),
-        confirmed=counts_raw.get("confirmed", 0),
-        completed=counts_raw.get("completed", 0),
-        no_show=counts_raw.get("no_show", 0),
-        rejected=counts_raw.get("rejected", 0),
-        total=sum(counts_raw.values()),
+        .where(StudyAssignment.study_id == any_(array(study_ids, type_=Integer)))
+        .group_by(StudyAssignment.study_id, StudyAssignment.status)
     )
+    counts_raw: Dict[int, Dict[str, int]] = {study_id: {} for study_id in study_ids}
+    for row in counts_result:
+        counts_raw[row.study_id][row.status] = row.count
 
+    return {
+        study_id: AssignmentCounts(
+            invited=raw.get("invited", 0),
+            confirmed=raw.get("confirmed", 0),
+            completed=raw.get("completed", 0),
+            no_show=raw.get("no_show", 0),
+            rejected=raw.get("rejected", 0),
+            total=sum(raw.values()),
+        )
+        for study_id, raw in counts_raw.items()
+    }
+
+
+def _study_detail(study: Study, assignment_counts: AssignmentCounts) -> StudyDetailResponse:
     return StudyDetailResponse(
         id=study.id,
         title=study.title,
@@ -139,12 +184,55 @@ async def get_study(
         status=study.status,
         start_date=study.start_date,
         end_date=study.end_date,
+        criteria_expression=study.criteria_expression,
         created_at=study.created_at,
         criteria=study.criteria,
+        quotas=study.quotas,
         assignment_counts=assignment_counts,
     )
 
 
+@router.post("/batch-get", response_model=StudyBatchResponse)
+async def batch_get_studies(
+    data: BatchGetRequest,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Get up to 1,000 studies with criteria and assignment counts in one request."""
+    ids = list(dict.fromkeys(data.ids))
+    result = await db.execute(
+        select(Study)
+        .options(selectinload(Study.criteria), selectinload(Study.quotas))
+        .where(Study.id == any_(array(ids, type_=Integer)))
+    )
+    studies = {study.id: study for study in result.scalars().all()}
+    counts = await _assignment_counts(db, list(studies))
+
+    return StudyBatchResponse(
+        items=[_study_detail(studies[i], counts[i]) for i in ids if i in studies],
+        missing=[i for i in ids if i not in studies],
+    )
+
+
+@router.get("/{study_id}", response_model=StudyDetailResponse)
+async def get_study(
+    study_id: int,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Get a study with criteria, quotas and assignment counts."""
+    result = await db.execute(
+        select(Study)
+        .options(selectinload(Study.criteria), selectinload(Study.quotas))
+        .where(Study.id == study_id)
+    )
+    study = result.scalar_one_or_none()
+    if not study:
+        raise HTTPException(status_code=404, detail="Study not found")
+
+    # Get assignment counts by status
+    counts = await _assignment_counts(db, [study_id])
+    return _study_detail(study, counts[study_id])
+
+
 @router.put("/{study_id}", response_model=StudyResponse)
 async def update_study(
     study_id: int,
@@ -154,17 +242,24 @@ async def update_study(
     """Update a study."""
     result = await db.execute(
         select(Study)
-        .options(selectinload(Study.criteria))
+        .options(selectinload(Study.criteria), selectinload(Study.quotas))
         .where(Study.id == study_id)
     )
     study = result.scalar_one_or_none()
     if not study:
         raise HTTPException(status_code=404, detail="Study not found")
 
-    update_data = data.model_dump(exclude_unset=True, exclude={"criteria"})
+    old_status = study.status
+    update_data = data.model_dump(
+        exclude_unset=True, exclude={"criteria", "criteria_expression", "quotas"}
+    )
     for field, value in update_data.items():
         setattr(study, field, value)
 
+    expression_changed = "criteria_expression" in data.model_fields_set
+    if expression_changed:
+        study.criteria_expression = _criteria_expression(db, data.criteria_expression)
+
     # Update criteria if provided
     if data.criteria is not None:
         # Remove existing criteria
@@ -178,10 +273,32 @@ async def update_study(
                 field_name=criterion_data.field_name,
                 operator=criterion_data.operator,
                 value=criterion_data.value,
+                weight=criterion_data.weight,
             )
             db.add(criterion)
 
+    if data.criteria is not None or expression_changed:
+        await bump_study_versions(db, study.id, criteria=True)
+
+    # Replace quotas if provided
+    if data.quotas is not None:
+        for quota in study.quotas:
+            await db.delete(quota)
+        for quota_data in data.quotas:
+            db.add(StudyQuota(
+                study_id=study.id,
+                field_name=quota_data.field_name,
+                buckets=[bucket.model_dump() for bucket in quota_data.buckets],
+            ))
+
     await db.flush()
+
+    # Rematerialize matches when a recruiting study's criteria or status change
+    if "recruiting" in (old_status, study.status) and (
+        data.criteria is not None or expression_changed or old_status != study.status
+    ):
+        await StudyMatchService(db).schedule_rebuild(study)
+
     await db.refresh(study)
     return study
 
@@ -192,30 +309,154 @@ async def find_matching_respondents(
     exclude_assigned: bool = Query(True),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    sort: Literal["created", "score", "random"] = Query("created"),
+    seed: Optional[int] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Find respondents matching the study's screener criteria.
+
+    sort=created lists the newest sign-ups first; sort=score ranks by
+    preferred criteria, rest since last participation and reliability;
+    sort=random returns an approximately uniform sample, reproducible by
+    passing back the seed from the first page.
+    """
+    extra = {}
+    if sort == "random":
+        if seed is None:
+            seed = secrets.randbelow(RANDOM_SEED_LIMIT)
+        extra["seed"] = seed
+
+    page = await get_match_page(db, study_id, exclude_assigned, limit, offset, sort, seed)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Study not found")
+
+    return stream_page(
+        page["items"],
+        encode_dict,
+        total=page["total"],
+        limit=limit,
+        offset=offset,
+        study_id=study_id,
+        **extra,
+    )
+
+
+@router.post("/{study_id}/check", response_model=EligibilityCheckResponse)
+async def check_eligibility(
+    study_id: int,
+    data: EligibilityCheckRequest,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Check up to 10,000 respondents against the study's screening at once.
+
+    Each respondent passes or fails with the checks it failed: active, a
+    required criterion (by id), the criteria expression, and with
+    exclude_assigned not already being assigned. Ids with no respondent are
+    listed in missing.
+    """
+    result = await db.execute(
+        select(Study).options(selectinload(Study.criteria)).where(Study.id == study_id)
+    )
+    study = result.scalar_one_or_none()
+    if not study:
+        raise HTTPException(status_code=404, detail="Study not found")
+
+    results, missing = await MatchingService(db).check_respondents(
+        study, data.respondent_ids, exclude_assigned=data.exclude_assigned
+    )
+    return EligibilityCheckResponse(
+        study_id=study_id,
+        results=results,
+        eligible=sum(1 for r in results if r["eligible"]),
+        missing=missing,
+    )
+
+
+@router.post("/{study_id}/select", response_model=QuotaSelectionResponse)
+async def select_with_quotas(
+    study_id: int,
+    data: QuotaSelectRequest,
     db: AsyncSession = Depends(get_db),
 ):
-    """Find respondents matching the study's screener criteria."""
-    # Verify study exists
+    """
+    Pick a quota-balanced sample of matching respondents.
+
+    size defaults to the study's target_count. With assign=true the
+    selection is queued for assignment as a background job.
+    """
     result = await db.execute(select(Study).where(Study.id == study_id))
     study = result.scalar_one_or_none()
     if not study:
         raise HTTPException(status_code=404, detail="Study not found")
 
-    service = MatchingService(db)
-    respondents, total = await service.find_matching_respondents(
+    size = data.size or study.target_count
+    try:
+        respondent_ids, strata = await QuotaSelectionService(db).select(
+            study, size, exclude_assigned=data.exclude_assigned, sort=data.sort, seed=data.seed
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    job_id = None
+    if data.assign and respondent_ids:
+        job = await JobService(db).enqueue(
+            "assign_respondents",
+            {"study_id": study_id, "respondent_ids": respondent_ids, "notes": data.notes},
+            total=len(respondent_ids),
+        )
+        job_id = job.id
+
+    return QuotaSelectionResponse(
         study_id=study_id,
-        exclude_assigned=exclude_assigned,
-        limit=limit,
-        offset=offset,
+        size=size,
+        respondent_ids=respondent_ids,
+        strata=strata,
+        shortfall=size - len(respondent_ids),
+        job_id=job_id,
     )
 
-    return {
-        "items": [RespondentResponse.model_validate(r) for r in respondents],
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-        "study_id": study_id,
-    }
+
+@router.get("/{study_id}/assignments", response_model=StudyRosterResponse)
+async def list_study_assignments(
+    study_id: int,
+    status: Optional[str] = None,
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Study roster: assignments with respondent details, keyset paged by respondent id."""
+    # Walks the (study_id, respondent_id) index, merged across partitions
+    query = (
+        select(StudyAssignment)
+        .join(StudyAssignment.respondent)
+        .options(contains_eager(StudyAssignment.respondent))
+        .where(StudyAssignment.study_id == study_id)
+        .order_by(StudyAssignment.respondent_id)
+        .limit(limit + 1)
+    )
+    if status:
+        query = query.where(StudyAssignment.status == status)
+    if cursor is not None:
+        query = query.where(StudyAssignment.respondent_id > cursor)
+
+    result = await db.execute(query)
+    assignments = list(result.scalars().all())
+
+    if not assignments and cursor is None:
+        # An empty first page is the only case where the study might not exist
+        exists_result = await db.execute(select(Study.id).where(Study.id == study_id))
+        if exists_result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Study not found")
+
+    has_more = len(assignments) > limit
+    assignments = assignments[:limit]
+    return stream_page(
+        [AssignmentDetailResponse.model_validate(a) for a in assignments],
+        study_id=study_id,
+        next_cursor=assignments[-1].respondent_id if has_more else None,
+    )
 
 
 @router.post("/{study_id}/assign", response_model=List[AssignmentResponse], status_code=201)
@@ -233,14 +474,14 @@ async def assign_respondents(
 
     assignments = []
     for respondent_id in data.respondent_ids:
-        # Check if already assigned
+        # Check if already assigned (keys include detached partitions)
         existing_result = await db.execute(
-            select(StudyAssignment).where(
-                StudyAssignment.study_id == study_id,
-                StudyAssignment.respondent_id == respondent_id,
+            select(StudyAssignmentKey.study_id).where(
+                StudyAssignmentKey.study_id == study_id,
+                StudyAssignmentKey.respondent_id == respondent_id,
             )
         )
-        if existing_result.scalar_one_or_none():
+        if existing_result.scalar_one_or_none() is not None:
             continue  # Skip already assigned
 
         assignment = StudyAssignment(
@@ -252,7 +493,36 @@ async def assign_respondents(
         assignments.append(assignment)
 
     await db.flush()
+    if assignments:
+        respondent_ids = [a.respondent_id for a in assignments]
+        await bump_study_versions(db, study_id, assignments=True)
+        await RespondentStatsService(db).record_invites(respondent_ids)
+        await StudyMatchService(db).refresh_respondents(respondent_ids, participation_only=True)
+    outbox = OutboxService(db)
     for assignment in assignments:
         await db.refresh(assignment)
+        outbox.record_assignment("assignment.created", assignment)
 
     return assignments
+
+
+@router.post("/{study_id}/assign/background", response_model=JobResponse, status_code=202)
+async def assign_respondents_background(
+    study_id: int,
+    data: AssignmentCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Queue a large assignment as a background job; poll GET /api/jobs/{id}."""
+    # Verify study exists
+    result = await db.execute(select(Study).where(Study.id == study_id))
+    study = result.scalar_one_or_none()
+    if not study:
+        raise HTTPException(status_code=404, detail="Study not found")
+
+    service = JobService(db)
+    job = await service.enqueue(
+        "assign_respondents",
+        {"study_id": study_id, "respondent_ids": data.respondent_ids, "notes": data.notes},
+        total=len(data.respondent_ids),
+    )
+    return job
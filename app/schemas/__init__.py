@@ -3,8 +3,18 @@ from app.schemas.respondent import (
     RespondentUpdate,
     RespondentResponse,
     RespondentListResponse,
+    RespondentChange,
+    RespondentChangesResponse,
+    RespondentBatchResponse,
+    DuplicatePairResponse,
+    DuplicateCluster,
+    DuplicateClustersResponse,
+    DuplicateScanRequest,
+    DuplicateReview,
 )
 from app.schemas.study import (
+    CriteriaLeaf,
+    CriteriaGroup,
     ScreenerCriteriaCreate,
     ScreenerCriteriaResponse,
     StudyCreate,
@@ -12,18 +22,42 @@ from app.schemas.study import (
     StudyResponse,
     StudyDetailResponse,
     StudyListResponse,
+    StudyBatchResponse,
+    StudyQuotaCreate,
+    StudyQuotaResponse,
+    QuotaSelectRequest,
+    QuotaSelectionResponse,
+    EligibilityCheckRequest,
+    EligibilityCheckResponse,
 )
 from app.schemas.study_assignment import (
     AssignmentCreate,
     AssignmentUpdate,
     AssignmentResponse,
+    AssignmentDetailResponse,
+    StudyRosterResponse,
+    AssignmentStudyResponse,
+    RespondentStatsResponse,
+    RespondentHistoryResponse,
 )
+from app.schemas.job import JobResponse
+from app.schemas.batch import BatchGetRequest
 
 __all__ = [
     "RespondentCreate",
     "RespondentUpdate",
     "RespondentResponse",
     "RespondentListResponse",
+    "RespondentChange",
+    "RespondentChangesResponse",
+    "RespondentBatchResponse",
+    "DuplicatePairResponse",
+    "DuplicateCluster",
+    "DuplicateClustersResponse",
+    "DuplicateScanRequest",
+    "DuplicateReview",
+    "CriteriaLeaf",
+    "CriteriaGroup",
     "ScreenerCriteriaCreate",
     "ScreenerCriteriaResponse",
     "StudyCreate",
@@ -31,7 +65,21 @@ __all__ = [
     "StudyResponse",
     "StudyDetailResponse",
     "StudyListResponse",
+    "StudyBatchResponse",
+    "StudyQuotaCreate",
+    "StudyQuotaResponse",
+    "QuotaSelectRequest",
+    "QuotaSelectionResponse",
+    "EligibilityCheckRequest",
+    "EligibilityCheckResponse",
     "AssignmentCreate",
     "AssignmentUpdate",
     "AssignmentResponse",
+    "AssignmentDetailResponse",
+    "StudyRosterResponse",
+    "AssignmentStudyResponse",
+    "RespondentStatsResponse",
+    "RespondentHistoryResponse",
+    "JobResponse",
+    "BatchGetRequest",
 ]
@@ -0,0 +1,8 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+MAX_BATCH_IDS = 1000
+
+
+class BatchGetRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_IDS)
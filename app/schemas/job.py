@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional, Any
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    progress: int
+    total: Optional[int]
+    result: Optional[Any]
+    error: Optional[str]
+    cancel_requested: bool
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
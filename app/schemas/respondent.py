@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Literal
 from pydantic import BaseModel, EmailStr, Field
 
 
@@ -16,6 +16,7 @@ class RespondentBase(BaseModel):
     ethnicity: Optional[str] = Field(None, max_length=50)
     household_income: Optional[str] = Field(None, max_length=50)
     occupation: Optional[str] = Field(None, max_length=100)
+    profile: Dict[str, Any] = Field(default_factory=dict)  # custom attributes, e.g. {"pets": ["dog"]}
 
 
 class RespondentCreate(RespondentBase):
@@ -35,6 +36,7 @@ class RespondentUpdate(BaseModel):
     ethnicity: Optional[str] = Field(None, max_length=50)
     household_income: Optional[str] = Field(None, max_length=50)
     occupation: Optional[str] = Field(None, max_length=100)
+    profile: Optional[Dict[str, Any]] = None  # replaces the whole profile
     is_active: Optional[bool] = None
 
 
@@ -43,6 +45,7 @@ class RespondentResponse(RespondentBase):
     is_active: bool
     created_at: datetime
     updated_at: datetime
+    archived_at: Optional[datetime] = None  # set on read-only archived rows
 
     class Config:
         from_attributes = True
@@ -53,3 +56,55 @@ class RespondentListResponse(BaseModel):
     total: int
     limit: int
     offset: int
+
+
+class RespondentChange(BaseModel):
+    id: int
+    op: Literal["created", "updated", "deleted"]
+    updated_at: datetime
+    data: Optional[dict] = None  # non-null fields; omitted for deletes
+
+
+class RespondentChangesResponse(BaseModel):
+    changes: List[RespondentChange]
+    next_cursor: Optional[str]
+    has_more: bool
+
+
+class RespondentBatchResponse(BaseModel):
+    items: List[RespondentResponse]  # in request order, duplicates collapsed
+    missing: List[int]
+
+
+class DuplicatePairResponse(BaseModel):
+    respondent_id: int
+    duplicate_id: int
+    score: float
+    reasons: List[str]
+    status: str
+    detected_at: datetime
+    reviewed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class DuplicateCluster(BaseModel):
+    respondents: List[RespondentResponse]
+    pairs: List[DuplicatePairResponse]  # strongest first
+    max_score: float
+
+
+class DuplicateClustersResponse(BaseModel):
+    items: List[DuplicateCluster]
+    total: int
+    limit: int
+    offset: int
+
+
+class DuplicateScanRequest(BaseModel):
+    full: bool = False  # rescan the whole pool instead of changes since the last scan
+
+
+class DuplicateReview(BaseModel):
+    status: Literal["pending", "confirmed", "dismissed"]
@@ -1,13 +1,111 @@
+import re
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, List, Any, Literal
-from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Literal, Union
+from pydantic import BaseModel, Field, field_validator, model_validator
 
+# "profile.<key>[.<key>...]" addresses a Respondent.profile attribute
+PROFILE_FIELD = re.compile(r"^profile(\.[A-Za-z_][A-Za-z0-9_]*)+$")
+# Operators only meaningful on profile attributes
+PROFILE_OPERATORS = ("contains", "exists")
+# Pseudo-field for past-participation rules and the operators it takes
+PARTICIPATION_FIELD = "participation"
+PARTICIPATION_OPERATORS = ("not_in_studies", "not_with_client")
 
-class ScreenerCriteriaBase(BaseModel):
-    field_name: str = Field(..., max_length=50)
-    operator: Literal["eq", "neq", "gte", "lte", "in", "between"]
-    value: Any  # Can be string, number, or list
+
+def check_field_operator(field_name: str, operator: str) -> None:
+    if field_name.startswith("profile.") and not PROFILE_FIELD.match(field_name):
+        raise ValueError("profile fields must look like profile.<key> (letters, digits, _)")
+    if operator in PROFILE_OPERATORS and not field_name.startswith("profile."):
+        raise ValueError(f"operator {operator!r} only applies to profile.<key> fields")
+    if (field_name == PARTICIPATION_FIELD) != (operator in PARTICIPATION_OPERATORS):
+        raise ValueError(
+            f"the {PARTICIPATION_FIELD} field takes exactly the operators {', '.join(PARTICIPATION_OPERATORS)}"
+        )
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def check_participation_value(operator: str, value) -> None:
+    """
+    not_in_studies takes study ids; not_with_client a client name and an
+    optional window in days (without one, any past study for the client counts).
+    """
+    if operator == "not_in_studies":
+        if not isinstance(value, list) or not value or not all(_is_int(v) for v in value):
+            raise ValueError("not_in_studies takes a non-empty list of study ids")
+    elif operator == "not_with_client":
+        within_days = value.get("within_days") if isinstance(value, dict) else None
+        if (
+            not isinstance(value, dict)
+            or "client_name" not in value
+            or not set(value) <= {"client_name", "within_days"}
+            or not isinstance(value["client_name"], str)
+            or not value["client_name"].strip()
+            or (within_days is not None and (not _is_int(within_days) or within_days < 1))
+        ):
+            raise ValueError(
+                'not_with_client takes {"client_name": <name>} and optionally '
+                '"within_days": <positive integer>'
+            )
+
+
+class CriteriaLeaf(BaseModel):
+    field_name: str = Field(..., max_length=50)  # Respondent column, profile.<key> or participation
+    operator: Literal[
+        "eq", "neq", "gte", "lte", "in", "between",
+        "contains", "exists",
+        "not_in_studies", "not_with_client",
+    ]
+    value: Any  # Can be string, number, list, or object for participation rules
+
+    @model_validator(mode="after")
+    def check_operator(self) -> "CriteriaLeaf":
+        check_field_operator(self.field_name, self.operator)
+        if self.field_name == PARTICIPATION_FIELD:
+            check_participation_value(self.operator, self.value)
+        return self
+
+
+# Bounds a criteria expression's size and nesting
+MAX_EXPRESSION_LEAVES = 100
+MAX_EXPRESSION_DEPTH = 8
+
+
+class CriteriaGroup(BaseModel):
+    """AND / OR / NOT over criteria and nested groups; NOT takes one child."""
+
+    op: Literal["and", "or", "not"]
+    children: List[Union["CriteriaGroup", CriteriaLeaf]] = Field(..., min_length=1)
+
+    @model_validator(mode="after")
+    def check_shape(self) -> "CriteriaGroup":
+        if self.op == "not" and len(self.children) != 1:
+            raise ValueError("a not group takes exactly one child")
+        leaves, depth = self.size()
+        if leaves > MAX_EXPRESSION_LEAVES:
+            raise ValueError(f"criteria expressions are limited to {MAX_EXPRESSION_LEAVES} criteria")
+        if depth > MAX_EXPRESSION_DEPTH:
+            raise ValueError(f"criteria expressions are limited to {MAX_EXPRESSION_DEPTH} levels")
+        return self
+
+    def size(self) -> tuple:
+        """(number of criteria, nesting depth)"""
+        leaves, depth = 0, 0
+        for child in self.children:
+            if isinstance(child, CriteriaGroup):
+                child_leaves, child_depth = child.size()
+                leaves += child_leaves
+                depth = max(depth, child_depth)
+            else:
+                leaves += 1
+        return leaves, depth + 1
+
+
+class ScreenerCriteriaBase(CriteriaLeaf):
+    weight: Optional[float] = Field(None, gt=0)  # preferred criterion: scored, not required
 
 
 class ScreenerCriteriaCreate(ScreenerCriteriaBase):
@@ -23,6 +121,46 @@ class ScreenerCriteriaResponse(ScreenerCriteriaBase):
         from_attributes = True
 
 
+class QuotaBucket(BaseModel):
+    label: str = Field(..., max_length=50)
+    operator: Literal["eq", "neq", "gte", "lte", "in", "between", "contains", "exists"]
+    value: Any
+    share: float = Field(..., gt=0, le=1)  # fraction of the selection
+
+
+class StudyQuotaBase(BaseModel):
+    field_name: str = Field(..., max_length=50)
+    buckets: List[QuotaBucket] = Field(..., min_length=1)
+
+    @field_validator("buckets")
+    @classmethod
+    def check_buckets(cls, buckets: List[QuotaBucket]) -> List[QuotaBucket]:
+        if abs(sum(bucket.share for bucket in buckets) - 1) > 0.001:
+            raise ValueError("bucket shares must sum to 1")
+        if len({bucket.label for bucket in buckets}) != len(buckets):
+            raise ValueError("bucket labels must be unique")
+        return buckets
+
+    @model_validator(mode="after")
+    def check_operators(self) -> "StudyQuotaBase":
+        for bucket in self.buckets:
+            check_field_operator(self.field_name, bucket.operator)
+        return self
+
+
+class StudyQuotaCreate(StudyQuotaBase):
+    pass
+
+
+class StudyQuotaResponse(StudyQuotaBase):
+    id: int
+    study_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class StudyBase(BaseModel):
     title: str = Field(..., max_length=255)
     client_name: str = Field(..., max_length=255)
@@ -36,6 +174,8 @@ class StudyBase(BaseModel):
 class StudyCreate(StudyBase):
     status: Literal["draft", "recruiting", "in_field", "completed"] = "draft"
     criteria: List[ScreenerCriteriaCreate] = []
+    criteria_expression: Optional[CriteriaGroup] = None  # ANDed with criteria
+    quotas: List[StudyQuotaCreate] = []
 
 
 class StudyUpdate(BaseModel):
@@ -48,11 +188,14 @@ class StudyUpdate(BaseModel):
     start_date: Optional[date] = None
     end_date: Optional[date] = None
     criteria: Optional[List[ScreenerCriteriaCreate]] = None
+    criteria_expression: Optional[CriteriaGroup] = None  # explicit null removes it
+    quotas: Optional[List[StudyQuotaCreate]] = None
 
 
 class StudyResponse(StudyBase):
     id: int
     status: str
+    criteria_expression: Optional[CriteriaGroup] = None
     created_at: datetime
 
     class Config:
@@ -70,6 +213,7 @@ class AssignmentCounts(BaseModel):
 
 class StudyDetailResponse(StudyResponse):
     criteria: List[ScreenerCriteriaResponse] = []
+    quotas: List[StudyQuotaResponse] = []
     assignment_counts: AssignmentCounts = AssignmentCounts()
 
 
@@ -78,3 +222,59 @@ class StudyListResponse(BaseModel):
     total: int
     limit: int
     offset: int
+
+
+class StudyBatchResponse(BaseModel):
+    items: List[StudyDetailResponse]  # in request order, duplicates collapsed
+    missing: List[int]
+
+
+class QuotaSelectRequest(BaseModel):
+    size: Optional[int] = Field(None, ge=1, le=5000)  # defaults to the study's target_count
+    exclude_assigned: bool = True
+    sort: Literal["created", "score", "random"] = "created"  # who goes first within a stratum
+    seed: int = Field(0, ge=0)  # sort=random: same seed, same selection
+    assign: bool = False  # queue an assignment job for the selection
+    notes: Optional[str] = None
+
+
+class QuotaStratum(BaseModel):
+    buckets: Dict[str, str]  # field_name -> bucket label
+    target: int
+    selected: int
+
+
+class QuotaSelectionResponse(BaseModel):
+    study_id: int
+    size: int
+    respondent_ids: List[int]
+    strata: List[QuotaStratum]
+    shortfall: int  # size - len(respondent_ids)
+    job_id: Optional[int] = None
+
+
+MAX_CHECK_IDS = 10000
+
+
+class EligibilityCheckRequest(BaseModel):
+    respondent_ids: List[int] = Field(..., min_length=1, max_length=MAX_CHECK_IDS)
+    exclude_assigned: bool = False  # also fail respondents already assigned to the study
+
+
+class FailedCheck(BaseModel):
+    check: Literal["active", "criterion", "criteria_expression", "not_assigned"]
+    criterion_id: Optional[int] = None  # for check="criterion"
+    field_name: Optional[str] = None
+
+
+class EligibilityResult(BaseModel):
+    respondent_id: int
+    eligible: bool
+    failed: List[FailedCheck] = []
+
+
+class EligibilityCheckResponse(BaseModel):
+    study_id: int
+    results: List[EligibilityResult]  # in request order, duplicates collapsed
+    eligible: int
+    missing: List[int]  # ids with no respondent
@@ -3,6 +3,7 @@ from typing import Optional, List, Literal
 from pydantic import BaseModel, Field
 
 from app.schemas.respondent import RespondentResponse
+from app.schemas.study import StudyResponse
 
 
 class AssignmentBase(BaseModel):
@@ -34,3 +35,28 @@ class AssignmentResponse(BaseModel):
 
 class AssignmentDetailResponse(AssignmentResponse):
     respondent: RespondentResponse
+
+
+class StudyRosterResponse(BaseModel):
+    items: List[AssignmentDetailResponse]
+    study_id: int
+    next_cursor: Optional[int]  # pass back as ?cursor= for the next page
+
+
+class AssignmentStudyResponse(AssignmentResponse):
+    study: StudyResponse
+
+
+class RespondentStatsResponse(BaseModel):
+    total_invites: int = 0
+    completions: int = 0
+    no_shows: int = 0
+    no_show_rate: Optional[float] = None  # no_shows / (completions + no_shows)
+    last_participation_at: Optional[datetime] = None
+
+
+class RespondentHistoryResponse(BaseModel):
+    items: List[AssignmentStudyResponse]
+    stats: RespondentStatsResponse
+    respondent_id: int
+    next_cursor: Optional[str]
@@ -1,4 +1,14 @@
 from app.services.respondent_service import RespondentService
 from app.services.matching_service import MatchingService
+from app.services.job_service import JobService, job_runner
+from app.services.webhook_service import OutboxService, webhook_dispatcher
+from app.services import bulk_jobs  # noqa: F401  (registers job handlers)
 
-__all__ = ["RespondentService", "MatchingService"]
+__all__ = [
+    "RespondentService",
+    "MatchingService",
+    "JobService",
+    "job_runner",
+    "OutboxService",
+    "webhook_dispatcher",
+]
@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.models.respondent import Respondent
+from app.models.study import Study
+from app.models.study_assignment import StudyAssignment, StudyAssignmentKey
+from app.services.duplicate_service import DuplicateService
+from app.services.job_service import JobContext, job_handler, job_runner
+from app.services.match_cache import bump_study_versions
+from app.services.partition_service import AssignmentPartitionService
+from app.services.respondent_stats_service import RespondentStatsService
+from app.services.study_match_service import StudyMatchService
+from app.services.webhook_service import OutboxService
+
+ASSIGN_CHUNK_SIZE = 500
+DUPLICATE_CHUNK_SIZE = 1000
+
+
+@job_handler("assign_respondents")
+async def assign_respondents_job(ctx: JobContext, params: dict) -> Optional[dict]:
+    """
+    Assign a large list of respondents to a study in chunks.
+
+    Each chunk runs in its own short transaction, so the job never holds a
+    pooled connection for longer than one chunk and can be cancelled between
+    chunks. Ids of missing or inactive respondents are skipped and listed
+    in the result as invalid.
+    """
+    study_id = params["study_id"]
+    respondent_ids = list(dict.fromkeys(params["respondent_ids"]))
+    notes = params.get("notes")
+    created = 0
+    invalid = []
+
+    async with ctx.session() as session:
+        study_result = await session.execute(select(Study.id).where(Study.id == study_id))
+        if study_result.scalar_one_or_none() is None:
+            raise ValueError(f"Study {study_id} not found")
+
+    await ctx.report(0, total=len(respondent_ids))
+
+    for start in range(0, len(respondent_ids), ASSIGN_CHUNK_SIZE):
+        chunk = respondent_ids[start:start + ASSIGN_CHUNK_SIZE]
+        async with ctx.session() as session:
+            valid_result = await session.execute(
+                select(Respondent.id).where(
+                    Respondent.id.in_(chunk),
+                    Respondent.is_active == True,
+                )
+            )
+            valid = set(valid_result.scalars().all())
+            invalid.extend(rid for rid in chunk if rid not in valid)
+
+            # Keys include assignments in detached partitions
+            existing_result = await session.execute(
+                select(StudyAssignmentKey.respondent_id).where(
+                    StudyAssignmentKey.study_id == study_id,
+                    StudyAssignmentKey.respondent_id.in_(chunk),
+                )
+            )
+            existing = set(existing_result.scalars().all())
+
+            new_ids = [rid for rid in chunk if rid in valid and rid not in existing]
+            assignments = [
+                StudyAssignment(
+                    study_id=study_id,
+                    respondent_id=respondent_id,
+                    status="invited",
+                    confirmed_at=None,
+                    completed_at=None,
+                    notes=notes,
+                )
+                for respondent_id in new_ids
+            ]
+            session.add_all(assignments)
+            if new_ids:
+                await session.flush()
+                outbox = OutboxService(session)
+                for assignment in assignments:
+                    outbox.record_assignment("assignment.created", assignment)
+                await bump_study_versions(session, study_id, assignments=True)
+                await RespondentStatsService(session).record_invites(new_ids)
+                await StudyMatchService(session).refresh_respondents(new_ids, participation_only=True)
+            await session.commit()
+            created += len(new_ids)
+
+        await ctx.report(start + len(chunk))
+
+    return {
+        "created": created,
+        "skipped": len(respondent_ids) - created - len(invalid),
+        "invalid": invalid,
+    }
+
+
+# Respondent writes that commit while a rebuild's snapshot is being taken
+# are re-applied by the catch-up pass.
+REBUILD_CATCH_UP = timedelta(minutes=1)
+
+
+@job_handler("rebuild_study_matches")
+async def rebuild_study_matches_job(ctx: JobContext, params: dict) -> Optional[dict]:
+    """Recompute the study_matches rows for one study."""
+    study_id = params["study_id"]
+    started = datetime.utcnow()
+
+    async with ctx.session() as session:
+        count = await StudyMatchService(session).rebuild_study(study_id)
+        await session.commit()
+
+    async with ctx.session() as session:
+        changed_result = await session.execute(
+            select(Respondent.id).where(Respondent.updated_at >= started - REBUILD_CATCH_UP)
+        )
+        changed = list(changed_result.scalars().all())
+        await StudyMatchService(session).refresh_respondents(changed)
+        await session.commit()
+
+    return {"study_id": study_id, "matches": count, "caught_up": len(changed)}
+
+
+@job_handler("detect_duplicates")
+async def detect_duplicates_job(ctx: JobContext, params: dict) -> Optional[dict]:
+    """
+    Find likely duplicate respondents.
+
+    A full scan rebuilds every block key, drops all pending pairs and scores
+    the pool in id chunks (each pair once, from its lower id). Otherwise only
+    respondents changed since the last successful scan are re-keyed and
+    rescored against the whole pool; with no earlier scan it runs as full.
+    """
+    full = params.get("full", False)
+
+    async with ctx.session() as session:
+        service = DuplicateService(session)
+        since = None if full else await service.last_scan_started()
+        if since is None:
+            full = True
+            await service.refresh_block_keys()
+            await service.clear_pending()
+            id_query = select(Respondent.id).where(Respondent.is_active == True)
+        else:
+            id_query = select(Respondent.id).where(Respondent.updated_at >= since - REBUILD_CATCH_UP)
+        ids_result = await session.execute(id_query.order_by(Respondent.id))
+        respondent_ids = list(ids_result.scalars().all())
+        await session.commit()
+
+    await ctx.report(0, total=len(respondent_ids))
+    pairs = 0
+    for start in range(0, len(respondent_ids), DUPLICATE_CHUNK_SIZE):
+        chunk = respondent_ids[start:start + DUPLICATE_CHUNK_SIZE]
+        async with ctx.session() as session:
+            service = DuplicateService(session)
+            if not full:
+                await service.refresh_block_keys(chunk)
+            pairs += await service.score_respondents(chunk, lower_only=full)
+            await session.commit()
+        await ctx.report(start + len(chunk))
+
+    return {
+        "full": full,
+        "respondents": len(respondent_ids),
+        "pairs": pairs,
+    }
+
+
+@job_handler("maintain_partitions")
+async def maintain_partitions_job(ctx: JobContext, params: dict) -> Optional[dict]:
+    """Create upcoming study_assignments partitions and detach expired ones."""
+    async with ctx.session() as session:
+        created, detached = await AssignmentPartitionService(session).maintain(
+            params.get("months_ahead", 3), params.get("retain_months")
+        )
+        await session.commit()
+    return {"created": created, "detached": detached}
+
+
+settings = get_settings()
+
+if settings.assignment_partition_maintenance_hours > 0:
+    job_runner.schedule(
+        "maintain_partitions",
+        {
+            "months_ahead": settings.assignment_partition_months_ahead,
+            "retain_months": settings.assignment_partition_retain_months,
+        },
+        settings.assignment_partition_maintenance_hours * 3600,
+    )
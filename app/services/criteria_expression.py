@@ -0,0 +1,258 @@
+"""
+Boolean criteria expressions: AND / OR / NOT trees over screener criteria.
+
+A tree is stored as JSON on Study.criteria_expression. Groups look like
+{"op": "and" | "or" | "not", "children": [...]}; leaves are criteria,
+{"field_name", "operator", "value"}, with the same meaning as in the flat
+criteria list. The flat required criteria and the tree are ANDed together.
+
+This module does the database-free work: pruning branches that can never
+match (so a contradictory study returns no rows without a query) and
+estimating selectivity to order evaluation.
+"""
+from collections import namedtuple
+from typing import Iterator, List, Optional
+
+# Pseudo-field for criteria that filter on past participation rather than
+# on a Respondent column, e.g. "not in studies 12, 15 or 19".
+PARTICIPATION_FIELD = "participation"
+
+# Duck-types ScreenerCriteria for the matching service's per-criterion helpers
+Leaf = namedtuple("Leaf", ["field_name", "operator", "value"])
+
+# Rough share of respondents passing a criterion, when nothing better is known
+OPERATOR_SELECTIVITY = {
+    "eq": 0.1,
+    "neq": 0.9,
+    "gte": 0.5,
+    "lte": 0.5,
+    "between": 0.3,
+    "contains": 0.2,
+    "exists": 0.5,
+    "not_in_studies": 0.95,
+    "not_with_client": 0.9,
+}
+IN_VALUE_SELECTIVITY = 0.1
+
+# Known spread of numeric columns, for range estimates
+FIELD_RANGES = {"age": (18, 90)}
+
+
+def is_group(node: dict) -> bool:
+    return "op" in node
+
+
+def leaf(node: dict) -> Leaf:
+    return Leaf(node["field_name"], node["operator"], node.get("value"))
+
+
+def leaves(node: Optional[dict]) -> Iterator[Leaf]:
+    """Every criterion in a tree, depth first."""
+    if node is None:
+        return
+    if is_group(node):
+        for child in node["children"]:
+            yield from leaves(child)
+    else:
+        yield leaf(node)
+
+
+def screening_tree(criteria_list, expression: Optional[dict]) -> dict:
+    """One AND tree for a study's required criteria plus its expression."""
+    children = [
+        {"field_name": c.field_name, "operator": c.operator, "value": c.value}
+        for c in criteria_list
+    ]
+    if expression is not None:
+        children.append(expression)
+    return {"op": "and", "children": children}
+
+
+def prune(node: dict) -> Optional[dict]:
+    """
+    The tree without branches that can never match, or None if nothing can.
+
+    An AND is impossible when any child is, or when its criteria on one
+    field contradict each other (between [50, 60] with lte 30, eq "NY" with
+    in ["CA", "TX"]). An OR keeps only its possible children. A NOT is kept
+    as it is unless its child is impossible, when it always holds.
+    """
+    if not is_group(node):
+        return None if _leaf_impossible(leaf(node)) else node
+
+    op = node["op"]
+    if op == "not":
+        if prune(node["children"][0]) is None:
+            # NOT of something impossible always holds
+            return {"op": "and", "children": []}
+        return node
+
+    children = [prune(child) for child in node["children"]]
+    if op == "or":
+        children = [child for child in children if child is not None]
+        if not children:
+            return None
+        return children[0] if len(children) == 1 else {"op": "or", "children": children}
+
+    if any(child is None for child in children):
+        return None
+    if _contradicts(_and_leaves(children)):
+        return None
+    return {"op": "and", "children": children}
+
+
+def is_time_windowed(criterion) -> bool:
+    """A participation rule whose outcome expires ("with this client in the last N days")."""
+    return (
+        criterion.field_name == PARTICIPATION_FIELD
+        and criterion.operator == "not_with_client"
+        and isinstance(criterion.value, dict)
+        and criterion.value.get("within_days") is not None
+    )
+
+
+def has_time_window(node: Optional[dict]) -> bool:
+    return any(is_time_windowed(criterion) for criterion in leaves(node))
+
+
+def needs_database(node: Optional[dict]) -> bool:
+    """Participation criteria are checked against assignment history."""
+    return any(criterion.field_name == PARTICIPATION_FIELD for criterion in leaves(node))
+
+
+def order_children(node: dict) -> List[dict]:
+    """
+    A group's children in evaluation order: an AND tries the most selective
+    first and an OR the least, so either settles as early as possible.
+    Branches needing a database query go last.
+    """
+    sign = -1 if node["op"] == "or" else 1
+    return sorted(
+        node["children"],
+        key=lambda child: (needs_database(child), sign * estimate_selectivity(child)),
+    )
+
+
+def estimate_selectivity(node: dict) -> float:
+    """Estimated fraction of respondents a (sub)tree lets through, 0..1."""
+    if is_group(node):
+        parts = [estimate_selectivity(child) for child in node["children"]]
+        if node["op"] == "not":
+            return 1 - parts[0]
+        if node["op"] == "or":
+            miss = 1.0
+            for part in parts:
+                miss *= 1 - part
+            return 1 - miss
+        passing = 1.0
+        for part in parts:
+            passing *= part
+        return passing
+    return _leaf_selectivity(leaf(node))
+
+
+def _leaf_selectivity(criterion: Leaf) -> float:
+    operator, value = criterion.operator, criterion.value
+    if operator == "in":
+        count = len(value) if isinstance(value, list) else 1
+        return min(0.9, IN_VALUE_SELECTIVITY * count)
+    if operator == "exists" and value is False:
+        return 1 - OPERATOR_SELECTIVITY["exists"]
+
+    spread = FIELD_RANGES.get(criterion.field_name)
+    if spread is not None and operator in ("gte", "lte", "between"):
+        low, high = spread
+        try:
+            if operator == "gte":
+                share = (high - value) / (high - low)
+            elif operator == "lte":
+                share = (value - low) / (high - low)
+            else:
+                share = (value[1] - value[0]) / (high - low)
+            return min(1.0, max(0.01, share))
+        except (TypeError, IndexError):
+            pass
+    return OPERATOR_SELECTIVITY.get(operator, 0.5)
+
+
+def _and_leaves(children: List[dict]) -> List[Leaf]:
+    """Leaves that all have to hold: direct children and nested ANDs."""
+    found = []
+    for child in children:
+        if not is_group(child):
+            found.append(leaf(child))
+        elif child["op"] == "and":
+            found.extend(_and_leaves(child["children"]))
+    return found
+
+
+def _leaf_impossible(criterion: Leaf) -> bool:
+    if criterion.operator == "in":
+        return isinstance(criterion.value, list) and not criterion.value
+    if criterion.operator == "between":
+        value = criterion.value
+        try:
+            return isinstance(value, list) and len(value) == 2 and value[0] > value[1]
+        except TypeError:
+            return False
+    return False
+
+
+def _contradicts(criteria: List[Leaf]) -> bool:
+    """
+    True if value criteria on some column cannot all hold at once.
+
+    profile.<key> fields are left alone: lax jsonpath tests each element of
+    an array value, so gte 50 and lte 30 both hold for [60, 20].
+    """
+    by_field = {}
+    for criterion in criteria:
+        if criterion.field_name.startswith("profile."):
+            continue
+        by_field.setdefault(criterion.field_name, []).append(criterion)
+
+    for field_criteria in by_field.values():
+        try:
+            if _field_contradicts(field_criteria):
+                return True
+        except TypeError:
+            # Unhashable or mutually incomparable values: no verdict
+            continue
+    return False
+
+
+def _field_contradicts(criteria: List[Leaf]) -> bool:
+    low = high = None
+    allowed = None
+    excluded = set()
+
+    for criterion in criteria:
+        operator, value = criterion.operator, criterion.value
+        if operator == "eq":
+            values = {value}
+        elif operator == "in":
+            values = set(value) if isinstance(value, list) else {value}
+        else:
+            values = None
+        if values is not None:
+            allowed = values if allowed is None else allowed & values
+        elif operator == "neq":
+            excluded.add(value)
+        elif operator == "gte":
+            low = value if low is None else max(low, value)
+        elif operator == "lte":
+            high = value if high is None else min(high, value)
+        elif operator == "between" and isinstance(value, list) and len(value) == 2:
+            low = value[0] if low is None else max(low, value[0])
+            high = value[1] if high is None else min(high, value[1])
+
+    if low is not None and high is not None and low > high:
+        return True
+    if allowed is None:
+        return False
+    return not any(
+        value not in excluded
+        and (low is None or value >= low)
+        and (high is None or value <= high)
+        for value in allowed
+    )
@@ -0,0 +1,304 @@
+import re
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import (
+    select, delete, func, and_, or_, any_, literal, union_all, true, Integer, String,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.config import get_settings
+from app.models.job import Job
+from app.models.respondent import Respondent
+from app.models.respondent_duplicate import RespondentBlockKey, RespondentDuplicate
+
+# Field -> weight in the similarity score; fields missing on either side are
+# left out and the remaining weights rescaled
+FEATURE_WEIGHTS = {
+    "phone": 0.30,
+    "email_local": 0.20,
+    "last_name": 0.15,
+    "first_name": 0.15,
+    "zip_code": 0.10,
+    "age": 0.05,
+    "city": 0.05,
+}
+
+# A feature at or above this agreement is listed as a reason for the match
+REASON_THRESHOLD = 0.85
+
+_phone_digits = func.right(func.regexp_replace(Respondent.phone, r"\D", "", "g"), 10)
+_email_local = func.replace(
+    func.lower(func.split_part(func.split_part(Respondent.email, "@", 1), "+", 1)), ".", ""
+)
+
+# Block kind -> (SQL key expression, condition for having a key). Must agree
+# with the Python normalizers below.
+BLOCK_KEYS = {
+    "phone": (_phone_digits, func.length(_phone_digits) >= 7),
+    "name_zip": (
+        func.lower(func.trim(Respondent.last_name)) + "|" + func.left(Respondent.zip_code, 5),
+        and_(Respondent.zip_code.is_not(None), func.trim(Respondent.last_name) != ""),
+    ),
+    "email_local": (_email_local, _email_local != ""),
+}
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    digits = re.sub(r"\D", "", phone or "")[-10:]
+    return digits if len(digits) >= 7 else None
+
+
+def normalize_email_local(email: Optional[str]) -> Optional[str]:
+    local = (email or "").split("@", 1)[0].split("+", 1)[0].replace(".", "").lower()
+    return local or None
+
+
+def _text(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip().lower()
+    return value or None
+
+
+def _exact(a, b) -> Optional[float]:
+    if a is None or b is None:
+        return None
+    return 1.0 if a == b else 0.0
+
+
+def _fuzzy(a: Optional[str], b: Optional[str]) -> Optional[float]:
+    a, b = _text(a), _text(b)
+    if a is None or b is None:
+        return None
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def similarity(a: Respondent, b: Respondent) -> Tuple[float, List[str]]:
+    """Weighted field agreement between two respondents (0..1) and the fields that agree."""
+    features = {
+        "phone": _exact(normalize_phone(a.phone), normalize_phone(b.phone)),
+        "email_local": _exact(normalize_email_local(a.email), normalize_email_local(b.email)),
+        "last_name": _fuzzy(a.last_name, b.last_name),
+        "first_name": _fuzzy(a.first_name, b.first_name),
+        "zip_code": _exact(a.zip_code and a.zip_code[:5], b.zip_code and b.zip_code[:5]),
+        "age": None if a.age is None or b.age is None else float(abs(a.age - b.age) <= 1),
+        "city": _exact(_text(a.city), _text(b.city)),
+    }
+    known = {name: value for name, value in features.items() if value is not None}
+    weight = sum(FEATURE_WEIGHTS[name] for name in known)
+    if not weight:
+        return 0.0, []
+    score = sum(FEATURE_WEIGHTS[name] * value for name, value in known.items()) / weight
+    reasons = [name for name, value in known.items() if value >= REASON_THRESHOLD]
+    return round(score, 4), reasons
+
+
+class DuplicateService:
+    """
+    Finds likely duplicate respondents without comparing every pair.
+
+    Each active respondent gets a few blocking keys (normalised phone, last
+    name + ZIP, email local part). Only respondents sharing a key are scored
+    against each other, and oversized blocks (e.g. an "info" email local
+    part) are skipped. Pairs scoring at least duplicate_min_score are kept
+    for review and grouped into clusters on read.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.settings = get_settings()
+
+    async def refresh_block_keys(self, respondent_ids: Optional[List[int]] = None) -> None:
+        """Recompute block keys for some respondents, or all when ids is None; inactive ones get none."""
+        clear = delete(RespondentBlockKey)
+        if respondent_ids is not None:
+            clear = clear.where(RespondentBlockKey.respondent_id == any_(_ids(respondent_ids)))
+        await self.db.execute(clear)
+
+        selects = []
+        for kind, (expression, has_key) in BLOCK_KEYS.items():
+            query = select(Respondent.id, literal(kind, String), expression).where(
+                Respondent.is_active == true(), has_key
+            )
+            if respondent_ids is not None:
+                query = query.where(Respondent.id == any_(_ids(respondent_ids)))
+            selects.append(query)
+        await self.db.execute(
+            insert(RespondentBlockKey).from_select(
+                ["respondent_id", "kind", "key"], union_all(*selects)
+            )
+        )
+
+    async def candidate_pairs(
+        self,
+        respondent_ids: List[int],
+        lower_only: bool = False,
+    ) -> Set[Tuple[int, int]]:
+        """
+        (low id, high id) pairs sharing a block with any of these respondents.
+
+        With lower_only, only pairs where the given respondent has the lower
+        id are returned, so a full pass over all ids yields each pair once.
+        """
+        a = aliased(RespondentBlockKey, name="a")
+        b = aliased(RespondentBlockKey, name="b")
+        c = aliased(RespondentBlockKey, name="c")
+        block_size = (
+            select(func.count())
+            .where(c.kind == a.kind, c.key == a.key)
+            .scalar_subquery()
+        )
+        query = (
+            select(a.respondent_id, b.respondent_id)
+            .select_from(a)
+            .join(b, and_(b.kind == a.kind, b.key == a.key, b.respondent_id != a.respondent_id))
+            .where(
+                a.respondent_id == any_(_ids(respondent_ids)),
+                block_size <= self.settings.duplicate_max_block_size,
+            )
+            .distinct()
+        )
+        if lower_only:
+            query = query.where(b.respondent_id > a.respondent_id)
+        result = await self.db.execute(query)
+        return {(min(x, y), max(x, y)) for x, y in result.all()}
+
+    async def score_respondents(self, respondent_ids: List[int], lower_only: bool = False) -> int:
+        """
+        Score the candidate pairs of these respondents and store those over
+        the threshold. Returns the number of pairs stored.
+
+        Unless lower_only is set, their earlier pending pairs are dropped
+        first, so pairs that no longer match disappear. Reviewed pairs keep
+        their status and only get a fresh score.
+        """
+        if not lower_only:
+            await self.db.execute(
+                delete(RespondentDuplicate).where(
+                    RespondentDuplicate.status == "pending",
+                    or_(
+                        RespondentDuplicate.respondent_id == any_(_ids(respondent_ids)),
+                        RespondentDuplicate.duplicate_id == any_(_ids(respondent_ids)),
+                    ),
+                )
+            )
+
+        pairs = await self.candidate_pairs(respondent_ids, lower_only)
+        if not pairs:
+            return 0
+
+        member_ids = sorted({rid for pair in pairs for rid in pair})
+        result = await self.db.execute(
+            select(Respondent).where(Respondent.id == any_(_ids(member_ids)))
+        )
+        members: Dict[int, Respondent] = {r.id: r for r in result.scalars().all()}
+
+        now = datetime.utcnow()
+        rows = []
+        for low, high in sorted(pairs):
+            score, reasons = similarity(members[low], members[high])
+            if score >= self.settings.duplicate_min_score:
+                rows.append({
+                    "respondent_id": low,
+                    "duplicate_id": high,
+                    "score": score,
+                    "reasons": reasons,
+                    "status": "pending",
+                    "detected_at": now,
+                })
+        if rows:
+            stmt = insert(RespondentDuplicate).values(rows)
+            await self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[RespondentDuplicate.respondent_id, RespondentDuplicate.duplicate_id],
+                    set_={
+                        "score": stmt.excluded.score,
+                        "reasons": stmt.excluded.reasons,
+                        "detected_at": stmt.excluded.detected_at,
+                    },
+                )
+            )
+        return len(rows)
+
+    async def clear_pending(self) -> None:
+        await self.db.execute(delete(RespondentDuplicate).where(RespondentDuplicate.status == "pending"))
+
+    async def last_scan_started(self) -> Optional[datetime]:
+        """Start of the most recent successful detect_duplicates job."""
+        result = await self.db.execute(
+            select(func.max(Job.started_at)).where(
+                Job.kind == "detect_duplicates",
+                Job.status == "succeeded",
+            )
+        )
+        return result.scalar()
+
+    async def clusters(
+        self,
+        status: str = "pending",
+        min_score: float = 0.0,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Tuple[List[dict], int]:
+        """
+        Connected groups of respondents linked by pairs with this status.
+
+        Returns ([{"respondent_ids", "pairs", "max_score"}, ...], total clusters),
+        strongest clusters first.
+        """
+        result = await self.db.execute(
+            select(RespondentDuplicate).where(
+                RespondentDuplicate.status == status,
+                RespondentDuplicate.score >= min_score,
+            )
+        )
+        pairs = list(result.scalars().all())
+
+        parent: Dict[int, int] = {}
+
+        def find(x: int) -> int:
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for pair in pairs:
+            parent[find(pair.respondent_id)] = find(pair.duplicate_id)
+
+        grouped: Dict[int, List[RespondentDuplicate]] = {}
+        for pair in pairs:
+            grouped.setdefault(find(pair.respondent_id), []).append(pair)
+
+        clusters = [
+            {
+                "respondent_ids": sorted({rid for p in members for rid in (p.respondent_id, p.duplicate_id)}),
+                "pairs": sorted(members, key=lambda p: -p.score),
+                "max_score": max(p.score for p in members),
+            }
+            for members in grouped.values()
+        ]
+        clusters.sort(key=lambda c: (-c["max_score"], c["respondent_ids"][0]))
+        return clusters[offset:offset + limit], len(clusters)
+
+    async def review(self, respondent_id: int, duplicate_id: int, status: str) -> Optional[RespondentDuplicate]:
+        """Set a pair's review status; ids may be given in either order."""
+        low, high = sorted((respondent_id, duplicate_id))
+        result = await self.db.execute(
+            select(RespondentDuplicate).where(
+                RespondentDuplicate.respondent_id == low,
+                RespondentDuplicate.duplicate_id == high,
+            )
+        )
+        pair = result.scalar_one_or_none()
+        if pair is None:
+            return None
+        pair.status = status
+        pair.reviewed_at = datetime.utcnow()
+        await self.db.flush()
+        return pair
+
+
+def _ids(values: List[int]):
+    return literal(list(values), ARRAY(Integer))
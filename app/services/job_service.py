@@ -0,0 +1,307 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import and_, event, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[["JobContext", dict], Awaitable[Optional[dict]]]
+
+# Registered job kinds; handlers are added with @job_handler("kind")
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+# First key of the advisory lock taken while enqueueing scheduled jobs, and
+# how often a runner looks for due ones
+SCHEDULE_LOCK_KEY = 7301
+SCHEDULE_CHECK_SECONDS = 60.0
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Register a coroutine as the handler for a job kind."""
+    def decorator(func: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when cancellation was requested."""
+
+
+class JobService:
+    """Persisted job records: enqueue, look up, and cancel."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(self, kind: str, params: dict, total: Optional[int] = None) -> Job:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = Job(kind=kind, params=params, total=total, status="queued")
+        self.db.add(job)
+        await self.db.flush()
+        await self.db.refresh(job)
+        # Workers can only claim the row once the caller's transaction commits
+        event.listen(self.db.sync_session, "after_commit", _notify_runner, once=True)
+        return job
+
+    async def get_by_id(self, job_id: int) -> Optional[Job]:
+        result = await self.db.execute(
+            select(Job)
+            .where(Job.id == job_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def cancel(self, job: Job) -> Job:
+        """Cancel a queued job immediately, or flag a running one."""
+        if job.status == "queued":
+            job.status = "cancelled"
+            job.finished_at = datetime.utcnow()
+        elif job.status == "running":
+            job.cancel_requested = True
+        await self.db.flush()
+        await self.db.refresh(job)
+        return job
+
+
+def _notify_runner(session) -> None:
+    job_runner.notify()
+
+
+class JobContext:
+    """Handed to job handlers for short-lived sessions and progress reports."""
+
+    def __init__(self, job_id: int, session_factory: async_sessionmaker):
+        self.job_id = job_id
+        self.session_factory = session_factory
+
+    def session(self) -> AsyncSession:
+        """Open a session for one unit of work; close it between chunks."""
+        return self.session_factory()
+
+    async def report(self, progress: int, total: Optional[int] = None) -> None:
+        """Persist progress and raise JobCancelled if cancellation was requested."""
+        values = {"progress": progress}
+        if total is not None:
+            values["total"] = total
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == self.job_id)
+                .values(**values)
+                .returning(Job.cancel_requested)
+            )
+            cancel_requested = result.scalar_one()
+            await session.commit()
+        if cancel_requested:
+            raise JobCancelled()
+
+
+class JobRunner:
+    """
+    Bounded pool of asyncio workers that claim jobs from the jobs table.
+
+    Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so the same
+    runner can live inside the uvicorn process or in a separate worker
+    process (python -m app.worker) without double-processing.
+
+    A claimed job holds a lease (jobs.locked_until) that its worker renews
+    every third of lease_seconds. If the worker dies (SIGKILL, OOM,
+    scale-in) the lease lapses and the next claim runs the job again.
+
+    Recurring jobs are registered with schedule(); idle workers enqueue
+    them when due, under an advisory lock so concurrent runners add one.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        workers: int = 2,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 60.0,
+    ):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.schedules: Dict[str, Tuple[dict, float]] = {}
+        self._schedules_checked_at = float("-inf")
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def notify(self) -> None:
+        """Wake idle workers early after a job was enqueued."""
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def schedule(self, kind: str, params: dict, interval_seconds: float) -> None:
+        """Run `kind` every `interval_seconds`, counted from the last enqueue."""
+        self.schedules[kind] = (params, interval_seconds)
+
+    async def enqueue_due(self) -> int:
+        """Enqueue scheduled jobs that are due. Returns the number enqueued."""
+        enqueued = 0
+        async with self.session_factory() as session:
+            for kind, (params, interval) in self.schedules.items():
+                locked = await session.execute(
+                    select(func.pg_try_advisory_xact_lock(SCHEDULE_LOCK_KEY, func.hashtext(kind)))
+                )
+                if not locked.scalar():
+                    continue  # another runner is enqueueing it
+                pending = await session.execute(
+                    select(Job.id)
+                    .where(
+                        Job.kind == kind,
+                        or_(
+                            Job.status.in_(("queued", "running")),
+                            Job.created_at > datetime.utcnow() - timedelta(seconds=interval),
+                        ),
+                    )
+                    .limit(1)
+                )
+                if pending.scalar_one_or_none() is None:
+                    session.add(Job(kind=kind, params=params, status="queued"))
+                    enqueued += 1
+            await session.commit()
+        return enqueued
+
+    async def run_pending(self) -> int:
+        """Process queued jobs until none are left. Returns the number run."""
+        count = 0
+        while await self._run_next():
+            count += 1
+        return count
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                now = time.monotonic()
+                if self.schedules and now - self._schedules_checked_at >= SCHEDULE_CHECK_SECONDS:
+                    self._schedules_checked_at = now
+                    await self.enqueue_due()
+                ran = await self._run_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job worker failed to claim a job")
+                ran = False
+            if ran:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _lease(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    async def _claim(self) -> Optional[Job]:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(Job)
+                .where(or_(
+                    Job.status == "queued",
+                    and_(Job.status == "running", Job.locked_until < datetime.utcnow()),
+                ))
+                .order_by(Job.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            job = result.scalar_one_or_none()
+            if job is None:
+                return None
+            if job.status == "running":
+                logger.warning("Job %s (%s) lost its worker, running it again", job.id, job.kind)
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            job.locked_until = self._lease()
+            await session.commit()
+            return job
+
+    async def _renew_lease(self, job_id: int) -> None:
+        """Keep extending a running job's lease until cancelled."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(
+                        update(Job)
+                        .where(Job.id == job_id, Job.status == "running")
+                        .values(locked_until=self._lease())
+                    )
+                    await session.commit()
+            except Exception:
+                logger.exception("Could not renew the lease of job %s", job_id)
+
+    async def _finish(self, job_id: int, **values) -> None:
+        values.setdefault("finished_at", datetime.utcnow())
+        values["locked_until"] = None
+        async with self.session_factory() as session:
+            await session.execute(
+                update(Job).where(Job.id == job_id).values(**values)
+            )
+            await session.commit()
+
+    async def _run_next(self) -> bool:
+        job = await self._claim()
+        if job is None:
+            return False
+
+        handler = JOB_HANDLERS.get(job.kind)
+        if handler is None:
+            await self._finish(job.id, status="failed", error=f"Unknown job kind: {job.kind}")
+            return True
+
+        context = JobContext(job.id, self.session_factory)
+        lease = asyncio.create_task(self._renew_lease(job.id), name=f"job-lease-{job.id}")
+        try:
+            result = await handler(context, job.params or {})
+        except JobCancelled:
+            await self._finish(job.id, status="cancelled")
+        except asyncio.CancelledError:
+            # Worker shutdown: put the job back for the next worker
+            await self._finish(job.id, status="queued", started_at=None, finished_at=None)
+            raise
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            await self._finish(job.id, status="failed", error=str(exc))
+        else:
+            await self._finish(job.id, status="succeeded", result=result)
+        finally:
+            lease.cancel()
+        return True
+
+
+settings = get_settings()
+
+job_runner = JobRunner(
+    workers=settings.job_workers,
+    poll_interval=settings.job_poll_interval,
+    lease_seconds=settings.job_lease_seconds,
+)
@@ -0,0 +1,414 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, update, exists, func, any_, literal, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.cache_version import CacheVersion
+from app.models.respondent import Respondent
+from app.models.screener_criteria import ScreenerCriteria
+from app.models.study import Study
+from app.schemas.respondent import RespondentResponse
+from app.services.criteria_expression import needs_database
+from app.services.matching_service import MatchingService, PARTICIPATION_FIELD
+
+# Global counters in cache_versions
+POOL_VERSION = "respondent_pool"  # respondent writes that affect screening
+ASSIGNMENTS_VERSION = "assignments"  # bumped on any assignment write
+
+# The pool counter is spread over "respondent_pool:<n>" rows, picked by
+# respondent id, so concurrent respondent writes do not queue on one row.
+# Shards only grow, so their sum changes with every bump.
+POOL_VERSION_SHARDS = 16
+
+
+class MatchCacheBackend(ABC):
+    """
+    Interface for match result caches.
+
+    The default is an in-process LRU; a shared backend (e.g. Redis) can be
+    installed with set_match_cache_backend() so all API instances share hits.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, study_id: int, value: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def invalidate_study(self, study_id: int) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class InMemoryLRUCache(MatchCacheBackend):
+    """Bounded LRU with per-entry TTL, indexed by study for targeted invalidation."""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[int, dict, int, float]]" = OrderedDict()
+        self._by_study: Dict[int, Set[str]] = {}
+        self._memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None or entry[3] < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def set(self, key: str, study_id: int, value: dict) -> None:
+        if key in self._entries:
+            self._remove(key)
+        size = len(json.dumps(value, default=str))
+        self._entries[key] = (study_id, value, size, time.monotonic() + self.ttl_seconds)
+        self._by_study.setdefault(study_id, set()).add(key)
+        self._memory_bytes += size
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    async def invalidate_study(self, study_id: int) -> None:
+        for key in list(self._by_study.get(study_id, ())):
+            self._remove(key)
+            self.invalidations += 1
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._by_study.clear()
+        self._memory_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "memory_bytes": self._memory_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: str) -> None:
+        study_id, _, size, _ = self._entries.pop(key)
+        self._memory_bytes -= size
+        keys = self._by_study.get(study_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_study[study_id]
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one in-flight call.
+
+    The first caller (leader) runs the computation; callers arriving while it
+    runs await the same future and share its result. If the leader is
+    cancelled, a waiting caller takes over as the new leader.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            self.shared += 1
+            try:
+                # shield: a follower being cancelled must not cancel the leader
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled; retry (possibly as the new leader)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # followers re-raise it; don't log it as unretrieved
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.shared
+        return {
+            "leaders": self.leaders,
+            "shared": self.shared,
+            "in_flight": len(self._calls),
+            "shared_rate": round(self.shared / calls, 4) if calls else 0.0,
+        }
+
+
+settings = get_settings()
+
+# Identical concurrent /match misses (same cache key) run one query
+match_flights = SingleFlight()
+
+match_cache: MatchCacheBackend = InMemoryLRUCache(
+    max_entries=settings.match_cache_max_entries,
+    ttl_seconds=settings.match_cache_ttl_seconds,
+)
+
+
+def set_match_cache_backend(backend: MatchCacheBackend) -> None:
+    """Swap the process-wide match cache (e.g. for a shared Redis backend)."""
+    global match_cache
+    match_cache = backend
+
+
+def get_match_cache() -> MatchCacheBackend:
+    return match_cache
+
+
+def build_match_cache_key(
+    study: Study,
+    pool_version: int,
+    assignments_version: Optional[int],
+    exclude_assigned: bool,
+    limit: int,
+    offset: int,
+    sort: str = "created",
+    seed: Optional[int] = None,
+) -> str:
+    """
+    Cache key for one page of match results.
+
+    assignments_version is only passed when results depend on assignments
+    to other studies: participation criteria, or ranking by score.
+    """
+    return (
+        f"match:{study.id}:c{study.criteria_version}:a{study.assignment_version}"
+        f":p{pool_version}:g{assignments_version if assignments_version is not None else '-'}"
+        f":{int(exclude_assigned)}:{sort}{seed if seed is not None else ''}:{limit}:{offset}"
+    )
+
+
+async def get_study_with_versions(
+    db: AsyncSession,
+    study_id: int,
+    with_assignments: bool = False,
+) -> Optional[Tuple[Study, int, Optional[int]]]:
+    """
+    Load a study plus the global counters its match results depend on.
+
+    Returns (study, pool_version, assignments_version) in one round trip, or
+    None if the study does not exist. assignments_version is None unless the
+    study has participation criteria or with_assignments is set.
+    """
+    def counter(name: str):
+        return func.coalesce(
+            select(CacheVersion.version).where(CacheVersion.name == name).scalar_subquery(),
+            0,
+        )
+
+    pool_version = func.coalesce(
+        select(func.sum(CacheVersion.version))
+        .where(CacheVersion.name.startswith(POOL_VERSION))
+        .scalar_subquery(),
+        0,
+    )
+
+    has_participation = exists(
+        select(ScreenerCriteria.id).where(
+            ScreenerCriteria.study_id == Study.id,
+            ScreenerCriteria.field_name == PARTICIPATION_FIELD,
+        )
+    )
+    result = await db.execute(
+        select(
+            Study,
+            pool_version.label("pool_version"),
+            counter(ASSIGNMENTS_VERSION).label("assignments_version"),
+            has_participation.label("has_participation"),
+        )
+        .where(Study.id == study_id)
+        .execution_options(populate_existing=True)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    has_participation = row.has_participation or needs_database(row.Study.criteria_expression)
+    assignments_version = (
+        row.assignments_version if has_participation or with_assignments else None
+    )
+    return row.Study, int(row.pool_version), assignments_version
+
+
+async def get_match_page(
+    db: AsyncSession,
+    study_id: int,
+    exclude_assigned: bool,
+    limit: int,
+    offset: int,
+    sort: str = "created",
+    seed: Optional[int] = None,
+) -> Optional[dict]:
+    """
+    One page of match results as {"items": [...], "total": n}, served from
+    the cache when the study's versions are unchanged. None if no such study.
+
+    With sort="score" each item carries its relevance "score"; sort="random"
+    needs a seed and returns that seed's sample.
+    """
+    # Scores read participation stats, which move with every assignment write
+    loaded = await get_study_with_versions(db, study_id, with_assignments=sort == "score")
+    if loaded is None:
+        return None
+    study, pool_version, assignments_version = loaded
+
+    cache_key = build_match_cache_key(
+        study, pool_version, assignments_version, exclude_assigned, limit, offset, sort, seed
+    )
+    cached = await match_cache.get(cache_key)
+    if cached is not None:
+        return await _load_page(db, cached)
+
+    async def compute() -> dict:
+        service = MatchingService(db)
+        materialized = study.status == "recruiting" and study.matches_refreshed_at is not None
+        if sort == "score":
+            ranked, total = await service.find_ranked_respondents(
+                study_id=study_id,
+                exclude_assigned=exclude_assigned,
+                limit=limit,
+                offset=offset,
+                materialized=materialized,
+            )
+            respondents = [r for r, _ in ranked]
+            scores = [round(score, 4) for _, score in ranked]
+        else:
+            if sort == "random":
+                respondents, total = await service.find_random_respondents(
+                    study_id=study_id,
+                    seed=seed,
+                    exclude_assigned=exclude_assigned,
+                    limit=limit,
+                    offset=offset,
+                    materialized=materialized,
+                )
+            else:
+                respondents, total = await service.find_matching_respondents(
+                    study_id=study_id,
+                    exclude_assigned=exclude_assigned,
+                    limit=limit,
+                    offset=offset,
+                    materialized=materialized,
+                )
+            scores = None
+        await match_cache.set(
+            cache_key,
+            study_id,
+            {"ids": [r.id for r in respondents], "scores": scores, "total": total},
+        )
+        return _page(respondents, scores, total)
+
+    # The key carries every version the result depends on, so callers that
+    # share it would compute exactly the same page
+    return await match_flights.do(cache_key, compute)
+
+
+def _page(respondents: List[Respondent], scores: Optional[List[float]], total: int) -> dict:
+    items = [RespondentResponse.model_validate(r).model_dump(mode="json") for r in respondents]
+    if scores is not None:
+        items = [{**item, "score": score} for item, score in zip(items, scores)]
+    return {"items": items, "total": total}
+
+
+async def _load_page(db: AsyncSession, cached: dict) -> dict:
+    """
+    A cached page with its respondents read fresh by primary key.
+
+    The cache holds ids only, so edits to fields no criterion uses (which
+    do not bump the pool version) still show up at once.
+    """
+    ids = cached["ids"]
+    by_id = {}
+    if ids:
+        result = await db.execute(
+            select(Respondent).where(Respondent.id == any_(literal(ids, ARRAY(Integer))))
+        )
+        by_id = {r.id: r for r in result.scalars().all()}
+    scores = cached["scores"]
+    if scores is None:
+        return _page([by_id[i] for i in ids if i in by_id], None, cached["total"])
+    kept = [(by_id[i], score) for i, score in zip(ids, scores) if i in by_id]
+    return _page([r for r, _ in kept], [score for _, score in kept], cached["total"])
+
+
+async def bump_pool_version(db: AsyncSession, respondent_id: int = 0) -> None:
+    """Bump the respondent pool counter, on the shard for this respondent."""
+    await bump_version(db, f"{POOL_VERSION}:{respondent_id % POOL_VERSION_SHARDS}")
+
+
+async def bump_version(db: AsyncSession, name: str) -> None:
+    """Increment a global change counter in the current transaction."""
+    stmt = insert(CacheVersion).values(name=name, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CacheVersion.name],
+        set_={"version": CacheVersion.version + 1},
+    )
+    await db.execute(stmt)
+
+
+async def bump_study_versions(
+    db: AsyncSession,
+    study_id: int,
+    criteria: bool = False,
+    assignments: bool = False,
+) -> None:
+    """Bump a study's criteria/assignment versions and drop its cached pages."""
+    values = {}
+    if criteria:
+        values["criteria_version"] = Study.criteria_version + 1
+    if assignments:
+        values["assignment_version"] = Study.assignment_version + 1
+        await bump_version(db, ASSIGNMENTS_VERSION)
+    if values:
+        await db.execute(update(Study).where(Study.id == study_id).values(**values))
+    await match_cache.invalidate_study(study_id)
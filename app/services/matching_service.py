@@ -1,11 +1,114 @@
-from typing import List, Tuple, Optional
-from sqlalchemy import select, and_, func
+import random
+import re
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple, Optional
+from sqlalchemy import (
+    select, and_, or_, not_, true, false, func, exists, case, cast, extract, literal, union_all, any_,
+    Float, DateTime, Integer, String,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, JSONPATH
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.config import get_settings
 from app.models.respondent import Respondent
+from app.models.respondent_stats import RespondentStats
 from app.models.study import Study
 from app.models.screener_criteria import ScreenerCriteria
-from app.models.study_assignment import StudyAssignment
+from app.models.study_assignment import StudyAssignmentKey
+from app.models.study_match import StudyMatch
+from app.services.criteria_expression import (
+    PARTICIPATION_FIELD, is_group, is_time_windowed, leaf, order_children, prune, screening_tree,
+)
+
+PARTICIPATION_OPERATORS = ("not_in_studies", "not_with_client")
+
+# Criteria on "profile.<key>" (or "profile.<key>.<key>" for nested objects)
+# test the Respondent.profile JSONB attributes
+PROFILE_PREFIX = "profile."
+PROFILE_KEY = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Range operators on profile values, as jsonpath filters over $lo / $hi
+PROFILE_RANGE_FILTERS = {
+    "gte": "@ >= $lo",
+    "lte": "@ <= $hi",
+    "between": "@ >= $lo && @ <= $hi",
+}
+
+
+def profile_path(field_name: str) -> Optional[List[str]]:
+    """Key path of a "profile.<key>" field name, or None if it is not one."""
+    if not field_name.startswith(PROFILE_PREFIX):
+        return None
+    keys = field_name[len(PROFILE_PREFIX):].split(".")
+    if not all(PROFILE_KEY.match(key) for key in keys):
+        return None
+    return keys
+
+
+def _nest(keys: List[str], value):
+    for key in reversed(keys):
+        value = {key: value}
+    return value
+
+
+def _jsonpath(keys: List[str]) -> str:
+    return "$" + "".join(f'."{key}"' for key in keys)
+
+
+def json_contains(container, contained) -> bool:
+    """Python mirror of Postgres jsonb @> (containment) semantics."""
+    if isinstance(contained, dict):
+        return isinstance(container, dict) and all(
+            key in container and json_contains(container[key], value)
+            for key, value in contained.items()
+        )
+    if isinstance(contained, list):
+        return isinstance(container, list) and all(
+            any(json_contains(item, wanted) for item in container) for wanted in contained
+        )
+    if isinstance(container, (dict, list)):
+        return False
+    if isinstance(container, bool) or isinstance(contained, bool):
+        return container is contained
+    return container == contained
+
+
+_MISSING = object()
+
+
+def _comparable(item, bound) -> bool:
+    if bound is None:
+        return True
+    numbers = (int, float)
+    if isinstance(item, bool) or isinstance(bound, bool):
+        return False
+    return (isinstance(item, numbers) and isinstance(bound, numbers)) or (
+        isinstance(item, str) and isinstance(bound, str)
+    )
+
+
+def required_criteria(criteria_list: List[ScreenerCriteria]) -> List[ScreenerCriteria]:
+    """Hard filters; criteria with a weight are preferred and only scored."""
+    return [criterion for criterion in criteria_list if criterion.weight is None]
+
+
+def preferred_criteria(criteria_list: List[ScreenerCriteria]) -> List[ScreenerCriteria]:
+    return [criterion for criterion in criteria_list if criterion.weight is not None]
+
+
+def sample_start(seed: int) -> float:
+    """Point on the [0, 1) sample_key circle where a seed's sample begins."""
+    return random.Random(seed).random()
+
+
+def sample_order(seed: int):
+    """Sort key placing respondents in a seed's sample order (for window functions)."""
+    start = sample_start(seed)
+    return case(
+        (Respondent.sample_key >= start, Respondent.sample_key - start),
+        else_=Respondent.sample_key - start + 1.0,
+    )
 
 
 class MatchingService:
@@ -20,6 +123,7 @@ class MatchingService:
         exclude_assigned: bool = True,
         limit: int = 50,
         offset: int = 0,
+        materialized: bool = False,
     ) -> Tuple[List[Respondent], int]:
         """
         Find respondents matching all screener criteria for a study.
@@ -29,32 +133,30 @@ class MatchingService:
             exclude_assigned: If True, exclude respondents already assigned to this study
             limit: Max results to return
             offset: Pagination offset
+            materialized: If True, read the precomputed study_matches rows
+                instead of evaluating criteria (recruiting studies only)
 
         Returns:
             Tuple of (matching respondents, total count)
         """
-        # Get study criteria
-        criteria_result = await self.db.execute(
-            select(ScreenerCriteria).where(ScreenerCriteria.study_id == study_id)
-        )
-        criteria_list = list(criteria_result.scalars().all())
-
-        # Build base query for active respondents
-        query = select(Respondent).where(Respondent.is_active == True)
-
-        # Exclude already assigned respondents if requested
-        if exclude_assigned:
-            assigned_subquery = (
-                select(StudyAssignment.respondent_id)
-                .where(StudyAssignment.study_id == study_id)
+        # Get study criteria; contradictory ones need no query at all
+        criteria_list, expression = await self.get_screening(study_id)
+        if self.matches_nothing(criteria_list, expression):
+            return [], 0
+
+        if materialized:
+            return await self._find_materialized(
+                study_id, criteria_list, exclude_assigned, limit, offset
             )
-            query = query.where(Respondent.id.not_in(assigned_subquery))
 
-        # Apply each criterion
-        for criterion in criteria_list:
-            condition = self._build_condition(criterion)
-            if condition is not None:
-                query = query.where(condition)
+        # Build base query for active respondents matching every criterion
+        query = select(Respondent).where(
+            *self.build_match_conditions(
+                criteria_list,
+                exclude_study_id=study_id if exclude_assigned else None,
+                expression=expression,
+            )
+        )
 
         # Get total count (before pagination)
         count_query = select(func.count()).select_from(query.subquery())
@@ -69,14 +171,367 @@ class MatchingService:
 
         return respondents, total
 
+    async def _find_materialized(
+        self,
+        study_id: int,
+        criteria_list: List[ScreenerCriteria],
+        exclude_assigned: bool,
+        limit: int,
+        offset: int,
+    ) -> Tuple[List[Respondent], int]:
+        """Page through study_matches using its (study_id, created_at) index."""
+        conditions = self.materialized_conditions(study_id, criteria_list, exclude_assigned)
+
+        count_query = select(func.count()).select_from(StudyMatch).where(*conditions)
+        total_result = await self.db.execute(count_query)
+        total = total_result.scalar()
+
+        query = (
+            select(Respondent)
+            .join(StudyMatch, StudyMatch.respondent_id == Respondent.id)
+            .where(*conditions)
+            .order_by(
+                StudyMatch.respondent_created_at.desc(),
+                StudyMatch.respondent_id.desc(),
+            )
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        respondents = list(result.scalars().all())
+
+        return respondents, total
+
+    def materialized_conditions(
+        self,
+        study_id: int,
+        criteria_list: List[ScreenerCriteria],
+        exclude_assigned: bool,
+    ) -> list:
+        """
+        Conditions on study_matches rows for one study.
+
+        Time-windowed participation rules are not materialized (their outcome
+        changes as the window moves), so they are applied here, in the same
+        anti-join as the already-assigned exclusion.
+        """
+        conditions = [StudyMatch.study_id == study_id]
+        exclusion = self._build_exclusion(
+            [c for c in required_criteria(criteria_list) if is_time_windowed(c)],
+            study_id=study_id if exclude_assigned else None,
+            respondent_id=StudyMatch.respondent_id,
+        )
+        if exclusion is not None:
+            conditions.append(exclusion)
+        return conditions
+
+    async def find_ranked_respondents(
+        self,
+        study_id: int,
+        exclude_assigned: bool = True,
+        limit: int = 50,
+        offset: int = 0,
+        materialized: bool = False,
+    ) -> Tuple[List[Tuple[Respondent, float]], int]:
+        """
+        Matching respondents ordered by relevance score, best first.
+
+        The score is computed and ranked in Postgres (ORDER BY score LIMIT
+        runs as a bounded top-N sort), so only the requested page leaves the
+        database. Ties go to the lower respondent id.
+
+        Returns:
+            Tuple of ([(respondent, score), ...], total count)
+        """
+        criteria_list, expression = await self.get_screening(study_id)
+        if self.matches_nothing(criteria_list, expression):
+            return [], 0
+        score = self.build_score(criteria_list).label("score")
+
+        if materialized:
+            conditions = self.materialized_conditions(study_id, criteria_list, exclude_assigned)
+            count_query = select(func.count()).select_from(StudyMatch).where(*conditions)
+            query = select(Respondent, score).join(
+                StudyMatch, StudyMatch.respondent_id == Respondent.id
+            )
+        else:
+            conditions = self.build_match_conditions(
+                criteria_list,
+                exclude_study_id=study_id if exclude_assigned else None,
+                expression=expression,
+            )
+            count_query = select(func.count(Respondent.id)).where(*conditions)
+            query = select(Respondent, score)
+
+        total_result = await self.db.execute(count_query)
+        total = total_result.scalar()
+
+        query = (
+            query.outerjoin(RespondentStats, RespondentStats.respondent_id == Respondent.id)
+            .where(*conditions)
+            .order_by(score.desc(), Respondent.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        ranked = [(row.Respondent, row.score) for row in result]
+
+        return ranked, total
+
+    async def find_random_respondents(
+        self,
+        study_id: int,
+        seed: int,
+        exclude_assigned: bool = True,
+        limit: int = 50,
+        offset: int = 0,
+        materialized: bool = False,
+    ) -> Tuple[List[Respondent], int]:
+        """
+        A random sample of matching respondents, reproducible by seed.
+
+        Every respondent carries a fixed random sample_key. A seed picks a
+        start point and the sample is the next offset + limit matches going
+        round the key circle from there: two index-ordered LIMIT scans
+        (from the start to 1, then from 0 to the start), so nothing sorts
+        the whole match set. The sample is only approximately uniform: for
+        a fixed pool, a respondent's chance of opening a sample is the gap
+        before its key, and neighbouring keys tend to appear together.
+
+        Returns:
+            Tuple of (sampled respondents, total count)
+        """
+        criteria_list, expression = await self.get_screening(study_id)
+        if self.matches_nothing(criteria_list, expression):
+            return [], 0
+        if materialized:
+            conditions = self.materialized_conditions(study_id, criteria_list, exclude_assigned)
+            count_query = select(func.count()).select_from(StudyMatch).where(*conditions)
+            base = select(Respondent).join(StudyMatch, StudyMatch.respondent_id == Respondent.id)
+        else:
+            conditions = self.build_match_conditions(
+                criteria_list,
+                exclude_study_id=study_id if exclude_assigned else None,
+                expression=expression,
+            )
+            count_query = select(func.count(Respondent.id)).where(*conditions)
+            base = select(Respondent)
+
+        total_result = await self.db.execute(count_query)
+        total = total_result.scalar()
+
+        start = sample_start(seed)
+        window = offset + limit
+        arcs = [
+            base.add_columns(literal(lap, Integer).label("lap"))
+            .where(*conditions, arc)
+            .order_by(Respondent.sample_key)
+            .limit(window)
+            .subquery()
+            for lap, arc in enumerate([Respondent.sample_key >= start, Respondent.sample_key < start])
+        ]
+        walk = union_all(*[select(arc) for arc in arcs]).subquery("walk")
+        sampled = aliased(Respondent, walk)
+
+        # At most 2 * (offset + limit) rows reach this sort
+        query = (
+            select(sampled)
+            .order_by(walk.c.lap, walk.c.sample_key)
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        respondents = list(result.scalars().all())
+
+        return respondents, total
+
+    def build_score(self, criteria_list: List[ScreenerCriteria]):
+        """
+        Relevance score for a respondent row; needs respondent_stats outer-joined.
+
+        Sum of:
+          - the weight of every preferred criterion the respondent meets
+          - rest: 0..rest_weight, growing with days since last participation
+            (full for respondents who never took part)
+          - reliability: reliability_weight * (completed + 1) / (completed + no_shows + 2)
+        """
+        settings = get_settings()
+        terms = []
+        for criterion in preferred_criteria(criteria_list):
+            if criterion.field_name == PARTICIPATION_FIELD:
+                condition = self._build_exclusion([criterion])
+            else:
+                condition = self._build_condition(criterion)
+            if condition is not None:
+                terms.append(case((condition, criterion.weight), else_=0.0))
+
+        rest_seconds = extract(
+            "epoch",
+            literal(datetime.utcnow(), DateTime) - RespondentStats.last_participation_at,
+        )
+        rest = case(
+            (RespondentStats.last_participation_at.is_(None), 1.0),
+            else_=func.least(rest_seconds / (settings.match_score_rest_days * 86400.0), 1.0),
+        )
+        terms.append(settings.match_score_rest_weight * rest)
+
+        completed = func.coalesce(RespondentStats.completed_count, 0)
+        no_shows = func.coalesce(RespondentStats.no_show_count, 0)
+        reliability = (completed + 1.0) / (completed + no_shows + 2.0)
+        terms.append(settings.match_score_reliability_weight * reliability)
+
+        score = terms[0]
+        for term in terms[1:]:
+            score = score + term
+        return cast(score, Float)
+
+    async def get_criteria(self, study_id: int) -> List[ScreenerCriteria]:
+        criteria_result = await self.db.execute(
+            select(ScreenerCriteria).where(ScreenerCriteria.study_id == study_id)
+        )
+        return list(criteria_result.scalars().all())
+
+    async def get_screening(self, study_id: int) -> Tuple[List[ScreenerCriteria], Optional[dict]]:
+        """A study's criteria list and criteria expression, in one query."""
+        result = await self.db.execute(
+            select(Study.criteria_expression, ScreenerCriteria)
+            .select_from(Study)
+            .outerjoin(ScreenerCriteria, ScreenerCriteria.study_id == Study.id)
+            .where(Study.id == study_id)
+        )
+        rows = result.all()
+        expression = rows[0][0] if rows else None
+        return [criterion for _, criterion in rows if criterion is not None], expression
+
+    async def affects_screening(self, fields: Iterable[str]) -> bool:
+        """
+        True if changing these Respondent fields can move a respondent in or
+        out of some study's matches or change its score: is_active, or a field
+        that a criterion or criteria expression names.
+        """
+        fields = set(fields)
+        if "is_active" in fields:
+            return True
+        names = sorted(fields - {"profile"})
+        in_criteria = [ScreenerCriteria.field_name == any_(literal(names, ARRAY(String)))]
+        path_tests = [f"@ == $f{i}" for i in range(len(names))]
+        if "profile" in fields:
+            in_criteria.append(ScreenerCriteria.field_name.startswith(PROFILE_PREFIX))
+            path_tests.append(f'@ starts with "{PROFILE_PREFIX}"')
+        if not path_tests:
+            return False
+
+        path = f"$.**.field_name ? ({' || '.join(path_tests)})"
+        in_expression = func.jsonb_path_exists(
+            Study.criteria_expression,
+            cast(literal(path), JSONPATH),
+            literal({f"f{i}": name for i, name in enumerate(names)}, JSONB),
+        )
+        result = await self.db.execute(
+            select(or_(
+                exists(select(ScreenerCriteria.id).where(or_(*in_criteria))),
+                exists(select(Study.id).where(Study.criteria_expression.is_not(None), in_expression)),
+            ))
+        )
+        return result.scalar()
+
+    def matches_nothing(
+        self,
+        criteria_list: List[ScreenerCriteria],
+        expression: Optional[dict] = None,
+    ) -> bool:
+        """True if the required criteria and expression contradict each other."""
+        return prune(screening_tree(required_criteria(criteria_list), expression)) is None
+
+    def build_match_conditions(
+        self,
+        criteria_list: List[ScreenerCriteria],
+        exclude_study_id: Optional[int] = None,
+        expression: Optional[dict] = None,
+    ) -> list:
+        """
+        WHERE conditions selecting active respondents that meet every required
+        criterion and the criteria expression, if any. Preferred (weighted)
+        criteria do not filter.
+
+        If exclude_study_id is given, respondents assigned to that study are
+        excluded as part of the participation anti-join. Contradictory
+        criteria compile to a constant false.
+        """
+        if self.matches_nothing(criteria_list, expression):
+            return [false()]
+
+        conditions = [Respondent.is_active == True]
+        criteria_list = required_criteria(criteria_list)
+
+        # Already-assigned and participation exclusions share one anti-join
+        exclusion = self._build_exclusion(criteria_list, study_id=exclude_study_id)
+        if exclusion is not None:
+            conditions.append(exclusion)
+
+        # Apply each criterion
+        for criterion in criteria_list:
+            condition = self._build_condition(criterion)
+            if condition is not None:
+                conditions.append(condition)
+
+        if expression is not None:
+            conditions.append(self.compile_expression(expression))
+
+        return conditions
+
+    def compile_expression(self, expression: dict, prune_first: bool = True):
+        """
+        One SQL predicate for a criteria tree.
+
+        Branches that can never match are pruned first, and group children
+        are emitted in evaluation order (see order_children).
+
+        Raises:
+            ValueError: a criterion in the tree cannot be compiled
+        """
+        if prune_first:
+            expression = prune(expression)
+            if expression is None:
+                return false()
+
+        if not is_group(expression):
+            criterion = leaf(expression)
+            if criterion.field_name == PARTICIPATION_FIELD:
+                condition = self._build_exclusion([criterion])
+            else:
+                condition = self.build_field_condition(*criterion)
+            if condition is None:
+                raise ValueError(
+                    f"Criterion {criterion.operator!r} on {criterion.field_name!r} is not supported"
+                )
+            return condition
+
+        children = [self.compile_expression(child, prune_first=False) for child in order_children(expression)]
+        if expression["op"] == "not":
+            return not_(children[0])
+        if not children:
+            return true()
+        return and_(*children) if expression["op"] == "and" else or_(*children)
+
     def _build_condition(self, criterion: ScreenerCriteria):
         """Build a SQLAlchemy condition from a screener criterion."""
-        field_name = criterion.field_name
-        operator = criterion.operator
-        value = criterion.value
+        # Participation criteria are compiled by _build_exclusion
+        if criterion.field_name == PARTICIPATION_FIELD:
+            return None
+
+        return self.build_field_condition(
+            criterion.field_name, criterion.operator, criterion.value
+        )
+
+    def build_field_condition(self, field_name: str, operator: str, value):
+        """Condition for one Respondent column test, or None if it cannot be compiled."""
+        keys = profile_path(field_name)
+        if keys is not None:
+            return self.build_profile_condition(keys, operator, value)
 
         # Get the column from the Respondent model
-        if not hasattr(Respondent, field_name):
+        if not hasattr(Respondent, field_name) or field_name == "profile":
             return None
 
         column = getattr(Respondent, field_name)
@@ -106,12 +561,179 @@ class MatchingService:
 
         return None
 
+    def build_profile_condition(self, keys: List[str], operator: str, value):
+        """
+        Condition on a profile attribute, or None if it cannot be compiled.
+
+        Equality, "in", "contains" and "exists" compile to jsonb @> and @?,
+        which ix_respondents_active_profile (GIN, jsonb_path_ops) serves;
+        "in" becomes one OR-ed containment per value (a BitmapOr). "neq" and
+        ranges need the key present and then filter the candidate rows.
+        """
+        profile = Respondent.profile
+        has_key = profile.op("@?")(cast(literal(_jsonpath(keys)), JSONPATH))
+
+        if operator == "eq":
+            return profile.contains(_nest(keys, value))
+
+        elif operator == "neq":
+            return and_(has_key, ~profile.contains(_nest(keys, value)))
+
+        elif operator == "in":
+            values = value if isinstance(value, list) else [value]
+            return or_(*[profile.contains(_nest(keys, v)) for v in values])
+
+        elif operator == "contains":
+            # Array attribute holding all of the given values
+            values = value if isinstance(value, list) else [value]
+            return profile.contains(_nest(keys, values))
+
+        elif operator == "exists":
+            return has_key if value in (None, True) else ~has_key
+
+        elif operator in PROFILE_RANGE_FILTERS:
+            if operator == "between":
+                if not isinstance(value, list) or len(value) != 2:
+                    return None
+                bounds = {"lo": value[0], "hi": value[1]}
+            else:
+                bounds = {"lo": value} if operator == "gte" else {"hi": value}
+            path = f"{_jsonpath(keys)} ? ({PROFILE_RANGE_FILTERS[operator]})"
+            return and_(
+                has_key,
+                func.jsonb_path_exists(
+                    profile, cast(literal(path), JSONPATH), literal(bounds, JSONB)
+                ),
+            )
+
+        return None
+
+    def _build_exclusion(
+        self,
+        criteria_list: List[ScreenerCriteria],
+        study_id: Optional[int] = None,
+        respondent_id=Respondent.id,
+    ):
+        """
+        Build a single NOT EXISTS anti-join covering every participation rule.
+
+        The current study (when excluding assigned respondents), explicit study
+        lists and recent participation for a client are OR-ed together inside
+        one correlated subquery on study_assignment_keys, joined to studies
+        only when a client rule needs it. Postgres plans this as one anti-join
+        instead of a hashed subplan per rule. The keys table also covers
+        partitions detached into the archive schema. respondent_id is the
+        column the subquery correlates with (study_matches rows pass their own).
+        """
+        study_ids = set()
+        client_conditions = []
+
+        if study_id is not None:
+            study_ids.add(study_id)
+
+        for criterion in criteria_list:
+            if criterion.field_name != PARTICIPATION_FIELD:
+                continue
+            value = criterion.value
+
+            # Values are validated by the study schemas
+            if criterion.operator == "not_in_studies":
+                study_ids.update(int(v) for v in value)
+
+            elif criterion.operator == "not_with_client":
+                condition = Study.client_name == value["client_name"]
+                within_days = value.get("within_days")
+                if within_days is not None:
+                    cutoff = datetime.utcnow() - timedelta(days=int(within_days))
+                    condition = and_(condition, StudyAssignmentKey.invited_at >= cutoff)
+                client_conditions.append(condition)
+
+        conditions = []
+        if study_ids:
+            conditions.append(StudyAssignmentKey.study_id.in_(sorted(study_ids)))
+        conditions.extend(client_conditions)
+        if not conditions:
+            return None
+
+        subquery = select(StudyAssignmentKey.study_id).where(
+            StudyAssignmentKey.respondent_id == respondent_id,
+            or_(*conditions),
+        )
+        if client_conditions:
+            subquery = subquery.join(Study, Study.id == StudyAssignmentKey.study_id)
+
+        return ~exists(subquery)
+
+    async def check_respondents(
+        self,
+        study: Study,
+        respondent_ids: List[int],
+        exclude_assigned: bool = False,
+    ) -> Tuple[List[dict], List[int]]:
+        """
+        Eligibility of many respondents for a study, in one query.
+
+        Being active, every required criterion, the criteria expression and
+        (with exclude_assigned) not being assigned to the study yet each
+        become a boolean column, so every row says which checks failed.
+        Criteria the match query cannot compile are skipped here too.
+
+        Returns:
+            Tuple of ([{"respondent_id", "eligible", "failed": [...]}, ...] in
+            request order with duplicates collapsed, ids with no respondent)
+        """
+        checks = [({"check": "active"}, Respondent.is_active)]
+        for criterion in required_criteria(study.criteria):
+            if criterion.field_name == PARTICIPATION_FIELD:
+                condition = self._build_exclusion([criterion])
+            else:
+                condition = self._build_condition(criterion)
+            if condition is not None:
+                label = {"check": "criterion", "criterion_id": criterion.id, "field_name": criterion.field_name}
+                checks.append((label, condition))
+        if study.criteria_expression is not None:
+            checks.append(({"check": "criteria_expression"}, self.compile_expression(study.criteria_expression)))
+        if exclude_assigned:
+            checks.append((
+                {"check": "not_assigned"},
+                ~exists(
+                    select(StudyAssignmentKey.study_id).where(
+                        StudyAssignmentKey.study_id == study.id,
+                        StudyAssignmentKey.respondent_id == Respondent.id,
+                    )
+                ),
+            ))
+
+        ids = list(dict.fromkeys(respondent_ids))
+        # NULL (e.g. a missing age) fails a check, as it does in WHERE
+        result = await self.db.execute(
+            select(
+                Respondent.id,
+                *[func.coalesce(condition, false()) for _, condition in checks],
+            ).where(Respondent.id == any_(literal(ids, ARRAY(Integer))))
+        )
+        flags = {row[0]: row[1:] for row in result.all()}
+
+        results = []
+        for respondent_id in ids:
+            if respondent_id not in flags:
+                continue
+            failed = [label for (label, _), passed in zip(checks, flags[respondent_id]) if not passed]
+            results.append({"respondent_id": respondent_id, "eligible": not failed, "failed": failed})
+        return results, [i for i in ids if i not in flags]
+
     async def check_respondent_matches(
         self,
         respondent_id: int,
         study_id: int,
     ) -> bool:
         """Check if a specific respondent matches a study's criteria."""
+        # Get study criteria; preferred ones never disqualify
+        criteria_list, expression = await self.get_screening(study_id)
+        tree = prune(screening_tree(required_criteria(criteria_list), expression))
+        if tree is None:
+            return False
+
         # Get the respondent
         respondent_result = await self.db.execute(
             select(Respondent).where(
@@ -123,17 +745,40 @@ class MatchingService:
         if not respondent:
             return False
 
-        # Get study criteria
-        criteria_result = await self.db.execute(
-            select(ScreenerCriteria).where(ScreenerCriteria.study_id == study_id)
-        )
-        criteria_list = list(criteria_result.scalars().all())
+        return await self._evaluate(tree, respondent)
 
-        # Check each criterion
-        for criterion in criteria_list:
-            if not self._respondent_matches_criterion(respondent, criterion):
-                return False
+    async def _evaluate(self, node: dict, respondent: Respondent) -> bool:
+        """
+        Evaluate a criteria tree for one respondent.
 
+        Children run in order_children order, so an AND stops at the first
+        failure and an OR at the first success, and participation rules
+        (a query each) only run when the in-memory checks leave it open.
+        """
+        if not is_group(node):
+            criterion = leaf(node)
+            if criterion.field_name != PARTICIPATION_FIELD:
+                return self._respondent_matches_criterion(respondent, criterion)
+            # Participation rules need assignment history from the database
+            exclusion = self._build_exclusion([criterion])
+            if exclusion is None:
+                return True
+            excluded_result = await self.db.execute(
+                select(Respondent.id).where(Respondent.id == respondent.id, exclusion)
+            )
+            return excluded_result.scalar_one_or_none() is not None
+
+        children = order_children(node)
+        if node["op"] == "not":
+            return not await self._evaluate(children[0], respondent)
+        if node["op"] == "or":
+            for child in children:
+                if await self._evaluate(child, respondent):
+                    return True
+            return False
+        for child in children:
+            if not await self._evaluate(child, respondent):
+                return False
         return True
 
     def _respondent_matches_criterion(
@@ -146,7 +791,11 @@ class MatchingService:
         operator = criterion.operator
         value = criterion.value
 
-        if not hasattr(respondent, field_name):
+        keys = profile_path(field_name)
+        if keys is not None:
+            return self._profile_matches(respondent.profile or {}, keys, operator, value)
+
+        if not hasattr(respondent, field_name) or field_name == "profile":
             return False
 
         respondent_value = getattr(respondent, field_name)
@@ -176,3 +825,49 @@ class MatchingService:
             return False
 
         return False
+
+    def _profile_matches(self, profile: dict, keys: List[str], operator: str, value) -> bool:
+        """Python counterpart of build_profile_condition."""
+        found = profile
+        for key in keys:
+            if not isinstance(found, dict) or key not in found:
+                found = _MISSING
+                break
+            found = found[key]
+
+        if operator == "eq":
+            return json_contains(profile, _nest(keys, value))
+
+        elif operator == "neq":
+            return found is not _MISSING and not json_contains(profile, _nest(keys, value))
+
+        elif operator == "in":
+            values = value if isinstance(value, list) else [value]
+            return any(json_contains(profile, _nest(keys, v)) for v in values)
+
+        elif operator == "contains":
+            values = value if isinstance(value, list) else [value]
+            return json_contains(profile, _nest(keys, values))
+
+        elif operator == "exists":
+            return (found is not _MISSING) == (value in (None, True))
+
+        elif operator in PROFILE_RANGE_FILTERS:
+            if found is _MISSING:
+                return False
+            if operator == "between":
+                if not isinstance(value, list) or len(value) != 2:
+                    return False
+                low, high = value
+            else:
+                low, high = (value, None) if operator == "gte" else (None, value)
+            # Like lax jsonpath: arrays are unwrapped, mismatched types never match
+            items = found if isinstance(found, list) else [found]
+            return any(
+                _comparable(item, low) and _comparable(item, high)
+                and (low is None or item >= low) and (high is None or item <= high)
+                for item in items
+            )
+
+        return False
+
@@ -0,0 +1,141 @@
+import re
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+PARENT = "study_assignments"
+DEFAULT_PARTITION = "study_assignments_default"
+ARCHIVE_SCHEMA = "archive"
+
+_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def month_start(value: date, offset: int = 0) -> date:
+    """First day of the month `offset` months after `value`."""
+    index = value.year * 12 + value.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_{month:%Y_%m}"
+
+
+class AssignmentPartitionService:
+    """
+    Maintains the monthly invited_at partitions of study_assignments.
+
+    Future months are created ahead of time so inserts never land in the
+    default partition; old months can be detached into the archive schema,
+    where they can be dumped or dropped without touching the live table.
+    study_assignment_keys keeps a row per detached assignment, so
+    participation history survives the detach.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_partitions(self) -> List[Tuple[str, Optional[date], Optional[date]]]:
+        """(name, lower bound, upper bound) per attached partition; bounds are None for default."""
+        result = await self.db.execute(text("""
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :parent
+            ORDER BY child.relname
+        """), {"parent": PARENT})
+
+        partitions = []
+        for name, bound in result:
+            match = _BOUND.search(bound)
+            if match:
+                lower, upper = (datetime.fromisoformat(v).date() for v in match.groups())
+                partitions.append((name, lower, upper))
+            else:
+                partitions.append((name, None, None))
+        return partitions
+
+    async def ensure_partitions(self, months_ahead: int = 3) -> List[str]:
+        """
+        Create partitions from the current month through `months_ahead`.
+
+        Months that already have rows in the default partition (because
+        maintenance fell behind) get a partition too, and those rows move
+        into it. Returns the names of the partitions created.
+        """
+        existing = {lower for _, lower, _ in await self.list_partitions() if lower}
+        this_month = month_start(date.today())
+        months = {month_start(this_month, i) for i in range(months_ahead + 1)}
+
+        stray = await self.db.execute(text(
+            f"SELECT DISTINCT date_trunc('month', invited_at)::date FROM {DEFAULT_PARTITION}"
+        ))
+        stray_months = set(stray.scalars().all())
+        months |= stray_months
+
+        created = []
+        for month in sorted(months - existing):
+            await self._create_partition(month, move_from_default=month in stray_months)
+            created.append(partition_name(month))
+        return created
+
+    async def _create_partition(self, month: date, move_from_default: bool) -> None:
+        name = partition_name(month)
+        lower, upper = month, month_start(month, 1)
+        # Built standalone then attached: attaching only needs SHARE UPDATE
+        # EXCLUSIVE on the parent and can take rows out of the default first
+        await self.db.execute(text(
+            f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        if move_from_default:
+            # Deleting from the default partition drops the rows' keys; block
+            # other writers until they are restored below
+            await self.db.execute(text("LOCK TABLE study_assignment_keys IN SHARE ROW EXCLUSIVE MODE"))
+            await self.db.execute(text(f"""
+                WITH moved AS (
+                    DELETE FROM {DEFAULT_PARTITION}
+                    WHERE invited_at >= :lower AND invited_at < :upper
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+            """), {"lower": lower, "upper": upper})
+        await self.db.execute(text(
+            f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+        if move_from_default:
+            await self.db.execute(text(f"""
+                INSERT INTO study_assignment_keys (study_id, respondent_id, invited_at)
+                SELECT study_id, respondent_id, invited_at FROM {name}
+                ON CONFLICT DO NOTHING
+            """))
+
+    async def maintain(
+        self, months_ahead: int = 3, retain_months: Optional[int] = None
+    ) -> Tuple[List[str], List[str]]:
+        """Create upcoming partitions and, with a retention, detach old ones."""
+        created = await self.ensure_partitions(months_ahead)
+        detached = []
+        if retain_months is not None:
+            detached = await self.detach_before(month_start(date.today(), -retain_months))
+        return created, detached
+
+    async def detach_before(self, cutoff: date) -> List[str]:
+        """
+        Detach partitions that end on or before `cutoff` into the archive schema.
+
+        Detaching fires no row triggers, so the rows' study_assignment_keys
+        stay: participation rules still exclude those respondents and the
+        pairs cannot be assigned again. Returns the names of the partitions
+        detached.
+        """
+        detached = []
+        for name, _, upper in await self.list_partitions():
+            if upper is None or upper > cutoff:
+                continue
+            await self.db.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+            await self.db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+            await self.db.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+            detached.append(name)
+        return detached
@@ -0,0 +1,171 @@
+import itertools
+import math
+from collections import Counter
+from typing import Dict, List, Tuple
+from sqlalchemy import select, and_, or_, case, func, values, column, String, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.respondent import Respondent
+from app.models.respondent_stats import RespondentStats
+from app.models.study import Study
+from app.models.study_match import StudyMatch
+from app.models.study_quota import StudyQuota
+from app.services.matching_service import MatchingService, sample_order
+
+# One bucket label per quota dimension, in quota order
+Cell = Tuple[str, ...]
+
+
+def allocate(size: int, quotas: List[StudyQuota]) -> Dict[Cell, int]:
+    """
+    Per-cell targets for interlocking quotas.
+
+    A cell takes one bucket from every dimension and its share is the
+    product of those bucket shares (normalised per dimension). Cells get the
+    floor of size * share, then the places left over go to the largest
+    remainders, so the targets always add up to `size`.
+    """
+    dimensions = []
+    for quota in quotas:
+        total = sum(bucket["share"] for bucket in quota.buckets)
+        dimensions.append([(bucket["label"], bucket["share"] / total) for bucket in quota.buckets])
+
+    exact = []
+    for cell in itertools.product(*dimensions):
+        share = math.prod(s for _, s in cell)
+        exact.append((tuple(label for label, _ in cell), round(size * share, 9)))
+
+    targets = {labels: int(amount) for labels, amount in exact}
+    left = size - sum(targets.values())
+    by_remainder = sorted(exact, key=lambda item: item[1] - int(item[1]), reverse=True)
+    for labels, _ in by_remainder[:left]:
+        targets[labels] += 1
+    return targets
+
+
+class QuotaSelectionService:
+    """
+    Picks a quota-balanced sample from a study's match set.
+
+    Every matching respondent is tagged with its bucket in each quota
+    dimension, ranked within its stratum with ROW_NUMBER() OVER (PARTITION
+    BY the buckets), and joined to a VALUES list of per-stratum targets; one
+    query returns the whole selection however many strata there are.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.matching = MatchingService(db)
+
+    async def get_quotas(self, study_id: int) -> List[StudyQuota]:
+        result = await self.db.execute(
+            select(StudyQuota).where(StudyQuota.study_id == study_id).order_by(StudyQuota.id)
+        )
+        return list(result.scalars().all())
+
+    async def select(
+        self,
+        study: Study,
+        size: int,
+        exclude_assigned: bool = True,
+        sort: str = "created",
+        seed: int = 0,
+    ) -> Tuple[List[int], List[dict]]:
+        """
+        Select up to `size` respondents meeting the study's quotas.
+
+        Within a stratum respondents are taken newest first (sort="created"),
+        best scored first (sort="score") or in the seed's random sample order
+        (sort="random"). A stratum with too few matches
+        stays short; its places are not handed to other strata.
+
+        Returns:
+            Tuple of (respondent ids grouped by stratum, [{"buckets", "target", "selected"}, ...])
+
+        Raises:
+            ValueError: the study has no quotas, or a bucket cannot be compiled
+        """
+        quotas = await self.get_quotas(study.id)
+        if not quotas:
+            raise ValueError("Study has no quotas")
+        criteria_list, expression = await self.matching.get_screening(study.id)
+
+        strata, membership = [], []
+        for quota in quotas:
+            whens = []
+            for bucket in quota.buckets:
+                condition = self.matching.build_field_condition(
+                    quota.field_name, bucket["operator"], bucket["value"]
+                )
+                if condition is None:
+                    raise ValueError(
+                        f"Quota bucket {bucket['label']!r} on {quota.field_name!r} is not supported"
+                    )
+                whens.append((condition, bucket["label"]))
+            strata.append(case(*whens))
+            # Respondents outside every bucket of a dimension fit no stratum
+            membership.append(or_(*[condition for condition, _ in whens]))
+
+        if study.status == "recruiting" and study.matches_refreshed_at is not None:
+            conditions = self.matching.materialized_conditions(
+                study.id, criteria_list, exclude_assigned
+            )
+            source = select(Respondent.id).join(
+                StudyMatch, StudyMatch.respondent_id == Respondent.id
+            )
+        else:
+            conditions = self.matching.build_match_conditions(
+                criteria_list,
+                exclude_study_id=study.id if exclude_assigned else None,
+                expression=expression,
+            )
+            source = select(Respondent.id)
+
+        if sort == "score":
+            order = [self.matching.build_score(criteria_list).desc(), Respondent.id]
+            source = source.outerjoin(
+                RespondentStats, RespondentStats.respondent_id == Respondent.id
+            )
+        elif sort == "random":
+            order = [sample_order(seed), Respondent.id]
+        else:
+            order = [Respondent.created_at.desc(), Respondent.id.desc()]
+
+        names = [f"stratum_{i}" for i in range(len(quotas))]
+        ranked = (
+            source.add_columns(
+                *[stratum.label(name) for stratum, name in zip(strata, names)],
+                func.row_number().over(partition_by=strata, order_by=order).label("rank"),
+            )
+            .where(*conditions, *membership)
+            .subquery("ranked")
+        )
+
+        targets = allocate(size, quotas)
+        target_rows = values(
+            *[column(name, String) for name in names],
+            column("target", Integer),
+            name="targets",
+        ).data([(*labels, target) for labels, target in targets.items() if target > 0])
+
+        result = await self.db.execute(
+            select(ranked.c.id, *[ranked.c[name] for name in names])
+            .join(
+                target_rows,
+                and_(*[ranked.c[name] == target_rows.c[name] for name in names]),
+            )
+            .where(ranked.c.rank <= target_rows.c.target)
+            .order_by(*[ranked.c[name] for name in names], ranked.c.rank)
+        )
+        rows = result.all()
+
+        selected = Counter(tuple(row[1:]) for row in rows)
+        strata_report = [
+            {
+                "buckets": {quota.field_name: label for quota, label in zip(quotas, labels)},
+                "target": target,
+                "selected": selected[labels],
+            }
+            for labels, target in targets.items()
+        ]
+        return [row[0] for row in rows], strata_report
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, delete, insert, exists, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.respondent import Respondent
+from app.models.respondent_archive import RespondentArchive
+from app.models.study_assignment import StudyAssignmentKey
+
+# change_xid stays behind: a restored row is stamped by the insert trigger,
+# so the change feed sees it again
+RESPONDENT_COLUMNS = [
+    column.name for column in Respondent.__table__.columns if column.name != "change_xid"
+]
+
+
+class RespondentArchiveService:
+    """
+    Moves long-inactive respondents out of the hot respondents table.
+
+    Each move is a single DELETE ... RETURNING feeding an INSERT, so a row is
+    never in both tables or in neither. Respondents with any assignment, even
+    in a detached partition, stay put: their study history must keep resolving.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def archive_inactive(self, inactive_days: int, limit: int = 1000) -> int:
+        """Archive up to `limit` respondents inactive for `inactive_days`. Returns the count."""
+        cutoff = datetime.utcnow() - timedelta(days=inactive_days)
+        candidates = (
+            select(Respondent.id)
+            .where(
+                Respondent.is_active == False,
+                Respondent.updated_at < cutoff,
+                ~exists().where(StudyAssignmentKey.respondent_id == Respondent.id),
+            )
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        moved = (
+            delete(Respondent)
+            .where(Respondent.id.in_(candidates.scalar_subquery()))
+            .returning(*[Respondent.__table__.c[name] for name in RESPONDENT_COLUMNS])
+            .cte("moved")
+        )
+        result = await self.db.execute(
+            insert(RespondentArchive).from_select(
+                RESPONDENT_COLUMNS + ["archived_at"],
+                select(*[moved.c[name] for name in RESPONDENT_COLUMNS], literal(datetime.utcnow())),
+            )
+        )
+        return result.rowcount
+
+    async def get(self, respondent_id: int) -> Optional[RespondentArchive]:
+        result = await self.db.execute(
+            select(RespondentArchive).where(RespondentArchive.id == respondent_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def restore(self, respondent_id: int) -> Optional[Respondent]:
+        """Move an archived respondent back into respondents, or None if not archived."""
+        moved = (
+            delete(RespondentArchive)
+            .where(RespondentArchive.id == respondent_id)
+            .returning(*[RespondentArchive.__table__.c[name] for name in RESPONDENT_COLUMNS])
+            .cte("moved")
+        )
+        result = await self.db.execute(
+            insert(Respondent)
+            .from_select(
+                RESPONDENT_COLUMNS,
+                select(*[moved.c[name] for name in RESPONDENT_COLUMNS]),
+            )
+            .returning(Respondent)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def email_archived(self, email: str) -> bool:
+        result = await self.db.execute(
+            select(exists().where(RespondentArchive.email == email))
+        )
+        return bool(result.scalar())
@@ -1,32 +1,153 @@
-from typing import Optional, List, Tuple
-from sqlalchemy import select, func
+import base64
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, Optional, List, Tuple
+from sqlalchemy import (
+    select, update, exists, literal, func, tuple_, bindparam, any_, cast, true, false, Integer, Select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, contains_eager
 
-from app.models.respondent import Respondent
+from app.models.respondent import Respondent, XID8
+from app.models.respondent_archive import RespondentArchive
+from app.models.study_assignment import StudyAssignment
 from app.schemas.respondent import RespondentCreate, RespondentUpdate
+from app.services.match_cache import bump_pool_version
+from app.services.matching_service import MatchingService
+from app.services.study_match_service import StudyMatchService
+
+
+# Filter name -> condition with a bound parameter of the same name. Statements
+# built from these are reused across calls, so SQLAlchemy finds them in its
+# compiled cache without rebuilding and re-walking a new select() tree.
+# is_active is rendered as a literal so the partial WHERE is_active indexes
+# stay usable under generic prepared-statement plans.
+RESPONDENT_FILTERS = {
+    "is_active": Respondent.is_active == true(),
+    "is_inactive": Respondent.is_active == false(),
+    "state": Respondent.state == bindparam("state"),
+    "age_min": Respondent.age >= bindparam("age_min"),
+    "age_max": Respondent.age <= bindparam("age_max"),
+    "household_income": Respondent.household_income == bindparam("household_income"),
+    "gender": Respondent.gender == bindparam("gender"),
+}
+
+# Filter combination -> (page statement, count statement); at most 3 * 2^5 entries
+_LIST_STATEMENTS: Dict[FrozenSet[str], Tuple[Select, Select]] = {}
+
+GET_BY_ID = select(Respondent).where(Respondent.id == bindparam("respondent_id"))
+GET_BY_EMAIL = select(Respondent).where(Respondent.email == bindparam("email"))
+# One array parameter, so every batch size shares a single prepared statement
+GET_MANY = select(Respondent).where(
+    Respondent.id == any_(bindparam("ids", type_=ARRAY(Integer)))
+)
+
+
+def list_statements(filters: FrozenSet[str]) -> Tuple[Select, Select]:
+    """Page and count statements for a combination of filters, built once."""
+    statements = _LIST_STATEMENTS.get(filters)
+    if statements is None:
+        conditions = [RESPONDENT_FILTERS[name] for name in sorted(filters)]
+        page = (
+            select(Respondent)
+            .where(*conditions)
+            .order_by(Respondent.created_at.desc())
+            .offset(bindparam("offset", type_=Integer))
+            .limit(bindparam("limit", type_=Integer))
+        )
+        count = select(func.count(Respondent.id)).where(*conditions)
+        statements = _LIST_STATEMENTS[filters] = (page, count)
+    return statements
+
+
+def encode_keyset_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def encode_change_cursor(change_xid: int, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"x{change_xid}|{row_id}".encode()).decode()
+
+
+def decode_change_cursor(cursor: str) -> Tuple[int, int]:
+    """Decode a change feed cursor; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        change_xid, row_id = raw.split("|")
+        if not change_xid.startswith("x"):
+            raise ValueError(raw)
+        return int(change_xid[1:]), int(row_id)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def decode_keyset_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a (timestamp, id) paging cursor; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, row_id = raw.split("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
 
 
 class RespondentService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create(self, data: RespondentCreate) -> Respondent:
-        respondent = Respondent(**data.model_dump())
-        self.db.add(respondent)
-        await self.db.flush()
-        await self.db.refresh(respondent)
-        return respondent
+    async def create(self, data: RespondentCreate) -> Optional[Respondent]:
+        """
+        Insert a respondent in one round trip, or None if the email is taken.
 
-    async def get_by_id(self, respondent_id: int) -> Optional[Respondent]:
+        The duplicate check rides along with the INSERT: ON CONFLICT covers
+        live respondents and the NOT EXISTS covers archived ones.
+        """
+        # Equal timestamps mark the row as "created" in the change feed
+        now = datetime.utcnow()
+        values = {**data.model_dump(), "created_at": now, "updated_at": now}
+        columns = Respondent.__table__.c
+        source = select(
+            *[literal(value, columns[name].type) for name, value in values.items()]
+        ).where(~exists().where(RespondentArchive.email == data.email))
         result = await self.db.execute(
-            select(Respondent).where(Respondent.id == respondent_id)
+            insert(Respondent)
+            .from_select(list(values), source)
+            .on_conflict_do_nothing(index_elements=[Respondent.email])
+            .returning(Respondent)
         )
+        respondent = result.scalar_one_or_none()
+        if respondent is not None:
+            await self._changed(respondent.id)
+        return respondent
+
+    async def _changed(self, respondent_id: int, fields: Optional[Iterable[str]] = None) -> None:
+        """
+        Refresh match state after a write; fields=None means a new respondent.
+
+        Edits to fields no criterion uses cannot change any study's matches,
+        so they leave cached pages and materialized matches alone.
+        """
+        if fields is not None and not await MatchingService(self.db).affects_screening(fields):
+            return
+        await bump_pool_version(self.db, respondent_id)
+        await StudyMatchService(self.db).refresh_respondents([respondent_id])
+
+    async def get_by_id(self, respondent_id: int) -> Optional[Respondent]:
+        result = await self.db.execute(GET_BY_ID, {"respondent_id": respondent_id})
         return result.scalar_one_or_none()
 
-    async def get_by_email(self, email: str) -> Optional[Respondent]:
-        result = await self.db.execute(
-            select(Respondent).where(Respondent.email == email)
+    async def get_many(self, ids: List[int]) -> Tuple[List[Respondent], List[int]]:
+        """Fetch respondents by id in request order. Returns (found, missing ids)."""
+        ids = list(dict.fromkeys(ids))
+        result = await self.db.execute(GET_MANY, {"ids": ids})
+        found = {respondent.id: respondent for respondent in result.scalars().all()}
+        return (
+            [found[i] for i in ids if i in found],
+            [i for i in ids if i not in found],
         )
+
+    async def get_by_email(self, email: str) -> Optional[Respondent]:
+        result = await self.db.execute(GET_BY_EMAIL, {"email": email})
         return result.scalar_one_or_none()
 
     async def list(
@@ -40,55 +161,152 @@ class RespondentService:
         gender: Optional[str] = None,
         is_active: Optional[bool] = True,
     ) -> Tuple[List[Respondent], int]:
-        query = select(Respondent)
-        count_query = select(func.count(Respondent.id))
-
-        # Apply filters
+        # Only the filters that are set become part of the statement
+        params = {}
+        filters = set()
         if is_active is not None:
-            query = query.where(Respondent.is_active == is_active)
-            count_query = count_query.where(Respondent.is_active == is_active)
-
+            filters.add("is_active" if is_active else "is_inactive")
         if state:
-            query = query.where(Respondent.state == state)
-            count_query = count_query.where(Respondent.state == state)
-
+            params["state"] = state
         if age_min is not None:
-            query = query.where(Respondent.age >= age_min)
-            count_query = count_query.where(Respondent.age >= age_min)
-
+            params["age_min"] = age_min
         if age_max is not None:
-            query = query.where(Respondent.age <= age_max)
-            count_query = count_query.where(Respondent.age <= age_max)
-
+            params["age_max"] = age_max
         if household_income:
-            query = query.where(Respondent.household_income == household_income)
-            count_query = count_query.where(Respondent.household_income == household_income)
-
+            params["household_income"] = household_income
         if gender:
-            query = query.where(Respondent.gender == gender)
-            count_query = count_query.where(Respondent.gender == gender)
+            params["gender"] = gender
+
+        query, count_query = list_statements(frozenset(filters.union(params)))
 
         # Get total count
-        total_result = await self.db.execute(count_query)
+        total_result = await self.db.execute(count_query, params)
         total = total_result.scalar()
 
         # Apply pagination
-        query = query.order_by(Respondent.created_at.desc()).offset(offset).limit(limit)
-        result = await self.db.execute(query)
+        result = await self.db.execute(query, {**params, "limit": limit, "offset": offset})
         respondents = list(result.scalars().all())
 
         return respondents, total
 
-    async def update(self, respondent: Respondent, data: RespondentUpdate) -> Respondent:
+    async def list_changes(
+        self,
+        since: Optional[str] = None,
+        limit: int = 500,
+    ) -> Tuple[List[Respondent], Optional[str], bool]:
+        """
+        Respondents changed after a cursor, in (change_xid, id) order.
+
+        Every write stamps the row with its transaction id. Only rows written
+        by transactions older than the snapshot's xmin are returned: those
+        have all finished, and any transaction still open or yet to start
+        has an id at or above xmin, so however long it stays open its rows
+        sort after the cursor. An open transaction holds back newer changes
+        until it ends.
+
+        Returns:
+            Tuple of (changed respondents, next cursor, has more)
+        """
+        horizon = func.pg_snapshot_xmin(func.pg_current_snapshot())
+        query = select(Respondent).where(Respondent.change_xid < horizon)
+        if since:
+            change_xid, respondent_id = decode_change_cursor(since)
+            query = query.where(
+                tuple_(Respondent.change_xid, Respondent.id)
+                > tuple_(cast(literal(str(change_xid)), XID8), respondent_id)
+            )
+
+        # Fetch one extra row to know whether another batch follows
+        query = query.order_by(Respondent.change_xid, Respondent.id).limit(limit + 1)
+        result = await self.db.execute(query)
+        respondents = list(result.scalars().all())
+
+        has_more = len(respondents) > limit
+        respondents = respondents[:limit]
+        if respondents:
+            last = respondents[-1]
+            next_cursor = encode_change_cursor(last.change_xid, last.id)
+        else:
+            next_cursor = since
+
+        return respondents, next_cursor, has_more
+
+    async def list_history(
+        self,
+        respondent_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> Tuple[List[StudyAssignment], Optional[str]]:
+        """
+        A respondent's assignments with their studies, newest invite first.
+
+        Keyset paged on (invited_at, id) via ix_study_assignments_respondent_invited.
+
+        Returns:
+            Tuple of (assignments, next cursor or None on the last page)
+        """
+        query = (
+            select(StudyAssignment)
+            .join(StudyAssignment.study)
+            .options(contains_eager(StudyAssignment.study))
+            .where(StudyAssignment.respondent_id == respondent_id)
+        )
+        if cursor:
+            invited_at, assignment_id = decode_keyset_cursor(cursor)
+            query = query.where(
+                tuple_(StudyAssignment.invited_at, StudyAssignment.id)
+                < tuple_(invited_at, assignment_id)
+            )
+
+        query = query.order_by(
+            StudyAssignment.invited_at.desc(), StudyAssignment.id.desc()
+        ).limit(limit + 1)
+        result = await self.db.execute(query)
+        assignments = list(result.scalars().all())
+
+        next_cursor = None
+        if len(assignments) > limit:
+            assignments = assignments[:limit]
+            last = assignments[-1]
+            next_cursor = encode_keyset_cursor(last.invited_at, last.id)
+        return assignments, next_cursor
+
+    async def update(self, respondent_id: int, data: RespondentUpdate) -> Optional[Respondent]:
+        """
+        Apply `data` with a single UPDATE ... RETURNING.
+
+        Returns None when no row was updated: the respondent does not exist,
+        or `data.email` belongs to another live or archived respondent.
+        """
         update_data = data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(respondent, field, value)
-        await self.db.flush()
-        await self.db.refresh(respondent)
-        return respondent
+        if not update_data:
+            return await self.get_by_id(respondent_id)
 
-    async def soft_delete(self, respondent: Respondent) -> Respondent:
-        respondent.is_active = False
-        await self.db.flush()
-        await self.db.refresh(respondent)
+        stmt = update(Respondent).where(Respondent.id == respondent_id)
+        if "email" in update_data:
+            others = aliased(Respondent)
+            stmt = stmt.where(
+                ~exists().where(others.email == update_data["email"], others.id != respondent_id),
+                ~exists().where(RespondentArchive.email == update_data["email"]),
+            )
+        return await self._update_returning(stmt.values(**update_data), update_data)
+
+    async def soft_delete(self, respondent_id: int) -> Optional[Respondent]:
+        """Set is_active=false in one round trip, or None if there is no such respondent."""
+        return await self._update_returning(
+            update(Respondent).where(Respondent.id == respondent_id).values(is_active=False),
+            ["is_active"],
+        )
+
+    async def _update_returning(self, stmt, fields: Iterable[str]) -> Optional[Respondent]:
+        # updated_at comes from the column's onupdate. Loading the RETURNING
+        # row through a select overwrites any copy already in the session
+        result = await self.db.execute(
+            select(Respondent)
+            .from_statement(stmt.returning(Respondent))
+            .execution_options(populate_existing=True)
+        )
+        respondent = result.scalar_one_or_none()
+        if respondent is not None:
+            await self._changed(respondent.id, fields)
         return respondent
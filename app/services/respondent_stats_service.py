@@ -0,0 +1,156 @@
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List, Optional
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.respondent_stats import RespondentStats
+from app.models.study_assignment import StudyAssignment
+
+# Assignment statuses with their own counter column
+STATUS_COUNTERS = {
+    "completed": "completed_count",
+    "no_show": "no_show_count",
+}
+
+
+class RespondentStatsService:
+    """
+    Maintains respondent_stats alongside assignment writes.
+
+    Every change is a relative UPDATE/upsert in the caller's transaction,
+    so concurrent writers never lose increments and reads are one row.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, respondent_id: int) -> Optional[RespondentStats]:
+        result = await self.db.execute(
+            select(RespondentStats).where(RespondentStats.respondent_id == respondent_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def record_invites(self, respondent_ids: Iterable[int]) -> None:
+        """Count new assignments (always created as invited)."""
+        counts = Counter(respondent_ids)
+        if not counts:
+            return
+        stmt = insert(RespondentStats).values([
+            {"respondent_id": respondent_id, "invited_count": count}
+            for respondent_id, count in sorted(counts.items())
+        ])
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[RespondentStats.respondent_id],
+                set_={
+                    "invited_count": RespondentStats.invited_count + stmt.excluded.invited_count,
+                    "updated_at": datetime.utcnow(),
+                },
+            )
+        )
+
+    async def record_status_change(
+        self,
+        respondent_id: int,
+        old_status: str,
+        new_status: str,
+        completed_at: Optional[datetime] = None,
+    ) -> None:
+        """Move one assignment between status counters."""
+        if old_status == new_status:
+            return
+        values = {}
+        for status, delta in ((old_status, -1), (new_status, 1)):
+            column = STATUS_COUNTERS.get(status)
+            if column:
+                values[column] = getattr(RespondentStats, column) + delta
+        if old_status == "completed":
+            # A reverted completion may have been the latest; re-read the
+            # history (this transaction already sees the new status)
+            values["last_participation_at"] = self._last_participation(respondent_id)
+        elif new_status == "completed" and completed_at is not None:
+            # greatest() ignores NULL, so the first completion sets the date
+            values["last_participation_at"] = func.greatest(
+                RespondentStats.last_participation_at, completed_at
+            )
+        if not values:
+            return
+        await self.db.execute(
+            update(RespondentStats)
+            .where(RespondentStats.respondent_id == respondent_id)
+            .values(**values, updated_at=datetime.utcnow())
+        )
+
+    @staticmethod
+    def _last_participation(respondent_id: int):
+        return (
+            select(func.max(StudyAssignment.completed_at))
+            .where(
+                StudyAssignment.respondent_id == respondent_id,
+                StudyAssignment.status == "completed",
+            )
+            .scalar_subquery()
+        )
+
+    async def rebuild(self, respondent_ids: Optional[List[int]] = None) -> None:
+        """
+        Recompute stats from study_assignments, for writes that bypass the
+        services (bulk edits, deleted assignments).
+        """
+        # Respondents left without any assignment get no source row below
+        reset = update(RespondentStats).where(
+            ~select(StudyAssignment.id)
+            .where(StudyAssignment.respondent_id == RespondentStats.respondent_id)
+            .exists()
+        )
+        if respondent_ids is not None:
+            reset = reset.where(RespondentStats.respondent_id.in_(respondent_ids))
+        await self.db.execute(
+            reset.values(
+                invited_count=0,
+                completed_count=0,
+                no_show_count=0,
+                last_participation_at=None,
+                updated_at=datetime.utcnow(),
+            )
+        )
+
+        source = select(
+            StudyAssignment.respondent_id,
+            func.count(StudyAssignment.id),
+            func.count(StudyAssignment.id).filter(StudyAssignment.status == "completed"),
+            func.count(StudyAssignment.id).filter(StudyAssignment.status == "no_show"),
+            func.max(StudyAssignment.completed_at).filter(StudyAssignment.status == "completed"),
+            func.timezone("utc", func.now()),
+        ).group_by(StudyAssignment.respondent_id)
+        if respondent_ids is not None:
+            source = source.where(StudyAssignment.respondent_id.in_(respondent_ids))
+
+        stmt = insert(RespondentStats).from_select(
+            [
+                "respondent_id",
+                "invited_count",
+                "completed_count",
+                "no_show_count",
+                "last_participation_at",
+                "updated_at",
+            ],
+            source,
+        )
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[RespondentStats.respondent_id],
+                set_={
+                    column: getattr(stmt.excluded, column)
+                    for column in (
+                        "invited_count",
+                        "completed_count",
+                        "no_show_count",
+                        "last_participation_at",
+                        "updated_at",
+                    )
+                },
+            )
+        )
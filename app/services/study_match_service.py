@@ -0,0 +1,134 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import select, delete, insert, update, literal, union_all, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.respondent import Respondent
+from app.models.study import Study
+from app.models.study_match import StudyMatch
+from app.services.criteria_expression import has_time_window, is_time_windowed, needs_database
+from app.services.job_service import JobService
+from app.services.matching_service import MatchingService, PARTICIPATION_FIELD
+
+MATCH_COLUMNS = ["study_id", "respondent_id", "respondent_created_at"]
+
+
+class StudyMatchService:
+    """
+    Keeps the study_matches materialization in step with writes.
+
+    Only recruiting studies with matches_refreshed_at set are materialized;
+    /match falls back to evaluating criteria live for everything else.
+
+    Rows hold the criteria whose outcome only changes with a write. Required
+    time-windowed participation rules ("not with this client in the last N
+    days") are left out and applied when the rows are read, since the
+    window moves on its own. A study with such a rule inside its criteria
+    expression cannot be split that way and is not materialized.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.matching = MatchingService(db)
+
+    async def _materialized_studies(self, participation_only: bool = False) -> List[Study]:
+        result = await self.db.execute(
+            select(Study)
+            .options(selectinload(Study.criteria))
+            .where(
+                Study.status == "recruiting",
+                Study.matches_refreshed_at.is_not(None),
+            )
+        )
+        studies = list(result.scalars().all())
+        if participation_only:
+            studies = [
+                study for study in studies
+                if any(c.field_name == PARTICIPATION_FIELD for c in study.criteria)
+                or needs_database(study.criteria_expression)
+            ]
+        return studies
+
+    def _match_select(self, study: Study, respondent_ids: Optional[List[int]] = None):
+        query = select(
+            literal(study.id, Integer).label("study_id"),
+            Respondent.id,
+            Respondent.created_at,
+        ).where(*self.matching.build_match_conditions(
+            [c for c in study.criteria if not is_time_windowed(c)],
+            expression=study.criteria_expression,
+        ))
+        if respondent_ids is not None:
+            query = query.where(Respondent.id.in_(respondent_ids))
+        return query
+
+    async def refresh_respondents(
+        self,
+        respondent_ids: List[int],
+        participation_only: bool = False,
+    ) -> None:
+        """
+        Re-evaluate a few respondents against every materialized study.
+
+        Runs as one DELETE plus one INSERT ... SELECT (UNION ALL across
+        studies), so the cost per write does not grow with pool size.
+        """
+        if not respondent_ids:
+            return
+        studies = await self._materialized_studies(participation_only)
+        if not studies:
+            return
+
+        await self.db.execute(
+            delete(StudyMatch).where(
+                StudyMatch.study_id.in_([study.id for study in studies]),
+                StudyMatch.respondent_id.in_(respondent_ids),
+            )
+        )
+        selects = [self._match_select(study, respondent_ids) for study in studies]
+        source = union_all(*selects) if len(selects) > 1 else selects[0]
+        await self.db.execute(insert(StudyMatch).from_select(MATCH_COLUMNS, source))
+
+    async def rebuild_study(self, study_id: int) -> int:
+        """
+        Recompute one study's matches from scratch. Returns the row count.
+
+        Studies that are not recruiting, or whose criteria expression holds
+        a time-windowed rule, are cleared and left unmaterialized.
+        """
+        result = await self.db.execute(
+            select(Study)
+            .options(selectinload(Study.criteria))
+            .where(Study.id == study_id)
+            .execution_options(populate_existing=True)
+        )
+        study = result.scalar_one_or_none()
+
+        await self.db.execute(delete(StudyMatch).where(StudyMatch.study_id == study_id))
+        if study is None:
+            return 0
+        if study.status != "recruiting" or has_time_window(study.criteria_expression):
+            study.matches_refreshed_at = None
+            await self.db.flush()
+            return 0
+
+        refreshed_at = datetime.utcnow()
+        count = 0
+        if not self.matching.matches_nothing(study.criteria, study.criteria_expression):
+            inserted = await self.db.execute(
+                insert(StudyMatch).from_select(MATCH_COLUMNS, self._match_select(study))
+            )
+            count = inserted.rowcount
+        await self.db.execute(
+            update(Study)
+            .where(Study.id == study_id)
+            .values(matches_refreshed_at=refreshed_at)
+        )
+        return count
+
+    async def schedule_rebuild(self, study: Study) -> None:
+        """Stop serving a study's materialized matches and queue a rebuild."""
+        study.matches_refreshed_at = None
+        await self.db.flush()
+        await JobService(self.db).enqueue("rebuild_study_matches", {"study_id": study.id})
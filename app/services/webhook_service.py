@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models.outbox_event import OutboxEvent
+from app.models.study_assignment import StudyAssignment
+from app.schemas.study_assignment import AssignmentResponse
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+class OutboxService:
+    """Writes webhook events into the outbox inside the caller's transaction."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def record(self, event_type: str, payload: dict) -> None:
+        """Queue one event per configured endpoint; no-op when none are configured."""
+        for endpoint in settings.webhook_endpoints:
+            self.db.add(OutboxEvent(endpoint=endpoint, event_type=event_type, payload=payload))
+
+    def record_assignment(self, event_type: str, assignment: StudyAssignment, **extra) -> None:
+        payload = AssignmentResponse.model_validate(assignment).model_dump(mode="json")
+        payload.update(extra)
+        self.record(event_type, payload)
+
+
+class WebhookDispatcher:
+    """
+    Delivers outbox events in per-endpoint batches with bounded concurrency.
+
+    Events are leased (next_attempt_at pushed forward) when claimed, so no
+    row locks are held during HTTP calls and several dispatchers can run.
+    Failed batches are retried with exponential backoff until max_attempts.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        batch_size: int = 100,
+        max_concurrency: int = 4,
+        max_attempts: int = 8,
+        base_backoff: float = 2.0,
+        max_backoff: float = 600.0,
+        lease_seconds: float = 60.0,
+        poll_interval: float = 2.0,
+        timeout: float = 10.0,
+    ):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.transport = transport
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="webhook-dispatcher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Webhook dispatch failed")
+                claimed = 0
+            if not claimed:
+                await asyncio.sleep(self.poll_interval)
+
+    async def dispatch_once(self) -> int:
+        """Claim due events, deliver them, and record results. Returns events claimed."""
+        events = await self._claim()
+        if not events:
+            return 0
+
+        by_endpoint: Dict[str, List[OutboxEvent]] = defaultdict(list)
+        for event in events:
+            by_endpoint[event.endpoint].append(event)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with httpx.AsyncClient(transport=self.transport, timeout=self.timeout) as client:
+            results = await asyncio.gather(*(
+                self._send(client, semaphore, endpoint, batch[i:i + self.batch_size])
+                for endpoint, batch in by_endpoint.items()
+                for i in range(0, len(batch), self.batch_size)
+            ))
+
+        await self._record(results)
+        return len(events)
+
+    async def _claim(self) -> List[OutboxEvent]:
+        now = datetime.utcnow()
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(OutboxEvent)
+                .where(OutboxEvent.status == "pending", OutboxEvent.next_attempt_at <= now)
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size * self.max_concurrency)
+                .with_for_update(skip_locked=True)
+            )
+            events = list(result.scalars().all())
+            if events:
+                await session.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_([e.id for e in events]))
+                    .values(next_attempt_at=now + timedelta(seconds=self.lease_seconds))
+                )
+            await session.commit()
+            return events
+
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        endpoint: str,
+        batch: List[OutboxEvent],
+    ) -> Tuple[List[OutboxEvent], Optional[str]]:
+        body = {
+            "events": [
+                {
+                    "id": event.id,
+                    "type": event.event_type,
+                    "created_at": event.created_at.isoformat(),
+                    "data": event.payload,
+                }
+                for event in batch
+            ]
+        }
+        async with semaphore:
+            try:
+                response = await client.post(endpoint, json=body)
+                response.raise_for_status()
+            except httpx.HTTPError as exc:
+                logger.warning("Webhook delivery to %s failed: %s", endpoint, exc)
+                return batch, str(exc) or exc.__class__.__name__
+        return batch, None
+
+    def _backoff(self, attempts: int) -> timedelta:
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempts))
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    async def _record(self, results: List[Tuple[List[OutboxEvent], Optional[str]]]) -> None:
+        now = datetime.utcnow()
+        delivered = [e.id for batch, error in results if error is None for e in batch]
+
+        async with self.session_factory() as session:
+            if delivered:
+                await session.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_(delivered))
+                    .values(status="delivered", delivered_at=now, last_error=None)
+                )
+            # Events in a failed batch share the error; group by attempt count
+            # so each backoff step is one UPDATE
+            retries: Dict[Tuple[int, str], List[int]] = defaultdict(list)
+            for batch, error in results:
+                if error is None:
+                    continue
+                for event in batch:
+                    retries[(event.attempts + 1, error[:1000])].append(event.id)
+
+            for (attempts, error), ids in retries.items():
+                values = {"attempts": attempts, "last_error": error}
+                if attempts >= self.max_attempts:
+                    values["status"] = "failed"
+                else:
+                    values["next_attempt_at"] = now + self._backoff(attempts)
+                await session.execute(
+                    update(OutboxEvent).where(OutboxEvent.id.in_(ids)).values(**values)
+                )
+            await session.commit()
+
+
+webhook_dispatcher = WebhookDispatcher(
+    batch_size=settings.webhook_batch_size,
+    max_concurrency=settings.webhook_max_concurrency,
+    max_attempts=settings.webhook_max_attempts,
+)
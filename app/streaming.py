@@ -0,0 +1,52 @@
+"""
+Streamed JSON for paged list responses.
+
+FastAPI normally turns a whole page into a dict tree, then one JSON string,
+then one bytes object before sending. stream_page encodes items in small
+batches instead, and the compression middleware compresses each batch as
+it passes, so neither the dict tree nor the whole body is ever built.
+"""
+import json
+from typing import Any, AsyncIterator, Callable, Sequence
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+STREAM_BATCH_SIZE = 50
+
+
+def encode_model(item: BaseModel) -> bytes:
+    return item.model_dump_json().encode()
+
+
+def encode_dict(item: dict) -> bytes:
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def _page_body(
+    items: Sequence[Any],
+    encode: Callable[[Any], bytes],
+    fields: dict,
+) -> AsyncIterator[bytes]:
+    yield b'{"items":['
+    for start in range(0, len(items), STREAM_BATCH_SIZE):
+        batch = b",".join(encode(item) for item in items[start:start + STREAM_BATCH_SIZE])
+        yield batch if start == 0 else b"," + batch
+    # Remaining fields, e.g. total/limit/offset, rendered as a JSON object tail
+    tail = encode_dict(fields)
+    yield b"]" + (b"," + tail[1:] if fields else b"}")
+
+
+def stream_page(
+    items: Sequence[Any],
+    encode: Callable[[Any], bytes] = encode_model,
+    **fields: Any,
+) -> StreamingResponse:
+    """
+    Stream {"items": [...], **fields} as JSON.
+
+    Items must already be detached from the database session (Pydantic
+    models or plain dicts): the request's session is closed before the
+    body is sent.
+    """
+    return StreamingResponse(_page_body(items, encode, fields), media_type="application/json")
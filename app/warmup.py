@@ -0,0 +1,80 @@
+"""Startup warmup steps run from the application lifespan."""
+import asyncio
+import logging
+import os
+from typing import List, Optional
+
+from sqlalchemy import select, text
+
+from app.database import AsyncSessionLocal, engine
+from app.models.study import Study
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def warm_pool(connections: Optional[int] = None) -> int:
+    """Open pool connections up front so first requests skip the TCP/auth handshake."""
+    count = connections or engine.pool.size()
+
+    async def touch():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(touch() for _ in range(count)))
+    return count
+
+
+async def prime_statement_cache(match_studies: int = 10) -> List[int]:
+    """
+    Run the hot read paths once so SQLAlchemy's compiled cache, asyncpg's
+    prepared statements and the match cache are populated.
+
+    Returns the ids of recruiting studies whose first match page was primed.
+    """
+    from app.services.match_cache import get_match_page
+    from app.services.respondent_service import RespondentService
+
+    async with AsyncSessionLocal() as session:
+        service = RespondentService(session)
+        await service.list(limit=1)
+        await service.get_by_id(0)
+        await service.get_by_email("")
+
+        result = await session.execute(
+            select(Study.id)
+            .where(Study.status == "recruiting")
+            .order_by(Study.id.desc())
+            .limit(match_studies)
+        )
+        study_ids = list(result.scalars().all())
+        for study_id in study_ids:
+            await get_match_page(session, study_id, exclude_assigned=True, limit=50, offset=0)
+        await session.rollback()
+    return study_ids
+
+
+async def check_migrations() -> Optional[bool]:
+    """
+    Compare the database's alembic revision with the latest migration.
+
+    Returns True if current, False if behind, None if the database is not
+    managed by alembic (e.g. created with metadata.create_all in tests).
+    """
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(PROJECT_ROOT, "alembic"))
+    head = ScriptDirectory.from_config(config).get_current_head()
+    async with engine.connect() as conn:
+        has_table = (await conn.execute(text("SELECT to_regclass('alembic_version')"))).scalar()
+        if has_table is None:
+            return None
+        current = (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+
+    if current != head:
+        logger.warning("Database is at migration %s but the code expects %s", current, head)
+        return False
+    return True
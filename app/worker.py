@@ -0,0 +1,30 @@
+"""
+Standalone background job worker and webhook dispatcher.
+Run with: python -m app.worker
+
+Use this with RUN_JOBS_IN_PROCESS=false and
+RUN_WEBHOOK_DISPATCHER_IN_PROCESS=false to keep long jobs and webhook
+delivery out of the API processes entirely.
+"""
+import asyncio
+import logging
+
+from app.services import job_runner, webhook_dispatcher
+
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO)
+    await job_runner.start()
+    await webhook_dispatcher.start()
+    logger.info("Job worker started with %d workers", job_runner.workers)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await webhook_dispatcher.stop()
+        await job_runner.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,35 @@
+"""
+Move long-inactive respondents into respondents_archive.
+Run with: python -m scripts.archive_respondents [inactive_days]
+
+Defaults to ARCHIVE_INACTIVE_AFTER_DAYS. Works in batches, each in its own
+transaction; archived respondents come back when updated with is_active=true.
+"""
+import asyncio
+import sys
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.services.respondent_archive_service import RespondentArchiveService
+
+BATCH_SIZE = 1000
+
+
+async def archive(inactive_days: int):
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            moved = await RespondentArchiveService(session).archive_inactive(
+                inactive_days, limit=BATCH_SIZE
+            )
+            await session.commit()
+        total += moved
+        if moved < BATCH_SIZE:
+            break
+
+    print(f"Archived {total} respondents inactive for {inactive_days}+ days")
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else get_settings().archive_inactive_after_days
+    asyncio.run(archive(days))
@@ -0,0 +1,74 @@
+"""
+Compare CPU cost and bytes saved for each response encoding and level.
+Run with: python -m scripts.benchmark_compression [page_size]
+
+Uses a synthetic page of respondent records shaped like GET /api/respondents
+output (default 200 items, the /match maximum). Encodings whose library is
+not installed are skipped.
+"""
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from app.compression import _brotli, _gzip, _zstd, brotli, zstandard
+
+STATES = ["NY", "CA", "TX", "IL", "WA", "FL", "OR", "MA"]
+INCOMES = ["<25k", "25k-50k", "50k-75k", "75k-100k", "100k+"]
+
+
+def sample_page(size: int) -> bytes:
+    now = datetime(2026, 10, 18)
+    items = []
+    for i in range(size):
+        created = now - timedelta(days=random.randint(0, 900), seconds=random.randint(0, 86400))
+        items.append({
+            "first_name": random.choice(["Ana", "Ben", "Chen", "Dara", "Eli", "Fatima"]),
+            "last_name": random.choice(["Lopez", "Smith", "Wu", "Okafor", "Novak"]) + str(i),
+            "email": f"respondent{i}@example.com",
+            "phone": f"555-{random.randint(100, 999)}-{random.randint(1000, 9999)}",
+            "city": random.choice(["Portland", "Austin", "Chicago", "Boston"]),
+            "state": random.choice(STATES),
+            "zip_code": f"{random.randint(10000, 99999)}",
+            "age": random.randint(18, 80),
+            "gender": random.choice(["female", "male", "non-binary"]),
+            "ethnicity": random.choice(["hispanic", "white", "black", "asian"]),
+            "household_income": random.choice(INCOMES),
+            "occupation": random.choice(["teacher", "nurse", "engineer", "designer"]),
+            "id": i + 1,
+            "is_active": True,
+            "created_at": created.isoformat(),
+            "updated_at": created.isoformat(),
+        })
+    return json.dumps({"items": items, "total": size * 40, "limit": size, "offset": 0}).encode()
+
+
+def measure(name: str, factory, body: bytes, rounds: int = 50) -> None:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        compressor = factory()
+        compressed = compressor.compress(body) + compressor.flush()
+    elapsed_ms = (time.perf_counter() - started) / rounds * 1000
+    print(
+        f"{name:<12} {len(compressed):>8} bytes  "
+        f"{len(compressed) / len(body):>6.1%}  {elapsed_ms:>7.2f} ms"
+    )
+
+
+def main(page_size: int) -> None:
+    random.seed(42)
+    body = sample_page(page_size)
+    print(f"{page_size} items, {len(body)} bytes uncompressed\n")
+    for level in (1, 5, 6, 9):
+        measure(f"gzip-{level}", lambda: _gzip(level), body)
+    if zstandard is not None:
+        for level in (1, 3, 9):
+            measure(f"zstd-{level}", lambda: _zstd(level), body)
+    if brotli is not None:
+        for level in (1, 4, 8):
+            measure(f"br-{level}", lambda: _brotli(level), body)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,33 @@
+"""
+Maintain the monthly study_assignments partitions.
+Run with: python -m scripts.maintain_partitions [retain_months]
+
+Creates partitions ASSIGNMENT_PARTITION_MONTHS_AHEAD months ahead. With a
+retention (argument or ASSIGNMENT_PARTITION_RETAIN_MONTHS), partitions older
+than that many months are detached into the "archive" schema. Job workers
+already run the same maintenance every ASSIGNMENT_PARTITION_MAINTENANCE_HOURS;
+this is for running it by hand.
+"""
+import asyncio
+import sys
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.services.partition_service import AssignmentPartitionService
+
+
+async def maintain(retain_months):
+    settings = get_settings()
+    async with AsyncSessionLocal() as session:
+        created, detached = await AssignmentPartitionService(session).maintain(
+            settings.assignment_partition_months_ahead, retain_months
+        )
+        await session.commit()
+
+    print(f"Created: {', '.join(created) or 'none'}")
+    print(f"Detached: {', '.join(detached) or 'none'}")
+
+
+if __name__ == "__main__":
+    retain = int(sys.argv[1]) if len(sys.argv) > 1 else get_settings().assignment_partition_retain_months
+    asyncio.run(maintain(retain))
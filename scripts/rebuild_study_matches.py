@@ -0,0 +1,36 @@
+"""
+Rebuild the study_matches materialization from scratch.
+Run with: python -m scripts.rebuild_study_matches [study_id ...]
+
+With no arguments every recruiting study is rebuilt. Use this to recover
+after a failed rebuild job or a manual data fix.
+"""
+import asyncio
+import sys
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models.study import Study
+from app.services.study_match_service import StudyMatchService
+
+
+async def rebuild(study_ids):
+    if not study_ids:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Study.id).where(Study.status == "recruiting").order_by(Study.id)
+            )
+            study_ids = list(result.scalars().all())
+
+    for study_id in study_ids:
+        async with AsyncSessionLocal() as session:
+            count = await StudyMatchService(session).rebuild_study(study_id)
+            await session.commit()
+        print(f"Study {study_id}: {count} matches")
+
+    print(f"Rebuilt {len(study_ids)} studies")
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild([int(arg) for arg in sys.argv[1:]]))
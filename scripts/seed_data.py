@@ -181,6 +181,7 @@ STUDY_TEMPLATES = [
         "incentive_amount": Decimal("125.00"),
         "criteria": [
             {"field_name": "age", "operator": "between", "value": [25, 60]},
+            {"field_name": "profile.pets", "operator": "contains", "value": ["dog"]},
         ]
     },
     {
@@ -219,6 +220,21 @@ STUDY_TEMPLATES = [
 
 ASSIGNMENT_STATUSES = ["invited", "confirmed", "completed", "no_show", "rejected"]
 
+PETS = ["dog", "cat", "fish", "bird"]
+DEVICES = ["ios", "android"]
+
+
+def generate_profile() -> dict:
+    """Custom attributes matched through profile.<key> criteria."""
+    profile = {
+        "pets": random.sample(PETS, k=random.choices([0, 1, 2], weights=[40, 45, 15])[0]),
+        "car_owner": random.random() < 0.7,
+        "household_size": random.randint(1, 6),
+    }
+    if random.random() < 0.9:
+        profile["devices"] = {"phone": random.choice(DEVICES)}
+    return profile
+
 
 def generate_email(first_name: str, last_name: str, index: int) -> str:
     domains = ["gmail.com", "yahoo.com", "outlook.com", "hotmail.com", "icloud.com"]
@@ -300,6 +316,7 @@ async def seed_database():
                 ethnicity=random.choice(ETHNICITIES),
                 household_income=income,
                 occupation=random.choice(OCCUPATIONS),
+                profile=generate_profile(),
                 is_active=random.random() > 0.05,  # 95% active
                 created_at=datetime.utcnow() - timedelta(days=random.randint(1, 365)),
             )
@@ -4,8 +4,10 @@ from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, get_read_db
 from app.config import get_settings
+from app.services.job_service import JobRunner
+from app.services.match_cache import get_match_cache
 
 settings = get_settings()
 
@@ -46,6 +48,12 @@ async def db_session():
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(scope="function")
+def job_runner(db_session):
+    """A job runner on the test database; drive it with run_pending()."""
+    return JobRunner(session_factory=TestAsyncSessionLocal, workers=1)
+
+
 @pytest.fixture(scope="function")
 async def client(db_session):
     """Create a test client with database dependency override."""
@@ -58,6 +66,9 @@ async def client(db_session):
             raise
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    # Study ids restart per test, so cached match pages must not leak across
+    await get_match_cache().clear()
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
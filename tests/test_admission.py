@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from httpx import AsyncClient
+
+from app.admission import AdmissionController, ClassLimit, classify
+from app.main import app
+
+
+def test_classify_routes():
+    """Test which route class each kind of request is limited under."""
+    assert classify("GET", "/api/studies/3/match") == "match"
+    assert classify("POST", "/api/studies/3/select") == "match"
+    assert classify("POST", "/api/studies/3/check") == "match"
+    assert classify("POST", "/api/respondents/batch-get") == "export"
+    assert classify("GET", "/api/respondents/changes") == "export"
+    assert classify("PUT", "/api/respondents/3") == "write"
+    assert classify("GET", "/api/respondents/3") == "read"
+    assert classify("GET", "/health") is None
+
+
+@pytest.mark.asyncio
+async def test_admission_rejects_with_retry_after(client: AsyncClient, monkeypatch):
+    """Test that a saturated class answers 429/503 fast while other classes keep serving."""
+    controller = AdmissionController({
+        "match": ClassLimit(concurrency=1, max_queue=1, queue_timeout=0.1),
+        "read": ClassLimit(concurrency=4, max_queue=4, queue_timeout=1.0),
+    })
+    monkeypatch.setattr(app.state.admission, "limiters", controller.limiters)
+
+    match = controller.limiters["match"]
+    await match.acquire()  # hold the only match slot
+
+    queued = asyncio.create_task(client.get("/api/studies/1/match"))
+    await asyncio.sleep(0.02)
+
+    # Queue is full: immediate 429
+    response = await client.get("/api/studies/1/match")
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+    # The queued request times out: 503
+    response = await queued
+    assert response.status_code == 503
+    assert "retry-after" in response.headers
+
+    # Light reads are unaffected
+    response = await client.get("/api/respondents")
+    assert response.status_code == 200
+
+    match.release()
+    response = await client.get("/api/studies/99999/match")
+    assert response.status_code == 404
+
+    stats = (await client.get("/metrics")).json()["admission"]["match"]
+    assert stats["rejected_queue_full"] == 1
+    assert stats["rejected_timeout"] == 1
+    assert stats["in_flight"] == 0
@@ -0,0 +1,67 @@
+import logging
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app import warmup
+from app.config import Settings, get_settings
+from app.main import create_app
+
+
+def app_settings(**overrides) -> Settings:
+    """Settings for an app started through its lifespan, without background workers."""
+    values = {
+        "run_jobs_in_process": False,
+        "run_webhook_dispatcher_in_process": False,
+        **overrides,
+    }
+    return get_settings().model_copy(update=values)
+
+
+def use_test_database(monkeypatch):
+    """
+    Point the warmup steps at the test database. TestClient runs the app on
+    its own event loop, so the engine is separate from the shared test engine.
+    """
+    engine = create_async_engine(get_settings().test_database_url, pool_size=2)
+    monkeypatch.setattr(warmup, "engine", engine)
+    monkeypatch.setattr(
+        warmup, "AsyncSessionLocal", async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    return engine
+
+
+def test_admin_routes_on_by_default():
+    assert Settings.model_fields["enable_admin_routes"].default is True
+
+
+def test_lifespan_runs_warmup(db_session, monkeypatch, caplog):
+    """Startup warms the pool and statement cache and reports each step."""
+    engine = use_test_database(monkeypatch)
+    app = create_app(app_settings(warmup_on_startup=True, enable_admin_routes=False))
+
+    with caplog.at_level(logging.ERROR, logger="app.main"):
+        with TestClient(app) as client:
+            startup = client.get("/metrics").json()["startup"]
+            assert set(startup["steps"]) == {"pool", "statements", "migrations"}
+            assert startup["total_seconds"] is not None
+
+            assert client.post("/seed").status_code == 404
+            assert "/seed" not in client.get("/openapi.json").json()["paths"]
+
+            client.portal.call(engine.dispose)
+
+    assert not [r for r in caplog.records if r.message.startswith("Startup step")]
+
+
+def test_lifespan_without_warmup():
+    """With warmup off no step runs, and the admin router mounts when enabled."""
+    app = create_app(app_settings(warmup_on_startup=False, enable_admin_routes=True))
+
+    with TestClient(app) as client:
+        startup = client.get("/metrics").json()["startup"]
+        assert startup["steps"] == {}
+        assert startup["total_seconds"] is not None
+
+        assert "/seed" in client.get("/openapi.json").json()["paths"]
+        assert client.get("/health").json() == {"status": "healthy"}
@@ -0,0 +1,64 @@
+import gzip
+import pytest
+from httpx import AsyncClient
+
+from app.compression import choose_encoding
+
+
+def test_choose_encoding():
+    """Test Accept-Encoding negotiation with preferences and q-values."""
+    supported = ["zstd", "br", "gzip"]
+    assert choose_encoding("gzip, deflate", supported) == "gzip"
+    assert choose_encoding("gzip, br", supported) == "br"
+    assert choose_encoding("zstd;q=0, gzip;q=0.5", supported) == "gzip"
+    assert choose_encoding("*", ["gzip"]) == "gzip"
+    assert choose_encoding("identity", supported) is None
+
+
+@pytest.mark.asyncio
+async def test_large_list_is_compressed_and_streamed(client: AsyncClient):
+    """Test that large list pages are gzip-compressed and small responses are not."""
+    for i in range(20):
+        await client.post(
+            "/api/respondents",
+            json={
+                "first_name": f"Zip{i}",
+                "last_name": "Test",
+                "email": f"zip{i}@example.com",
+                "city": "Portland",
+                "state": "OR",
+            },
+        )
+
+    response = await client.get("/api/respondents?limit=100", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    data = response.json()
+    assert len(data["items"]) == 20
+    assert data["total"] == 20
+    assert data["limit"] == 100
+    assert data["items"][0]["email"].startswith("zip")
+
+    raw = b"".join([chunk async for chunk in (await client.send(
+        client.build_request("GET", "/api/respondents?limit=100", headers={"Accept-Encoding": "gzip"}),
+        stream=True,
+    )).aiter_raw()])
+    assert len(raw) < len(response.content)
+    assert gzip.decompress(raw) == response.content
+
+    response = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+    response = await client.get("/api/respondents?limit=100", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert len(response.json()["items"]) == 20
+
+
+@pytest.mark.asyncio
+async def test_small_streamed_response_is_not_compressed(client: AsyncClient):
+    """Test that a streamed page under the size threshold goes out plain."""
+    response = await client.get("/api/respondents?limit=100", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.json()["items"] == []
@@ -0,0 +1,236 @@
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_background_assign_job(client: AsyncClient):
+    """Test queueing a background assignment and cancelling it."""
+    study_response = await client.post(
+        "/api/studies",
+        json={
+            "title": "Background Assign",
+            "client_name": "Client",
+            "methodology": "survey",
+            "target_count": 100,
+        },
+    )
+    study_id = study_response.json()["id"]
+
+    response = await client.post(
+        f"/api/studies/{study_id}/assign/background",
+        json={"respondent_ids": [1, 2, 3]},
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert job["kind"] == "assign_respondents"
+    assert job["status"] == "queued"
+    assert job["total"] == 3
+
+    response = await client.get(f"/api/jobs/{job['id']}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "queued"
+
+    response = await client.post(f"/api/jobs/{job['id']}/cancel")
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_get_job_not_found(client: AsyncClient):
+    """Test 404 for unknown job."""
+    response = await client.get("/api/jobs/99999")
+    assert response.status_code == 404
+
+
+async def _enqueue(db_session, kind: str, params: dict, total=None) -> int:
+    from app.services.job_service import JobService
+
+    job = await JobService(db_session).enqueue(kind, params, total=total)
+    await db_session.commit()
+    return job.id
+
+
+async def _job(db_session, job_id: int):
+    from app.services.job_service import JobService
+
+    return await JobService(db_session).get_by_id(job_id)
+
+
+@pytest.mark.asyncio
+async def test_job_runner_records_outcomes(db_session, job_runner, monkeypatch):
+    """Test running jobs to success, failure, cancellation and progress reports."""
+    from app.models.job import Job
+    from app.services.job_service import JOB_HANDLERS, JobService
+
+    seen_progress = []
+
+    async def progress(ctx, params):
+        for step in range(1, params["steps"] + 1):
+            await ctx.report(step, total=params["steps"])
+            async with ctx.session() as session:
+                seen_progress.append((await session.get(Job, ctx.job_id)).progress)
+        return {"steps": params["steps"]}
+
+    async def fail(ctx, params):
+        await ctx.report(1, total=2)
+        raise RuntimeError("source file is gone")
+
+    async def cancel_midway(ctx, params):
+        await ctx.report(1, total=3)
+        async with ctx.session() as session:
+            await JobService(session).cancel(await session.get(Job, ctx.job_id))
+            await session.commit()
+        await ctx.report(2)
+        return {"finished": True}
+
+    monkeypatch.setitem(JOB_HANDLERS, "test_progress", progress)
+    monkeypatch.setitem(JOB_HANDLERS, "test_fail", fail)
+    monkeypatch.setitem(JOB_HANDLERS, "test_cancel", cancel_midway)
+
+    succeeded = await _enqueue(db_session, "test_progress", {"steps": 3})
+    failed = await _enqueue(db_session, "test_fail", {})
+    cancelled = await _enqueue(db_session, "test_cancel", {})
+    assert await job_runner.run_pending() == 3
+    assert await job_runner.run_pending() == 0
+
+    job = await _job(db_session, succeeded)
+    assert (job.status, job.progress, job.total, job.result) == ("succeeded", 3, 3, {"steps": 3})
+    assert job.started_at is not None and job.finished_at is not None
+    assert seen_progress == [1, 2, 3]
+
+    job = await _job(db_session, failed)
+    assert (job.status, job.progress, job.error) == ("failed", 1, "source file is gone")
+
+    job = await _job(db_session, cancelled)
+    assert (job.status, job.progress, job.result) == ("cancelled", 2, None)
+
+
+@pytest.mark.asyncio
+async def test_job_runner_reclaims_expired_leases(db_session, job_runner, monkeypatch):
+    """Test that a job whose worker died is run again and live leases are renewed."""
+    import asyncio
+    from datetime import datetime, timedelta
+    from sqlalchemy import update
+    from app.models.job import Job
+    from app.services.job_service import JOB_HANDLERS
+
+    leases = []
+
+    async def slow(ctx, params):
+        async with ctx.session() as session:
+            leases.append((await session.get(Job, ctx.job_id)).locked_until)
+        await asyncio.sleep(0.25)
+        async with ctx.session() as session:
+            leases.append((await session.get(Job, ctx.job_id)).locked_until)
+        return {"ran": params["name"]}
+
+    monkeypatch.setitem(JOB_HANDLERS, "test_slow", slow)
+    job_runner.lease_seconds = 0.3
+
+    # Both were claimed by workers that are gone; only one lease has lapsed
+    dead = await _enqueue(db_session, "test_slow", {"name": "dead"})
+    alive = await _enqueue(db_session, "test_slow", {"name": "alive"})
+    now = datetime.utcnow()
+    for job_id, locked_until in ((dead, now - timedelta(seconds=1)), (alive, now + timedelta(hours=1))):
+        await db_session.execute(
+            update(Job).where(Job.id == job_id).values(status="running", locked_until=locked_until)
+        )
+    await db_session.commit()
+
+    assert await job_runner.run_pending() == 1
+    job = await _job(db_session, dead)
+    assert (job.status, job.result, job.locked_until) == ("succeeded", {"ran": "dead"}, None)
+    # Renewed while the handler ran
+    assert leases[1] > leases[0]
+
+    job = await _job(db_session, alive)
+    assert job.status == "running"
+
+
+@pytest.mark.asyncio
+async def test_scheduled_partition_maintenance(db_session, job_runner):
+    """Test that scheduled jobs are enqueued once per interval and create partitions."""
+    from datetime import date
+    from sqlalchemy import func, select
+    from app.models.job import Job
+    from app.services.partition_service import AssignmentPartitionService, month_start
+
+    job_runner.schedule("maintain_partitions", {"months_ahead": 1}, 3600)
+    assert await job_runner.enqueue_due() == 1
+    # Already queued, then run within the interval
+    assert await job_runner.enqueue_due() == 0
+    assert await job_runner.run_pending() == 1
+    assert await job_runner.enqueue_due() == 0
+
+    job = (await db_session.execute(select(Job).where(Job.kind == "maintain_partitions"))).scalar_one()
+    this_month = month_start(date.today())
+    assert job.status == "succeeded"
+    assert job.result == {
+        "created": [
+            f"study_assignments_{this_month:%Y_%m}",
+            f"study_assignments_{month_start(this_month, 1):%Y_%m}",
+        ],
+        "detached": [],
+    }
+    names = [name for name, _, _ in await AssignmentPartitionService(db_session).list_partitions()]
+    assert set(job.result["created"]) <= set(names)
+    assert (await db_session.execute(select(func.count(Job.id)))).scalar() == 1
+
+
+@pytest.mark.asyncio
+async def test_enqueue_wakes_runner_after_commit(db_session, monkeypatch):
+    """Test that idle workers are only woken once the job row is committed."""
+    from app.services import job_service
+
+    calls = []
+    monkeypatch.setattr(job_service.job_runner, "notify", lambda: calls.append(True))
+
+    await job_service.JobService(db_session).enqueue("assign_respondents", {"study_id": 1, "respondent_ids": []})
+    assert calls == []
+    await db_session.rollback()
+    assert calls == []
+
+    await job_service.JobService(db_session).enqueue("assign_respondents", {"study_id": 1, "respondent_ids": []})
+    await db_session.commit()
+    assert calls == [True]
+
+
+@pytest.mark.asyncio
+async def test_background_assign_job_runs(client: AsyncClient, db_session, job_runner):
+    """Test running an assignment job, skipping unknown, inactive and already assigned ids."""
+    respondent_ids = []
+    for i in range(3):
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Job{i}", "last_name": "Test", "email": f"job{i}@example.com"},
+        )
+        respondent_ids.append(resp.json()["id"])
+    await client.delete(f"/api/respondents/{respondent_ids[2]}")
+
+    study = await client.post(
+        "/api/studies",
+        json={"title": "Job Assign", "client_name": "Client", "methodology": "survey", "target_count": 10},
+    )
+    study_id = study.json()["id"]
+    await client.post(f"/api/studies/{study_id}/assign", json={"respondent_ids": [respondent_ids[1]]})
+
+    response = await client.post(
+        f"/api/studies/{study_id}/assign/background",
+        json={"respondent_ids": respondent_ids + [999999, respondent_ids[0]]},
+    )
+    job_id = response.json()["id"]
+    assert await job_runner.run_pending() == 1
+
+    job = (await client.get(f"/api/jobs/{job_id}")).json()
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"created": 1, "skipped": 1, "invalid": [respondent_ids[2], 999999]}
+    assert job["progress"] == job["total"] == 4
+
+    roster = await client.get(f"/api/studies/{study_id}/assignments")
+    assert [a["respondent_id"] for a in roster.json()["items"]] == respondent_ids[:2]
+
+    # A job whose study is gone fails with the reason recorded
+    missing_job = await _enqueue(db_session, "assign_respondents", {"study_id": 999999, "respondent_ids": [1]})
+    assert await job_runner.run_pending() == 1
+    job = await _job(db_session, missing_job)
+    assert (job.status, job.error) == ("failed", "Study 999999 not found")
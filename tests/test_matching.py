@@ -181,3 +181,692 @@ async def test_match_multiple_criteria(client: AsyncClient):
     assert data["items"][0]["age"] == 30
     assert data["items"][0]["state"] == "NY"
     assert data["items"][0]["household_income"] == "75k-100k"
+
+
+@pytest.mark.asyncio
+async def test_match_participation_exclusions(client: AsyncClient, db_session):
+    """Test excluding respondents by prior studies and by client, with and without a window."""
+    respondent_ids = []
+    for i in range(3):
+        resp = await client.post(
+            "/api/respondents",
+            json={
+                "first_name": f"Past{i}",
+                "last_name": "Test",
+                "email": f"past{i}@example.com",
+            },
+        )
+        respondent_ids.append(resp.json()["id"])
+
+    # Two earlier studies, one for the competing client
+    past_ids = []
+    for client_name in ["Other Co", "Rival Co"]:
+        resp = await client.post(
+            "/api/studies",
+            json={
+                "title": f"{client_name} Study",
+                "client_name": client_name,
+                "methodology": "idi",
+                "target_count": 5,
+            },
+        )
+        past_ids.append(resp.json()["id"])
+
+    await client.post(f"/api/studies/{past_ids[0]}/assign", json={"respondent_ids": [respondent_ids[0]]})
+    await client.post(f"/api/studies/{past_ids[1]}/assign", json={"respondent_ids": [respondent_ids[1]]})
+
+    study_response = await client.post(
+        "/api/studies",
+        json={
+            "title": "Exclusion Test",
+            "client_name": "Test",
+            "methodology": "survey",
+            "target_count": 5,
+            "criteria": [
+                {"field_name": "participation", "operator": "not_in_studies", "value": [past_ids[0]]},
+                {
+                    "field_name": "participation",
+                    "operator": "not_with_client",
+                    "value": {"client_name": "Rival Co", "within_days": 180},
+                },
+            ],
+        },
+    )
+    study_id = study_response.json()["id"]
+
+    response = await client.get(f"/api/studies/{study_id}/match")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["items"][0]["id"] == respondent_ids[2]
+
+    # Once the rival study is older than the window only the unwindowed rule excludes
+    from datetime import datetime, timedelta
+    from sqlalchemy import update
+    from app.models.study_assignment import StudyAssignment
+
+    await db_session.execute(
+        update(StudyAssignment)
+        .where(StudyAssignment.study_id == past_ids[1])
+        .values(invited_at=datetime.utcnow() - timedelta(days=400))
+    )
+    await db_session.commit()
+    for value, expected in (
+        ({"client_name": "Rival Co", "within_days": 180}, set(respondent_ids)),
+        ({"client_name": "Rival Co"}, {respondent_ids[0], respondent_ids[2]}),
+    ):
+        study_response = await client.post(
+            "/api/studies",
+            json={
+                "title": "Client Rule",
+                "client_name": "Test",
+                "methodology": "survey",
+                "target_count": 5,
+                "criteria": [{"field_name": "participation", "operator": "not_with_client", "value": value}],
+            },
+        )
+        response = await client.get(f"/api/studies/{study_response.json()['id']}/match")
+        assert {r["id"] for r in response.json()["items"]} == expected, value
+
+
+@pytest.mark.asyncio
+async def test_match_cache_invalidated_on_criteria_change(client: AsyncClient):
+    """Test that repeated matches hit the cache until criteria change."""
+    for i, state in enumerate(["NY", "NY", "CA"]):
+        await client.post(
+            "/api/respondents",
+            json={
+                "first_name": f"Cache{i}",
+                "last_name": "Test",
+                "email": f"cache{i}@example.com",
+                "state": state,
+            },
+        )
+
+    study_response = await client.post(
+        "/api/studies",
+        json={
+            "title": "Cache Test",
+            "client_name": "Test",
+            "methodology": "survey",
+            "target_count": 5,
+            "criteria": [{"field_name": "state", "operator": "eq", "value": "NY"}],
+        },
+    )
+    study_id = study_response.json()["id"]
+
+    response = await client.get(f"/api/studies/{study_id}/match")
+    assert response.json()["total"] == 2
+    hits_before = (await client.get("/metrics")).json()["match_cache"]["hits"]
+
+    response = await client.get(f"/api/studies/{study_id}/match")
+    assert response.json()["total"] == 2
+    hits_after = (await client.get("/metrics")).json()["match_cache"]["hits"]
+    assert hits_after == hits_before + 1
+
+    await client.put(
+        f"/api/studies/{study_id}",
+        json={"criteria": [{"field_name": "state", "operator": "eq", "value": "CA"}]},
+    )
+    response = await client.get(f"/api/studies/{study_id}/match")
+    assert response.json()["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_match_cache_ignores_edits_outside_screening(client: AsyncClient, db_session):
+    """Test that only respondent writes touching screened fields invalidate cached pages."""
+    from sqlalchemy import select
+    from app.models.cache_version import CacheVersion
+    from app.services.match_cache import MatchCacheBackend
+
+    with pytest.raises(TypeError):
+        MatchCacheBackend()
+
+    respondent_ids = []
+    for i in range(2):
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Pool{i}", "last_name": "Test", "email": f"pool{i}@example.com",
+                  "state": "NY", "profile": {"pets": ["dog"]}},
+        )
+        respondent_ids.append(resp.json()["id"])
+    # Creates land on per-respondent shards of the pool counter
+    shards = await db_session.execute(
+        select(CacheVersion.name).where(CacheVersion.name.startswith("respondent_pool:"))
+    )
+    assert len(set(shards.scalars().all())) == 2
+
+    study = await client.post(
+        "/api/studies",
+        json={"title": "Pool", "client_name": "Test", "methodology": "survey", "target_count": 5,
+              "criteria": [{"field_name": "state", "operator": "eq", "value": "NY"}],
+              "criteria_expression": {"op": "and", "children": [
+                  {"field_name": "profile.pets", "operator": "contains", "value": ["dog"]},
+              ]}},
+    )
+    study_id = study.json()["id"]
+
+    async def match_page():
+        hits = (await client.get("/metrics")).json()["match_cache"]["hits"]
+        page = (await client.get(f"/api/studies/{study_id}/match")).json()
+        hit = (await client.get("/metrics")).json()["match_cache"]["hits"] > hits
+        return page, hit
+
+    page, hit = await match_page()
+    assert (page["total"], hit) == (2, False)
+
+    # Names are not screened: the cached page stays, but shows the new name
+    await client.put(f"/api/respondents/{respondent_ids[0]}", json={"first_name": "Renamed"})
+    page, hit = await match_page()
+    assert hit
+    assert "Renamed" in [item["first_name"] for item in page["items"]]
+
+    # state is a criterion and profile.pets is in the expression
+    await client.put(f"/api/respondents/{respondent_ids[0]}", json={"state": "CA"})
+    page, hit = await match_page()
+    assert (page["total"], hit) == (1, False)
+    page, hit = await match_page()
+    assert hit
+    await client.put(f"/api/respondents/{respondent_ids[1]}", json={"profile": {"pets": ["cat"]}})
+    page, hit = await match_page()
+    assert (page["total"], hit) == (0, False)
+
+
+@pytest.mark.asyncio
+async def test_match_materialized_study_matches(client: AsyncClient, db_session):
+    """Test that recruiting studies read from study_matches and stay current."""
+    from app.services.study_match_service import StudyMatchService
+
+    respondent_ids = []
+    for i, state in enumerate(["NY", "NY", "CA"]):
+        resp = await client.post(
+            "/api/respondents",
+            json={
+                "first_name": f"Mat{i}",
+                "last_name": "Test",
+                "email": f"mat{i}@example.com",
+                "state": state,
+            },
+        )
+        respondent_ids.append(resp.json()["id"])
+
+    study_response = await client.post(
+        "/api/studies",
+        json={
+            "title": "Materialized Test",
+            "client_name": "Test",
+            "methodology": "survey",
+            "target_count": 5,
+            "status": "recruiting",
+            "criteria": [{"field_name": "state", "operator": "eq", "value": "NY"}],
+        },
+    )
+    study_id = study_response.json()["id"]
+
+    count = await StudyMatchService(db_session).rebuild_study(study_id)
+    await db_session.commit()
+    assert count == 2
+
+    response = await client.get(f"/api/studies/{study_id}/match")
+    assert response.json()["total"] == 2
+
+    # New matching respondent is added incrementally
+    await client.post(
+        "/api/respondents",
+        json={"first_name": "Mat3", "last_name": "Test", "email": "mat3@example.com", "state": "NY"},
+    )
+    response = await client.get(f"/api/studies/{study_id}/match")
+    assert response.json()["total"] == 3
+
+    # Deactivated respondent is removed
+    await client.delete(f"/api/respondents/{respondent_ids[0]}")
+    response = await client.get(f"/api/studies/{study_id}/match")
+    assert response.json()["total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_materialized_matches_apply_time_windows_live(client: AsyncClient, db_session):
+    """Test that a not_with_client window expires without a rebuild of study_matches."""
+    from datetime import datetime, timedelta
+    from sqlalchemy import update
+    from app.models.study import Study
+    from app.models.study_assignment import StudyAssignment
+    from app.services.matching_service import MatchingService
+    from app.services.study_match_service import StudyMatchService
+
+    respondent_ids = []
+    for i in range(2):
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Window{i}", "last_name": "Test", "email": f"window{i}@example.com"},
+        )
+        respondent_ids.append(resp.json()["id"])
+    rival = await client.post(
+        "/api/studies",
+        json={"title": "Rival", "client_name": "Rival Co", "methodology": "survey", "target_count": 5},
+    )
+    await client.post(f"/api/studies/{rival.json()['id']}/assign", json={"respondent_ids": [respondent_ids[0]]})
+
+    rule = {"field_name": "participation", "operator": "not_with_client",
+            "value": {"client_name": "Rival Co", "within_days": 30}}
+    study = await client.post(
+        "/api/studies",
+        json={"title": "Windowed", "client_name": "Test", "methodology": "survey", "target_count": 5,
+              "status": "recruiting", "criteria": [rule]},
+    )
+    study_id = study.json()["id"]
+    assert await StudyMatchService(db_session).rebuild_study(study_id) == 2
+    await db_session.commit()
+
+    service = MatchingService(db_session)
+    respondents, total = await service.find_matching_respondents(study_id, materialized=True)
+    assert [r.id for r in respondents] == [respondent_ids[1]]
+
+    # The rival session ages out of the window; study_matches is not touched
+    await db_session.execute(
+        update(StudyAssignment)
+        .where(StudyAssignment.respondent_id == respondent_ids[0])
+        .values(invited_at=datetime.utcnow() - timedelta(days=40))
+    )
+    await db_session.commit()
+    respondents, total = await service.find_matching_respondents(study_id, materialized=True)
+    assert total == 2
+    ranked, total = await service.find_ranked_respondents(study_id, materialized=True)
+    assert total == 2
+
+    # A window inside a criteria expression cannot be split out: not materialized
+    await client.put(
+        f"/api/studies/{study_id}",
+        json={"criteria": [], "criteria_expression": {"op": "or", "children": [
+            rule, {"field_name": "state", "operator": "eq", "value": "NY"},
+        ]}},
+    )
+    assert await StudyMatchService(db_session).rebuild_study(study_id) == 0
+    await db_session.commit()
+    study = await db_session.get(Study, study_id, populate_existing=True)
+    assert study.matches_refreshed_at is None
+
+
+@pytest.mark.asyncio
+async def test_match_profile_attributes(client: AsyncClient, db_session):
+    """Test profile.<key> criteria in SQL and in the per-respondent check."""
+    from app.services.matching_service import MatchingService
+
+    profiles = [
+        {"pets": ["dog", "cat"], "car_owner": True, "devices": {"phone": "ios"}, "household_size": 3},
+        {"pets": ["dog"], "car_owner": False, "household_size": 5},
+        {},
+        {"pets": ["fish"], "car_owner": True, "household_size": 1, "scores": [60, 20]},
+    ]
+    respondent_ids = []
+    for i, profile in enumerate(profiles):
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Prof{i}", "last_name": "Test", "email": f"prof{i}@example.com", "profile": profile},
+        )
+        assert resp.status_code == 201
+        assert resp.json()["profile"] == profile
+        respondent_ids.append(resp.json()["id"])
+
+    cases = [
+        (
+            [
+                {"field_name": "profile.pets", "operator": "contains", "value": ["dog"]},
+                {"field_name": "profile.car_owner", "operator": "eq", "value": True},
+            ],
+            [0],
+        ),
+        ([{"field_name": "profile.household_size", "operator": "between", "value": [2, 5]}], [0, 1]),
+        ([{"field_name": "profile.devices.phone", "operator": "in", "value": ["ios", "android"]}], [0]),
+        ([{"field_name": "profile.pets", "operator": "exists", "value": False}], [2]),
+        ([{"field_name": "profile.car_owner", "operator": "neq", "value": True}], [1]),
+        # Array values are unwrapped per element, so these ranges are not a contradiction
+        (
+            [
+                {"field_name": "profile.scores", "operator": "gte", "value": 50},
+                {"field_name": "profile.scores", "operator": "lte", "value": 30},
+            ],
+            [3],
+        ),
+    ]
+    service = MatchingService(db_session)
+    for criteria, expected in cases:
+        study = await client.post(
+            "/api/studies",
+            json={"title": "Profile", "client_name": "Test", "methodology": "survey", "target_count": 5, "criteria": criteria},
+        )
+        study_id = study.json()["id"]
+        response = await client.get(f"/api/studies/{study_id}/match")
+        matched = sorted(r["id"] for r in response.json()["items"])
+        assert matched == [respondent_ids[i] for i in expected], criteria
+
+        checked = [
+            i for i, rid in enumerate(respondent_ids)
+            if await service.check_respondent_matches(rid, study_id)
+        ]
+        assert checked == expected, criteria
+
+    for criterion in (
+        {"field_name": "state", "operator": "contains", "value": "NY"},
+        {"field_name": "profile.bad-key", "operator": "eq", "value": 1},
+    ):
+        response = await client.post(
+            "/api/studies",
+            json={"title": "Bad", "client_name": "Test", "methodology": "survey", "target_count": 5, "criteria": [criterion]},
+        )
+        assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_match_criteria_expression(client: AsyncClient, db_session):
+    """Test AND/OR/NOT criteria trees, contradiction short-circuiting and evaluation order."""
+    from sqlalchemy import event
+    from app.services.criteria_expression import order_children
+    from app.services.matching_service import MatchingService
+
+    people = [(28, "50k-75k", "NY"), (45, "100k-150k", "CA"), (45, "50k-75k", "NY"), (30, "100k-150k", "TX")]
+    respondent_ids = []
+    for i, (age, income, state) in enumerate(people):
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Expr{i}", "last_name": "Test", "email": f"expr{i}@example.com",
+                  "age": age, "household_income": income, "state": state},
+        )
+        respondent_ids.append(resp.json()["id"])
+
+    young_or_rich = {"op": "or", "children": [
+        {"field_name": "age", "operator": "between", "value": [25, 34]},
+        {"field_name": "household_income", "operator": "in", "value": ["100k-150k", "150k+"]},
+    ]}
+    impossible = {"op": "and", "children": [
+        {"field_name": "age", "operator": "between", "value": [50, 60]},
+        {"field_name": "age", "operator": "lte", "value": 30},
+    ]}
+    cases = [
+        ([], young_or_rich, [0, 1, 3]),
+        (
+            [{"field_name": "age", "operator": "gte", "value": 40}],
+            {"op": "not", "children": [{"field_name": "household_income", "operator": "eq", "value": "50k-75k"}]},
+            [1],
+        ),
+        # The impossible branch is pruned; the rest of the OR still matches
+        ([], {"op": "or", "children": [impossible, {"field_name": "state", "operator": "eq", "value": "NY"}]}, [0, 2]),
+        ([{"field_name": "age", "operator": "between", "value": [50, 60]}],
+         {"op": "and", "children": [{"field_name": "age", "operator": "lte", "value": 30}]}, []),
+    ]
+    service = MatchingService(db_session)
+    study_ids = []
+    for criteria, expression, expected in cases:
+        study = await client.post(
+            "/api/studies",
+            json={"title": "Expr", "client_name": "Test", "methodology": "survey", "target_count": 5,
+                  "criteria": criteria, "criteria_expression": expression},
+        )
+        assert study.status_code == 201
+        assert study.json()["criteria_expression"] == expression
+        study_id = study.json()["id"]
+        study_ids.append(study_id)
+
+        response = await client.get(f"/api/studies/{study_id}/match")
+        assert sorted(r["id"] for r in response.json()["items"]) == [respondent_ids[i] for i in expected]
+        checked = [i for i, rid in enumerate(respondent_ids) if await service.check_respondent_matches(rid, study_id)]
+        assert checked == expected
+
+    # A contradictory study never queries respondents
+    statements = []
+    sync_engine = db_session.bind.sync_engine
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        respondents, total = await service.find_matching_respondents(study_ids[-1])
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+    assert (respondents, total) == ([], 0)
+    assert statements  # the criteria lookup
+    assert not any("FROM respondents" in statement for statement in statements)
+
+    # Updating the expression invalidates cached pages
+    response = await client.put(f"/api/studies/{study_ids[0]}", json={"criteria_expression": None})
+    assert response.json()["criteria_expression"] is None
+    response = await client.get(f"/api/studies/{study_ids[0]}/match")
+    assert response.json()["total"] == 4
+
+    # AND tries the most selective branch first, OR the most inclusive
+    eq = {"field_name": "state", "operator": "eq", "value": "NY"}
+    neq = {"field_name": "state", "operator": "neq", "value": "NY"}
+    participation = {"field_name": "participation", "operator": "not_in_studies", "value": [1]}
+    assert order_children({"op": "and", "children": [participation, neq, eq]}) == [eq, neq, participation]
+    assert order_children({"op": "or", "children": [eq, participation, neq]}) == [neq, eq, participation]
+
+    bad = [
+        ({"op": "or", "children": [{"field_name": "favorite_color", "operator": "eq", "value": "red"}]}, 400),
+        ({"op": "not", "children": [eq, neq]}, 422),
+        ({"op": "xor", "children": [eq]}, 422),
+    ]
+    for expression, status in bad:
+        response = await client.post(
+            "/api/studies",
+            json={"title": "Bad", "client_name": "Test", "methodology": "survey", "target_count": 5,
+                  "criteria_expression": expression},
+        )
+        assert response.status_code == status
+
+
+@pytest.mark.asyncio
+async def test_match_ranked_by_score(client: AsyncClient):
+    """Test sort=score ranks by preferred criteria, rest and reliability."""
+    ids = {}
+    for name, state, age in [("Best", "NY", 30), ("Other", "CA", 30), ("Flaky", "NY", 30), ("Old", "NY", 60)]:
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": name, "last_name": "Test", "email": f"{name.lower()}@example.com", "state": state, "age": age},
+        )
+        ids[name] = resp.json()["id"]
+
+    study_response = await client.post(
+        "/api/studies",
+        json={
+            "title": "Ranked Test",
+            "client_name": "Test",
+            "methodology": "idi",
+            "target_count": 5,
+            "criteria": [
+                {"field_name": "age", "operator": "between", "value": [25, 45]},
+                {"field_name": "state", "operator": "eq", "value": "NY", "weight": 2},
+            ],
+        },
+    )
+    study_id = study_response.json()["id"]
+
+    # A no-show elsewhere lowers Flaky's reliability
+    other = await client.post(
+        "/api/studies",
+        json={"title": "Other", "client_name": "Other", "methodology": "idi", "target_count": 5},
+    )
+    other_id = other.json()["id"]
+    assigned = await client.post(f"/api/studies/{other_id}/assign", json={"respondent_ids": [ids["Flaky"]]})
+    await client.patch(f"/api/assignments/{assigned.json()[0]['id']}", json={"status": "no_show"})
+
+    # The preferred criterion scores but does not filter
+    response = await client.get(f"/api/studies/{study_id}/match")
+    assert response.json()["total"] == 3
+
+    response = await client.get(f"/api/studies/{study_id}/match?sort=score")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert [r["id"] for r in data["items"]] == [ids["Best"], ids["Flaky"], ids["Other"]]
+    assert data["items"][0]["score"] == 3.5  # 2 (NY) + 1 (never participated) + 0.5 (prior)
+
+    # A fresh completion uses up Best's rest, and the cached ranking is dropped
+    assigned = await client.post(f"/api/studies/{other_id}/assign", json={"respondent_ids": [ids["Best"]]})
+    await client.patch(f"/api/assignments/{assigned.json()[0]['id']}", json={"status": "completed"})
+    response = await client.get(f"/api/studies/{study_id}/match?sort=score")
+    assert [r["id"] for r in response.json()["items"]] == [ids["Flaky"], ids["Best"], ids["Other"]]
+
+    response = await client.get(f"/api/studies/{study_id}/match?sort=bogus")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_match_random_sample(client: AsyncClient, db_session):
+    """Test sort=random walks the sample_key circle from the seed's start."""
+    from sqlalchemy import select
+    from app.models.respondent import Respondent
+    from app.services.matching_service import sample_start
+
+    for i in range(12):
+        await client.post(
+            "/api/respondents",
+            json={"first_name": f"Rand{i}", "last_name": "Test", "email": f"rand{i}@example.com", "age": 30},
+        )
+    study_response = await client.post(
+        "/api/studies",
+        json={
+            "title": "Random Test",
+            "client_name": "Test",
+            "methodology": "survey",
+            "target_count": 5,
+            "criteria": [{"field_name": "age", "operator": "gte", "value": 18}],
+        },
+    )
+    study_id = study_response.json()["id"]
+
+    result = await db_session.execute(select(Respondent.id, Respondent.sample_key))
+    keys = dict(result.all())
+    start = sample_start(7)
+    expected = sorted(keys, key=lambda rid: (keys[rid] < start, keys[rid]))
+
+    pages = []
+    for offset in (0, 5, 10):
+        response = await client.get(f"/api/studies/{study_id}/match?sort=random&seed=7&limit=5&offset={offset}")
+        data = response.json()
+        assert data["seed"] == 7
+        assert data["total"] == 12
+        pages.extend(r["id"] for r in data["items"])
+    assert pages == expected
+
+    # Without a seed one is generated and returned for the next pages
+    response = await client.get(f"/api/studies/{study_id}/match?sort=random&limit=3")
+    seed = response.json()["seed"]
+    again = await client.get(f"/api/studies/{study_id}/match?sort=random&limit=3&seed={seed}")
+    assert again.json()["items"] == response.json()["items"]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_identical_calls():
+    """Test that concurrent identical computations run once and share the result."""
+    import asyncio
+    from app.services.match_cache import SingleFlight
+
+    flights = SingleFlight()
+    runs = 0
+    release = asyncio.Event()
+
+    async def compute():
+        nonlocal runs
+        runs += 1
+        await release.wait()
+        return {"items": [], "total": runs}
+
+    callers = [asyncio.create_task(flights.do("study:1", compute)) for _ in range(5)]
+    other = asyncio.create_task(flights.do("study:2", compute))
+    await asyncio.sleep(0.01)
+    assert flights.stats()["in_flight"] == 2
+    release.set()
+
+    results = await asyncio.gather(*callers)
+    assert all(result is results[0] for result in results)
+    assert (await other)["total"] == 2
+    assert runs == 2
+    assert flights.stats() == {"leaders": 2, "shared": 4, "in_flight": 0, "shared_rate": 0.6667}
+
+    # A cancelled leader hands over to a waiting caller
+    release.clear()
+    leader = asyncio.create_task(flights.do("study:3", compute))
+    await asyncio.sleep(0.01)
+    follower = asyncio.create_task(flights.do("study:3", compute))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    await asyncio.sleep(0.01)
+    release.set()
+    assert (await follower)["total"] == 4
+
+
+@pytest.mark.asyncio
+async def test_check_eligibility_batch(client: AsyncClient, db_session):
+    """Test checking many respondents against a study in one query, with the failed checks."""
+    from sqlalchemy import event
+
+    people = [(30, "NY", True), (30, "CA", True), (60, "NY", True), (None, "NY", True), (30, "NY", False)]
+    respondent_ids = []
+    for i, (age, state, active) in enumerate(people):
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Check{i}", "last_name": "Test", "email": f"check{i}@example.com",
+                  "age": age, "state": state},
+        )
+        respondent_ids.append(resp.json()["id"])
+        if not active:
+            await client.delete(f"/api/respondents/{resp.json()['id']}")
+
+    study = await client.post(
+        "/api/studies",
+        json={"title": "Check", "client_name": "Test", "methodology": "survey", "target_count": 5,
+              "criteria": [
+                  {"field_name": "age", "operator": "between", "value": [25, 45]},
+                  {"field_name": "state", "operator": "eq", "value": "CA", "weight": 1},
+              ],
+              "criteria_expression": {"op": "not", "children": [
+                  {"field_name": "state", "operator": "eq", "value": "CA"},
+              ]}},
+    )
+    study_id = study.json()["id"]
+    detail = await client.get(f"/api/studies/{study_id}")
+    age_id = next(c["id"] for c in detail.json()["criteria"] if c["field_name"] == "age")
+    await client.post(f"/api/studies/{study_id}/assign", json={"respondent_ids": [respondent_ids[0]]})
+
+    statements = []
+    sync_engine = db_session.bind.sync_engine
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.post(
+            f"/api/studies/{study_id}/check",
+            json={"respondent_ids": respondent_ids + [respondent_ids[1], 999999]},
+        )
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    data = response.json()
+    assert sum("FROM respondents" in statement for statement in statements) == 1
+
+    age = {"check": "criterion", "criterion_id": age_id, "field_name": "age"}
+    expression = {"check": "criteria_expression", "criterion_id": None, "field_name": None}
+    active = {"check": "active", "criterion_id": None, "field_name": None}
+    assert [(r["respondent_id"], r["eligible"], r["failed"]) for r in data["results"]] == [
+        (respondent_ids[0], True, []),
+        (respondent_ids[1], False, [expression]),  # the preferred state criterion never fails
+        (respondent_ids[2], False, [age]),
+        (respondent_ids[3], False, [age]),  # a missing age fails the range
+        (respondent_ids[4], False, [active]),
+    ]
+    assert data["eligible"] == 1
+    assert data["missing"] == [999999]
+
+    response = await client.post(
+        f"/api/studies/{study_id}/check",
+        json={"respondent_ids": respondent_ids[:1], "exclude_assigned": True},
+    )
+    assert response.json()["results"][0]["failed"] == [{"check": "not_assigned", "criterion_id": None, "field_name": None}]
+
+    response = await client.post("/api/studies/999999/check", json={"respondent_ids": [1]})
+    assert response.status_code == 404
+    response = await client.post(f"/api/studies/{study_id}/check", json={"respondent_ids": list(range(10001))})
+    assert response.status_code == 422
@@ -149,3 +149,390 @@ async def test_delete_respondent(client: AsyncClient):
     assert response.status_code == 200
     data = response.json()
     assert data["is_active"] is False
+
+
+@pytest.mark.asyncio
+async def test_respondent_changes_feed(client: AsyncClient):
+    """Test incremental sync through the change feed cursor."""
+    ids = []
+    for i in range(3):
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Feed{i}", "last_name": "Test", "email": f"feed{i}@example.com"},
+        )
+        ids.append(resp.json()["id"])
+
+    response = await client.get("/api/respondents/changes?limit=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert [c["id"] for c in data["changes"]] == ids[:2]
+    assert all(c["op"] == "created" for c in data["changes"])
+    assert data["has_more"] is True
+
+    response = await client.get(f"/api/respondents/changes?since={data['next_cursor']}")
+    data = response.json()
+    assert [c["id"] for c in data["changes"]] == [ids[2]]
+    assert data["has_more"] is False
+    cursor = data["next_cursor"]
+
+    await client.put(f"/api/respondents/{ids[0]}", json={"age": 40})
+    await client.delete(f"/api/respondents/{ids[1]}")
+
+    response = await client.get(f"/api/respondents/changes?since={cursor}")
+    changes = response.json()["changes"]
+    assert [(c["id"], c["op"]) for c in changes] == [(ids[0], "updated"), (ids[1], "deleted")]
+    assert changes[0]["data"]["age"] == 40
+    assert changes[1]["data"] is None
+
+    response = await client.get("/api/respondents/changes?since=not-a-cursor")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_respondent_changes_feed_waits_for_open_transactions(client: AsyncClient):
+    """Test that a write committing after later writes is still delivered, not skipped."""
+    from sqlalchemy import update
+    from app.models.respondent import Respondent
+    from tests.conftest import TestAsyncSessionLocal
+
+    ids = []
+    for i in range(2):
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Late{i}", "last_name": "Test", "email": f"late{i}@example.com"},
+        )
+        ids.append(resp.json()["id"])
+    cursor = (await client.get("/api/respondents/changes")).json()["next_cursor"]
+
+    async with TestAsyncSessionLocal() as slow:
+        # A long-running transaction writes first ...
+        await slow.execute(update(Respondent).where(Respondent.id == ids[0]).values(age=50))
+        # ... and a later one commits before it
+        await client.put(f"/api/respondents/{ids[1]}", json={"age": 30})
+
+        data = (await client.get(f"/api/respondents/changes?since={cursor}")).json()
+        assert data["changes"] == []
+        assert data["next_cursor"] == cursor
+        await slow.commit()
+
+    data = (await client.get(f"/api/respondents/changes?since={cursor}")).json()
+    assert [(c["id"], c["data"]["age"]) for c in data["changes"]] == [(ids[0], 50), (ids[1], 30)]
+
+
+@pytest.mark.asyncio
+async def test_list_respondents_combined_filters(client: AsyncClient):
+    """Test filter combinations served from the prebuilt statement registry."""
+    from app.services.respondent_service import list_statements
+
+    for i, (age, gender) in enumerate([(25, "female"), (35, "female"), (45, "male")]):
+        await client.post(
+            "/api/respondents",
+            json={
+                "first_name": f"Combo{i}",
+                "last_name": "Test",
+                "email": f"combo{i}@example.com",
+                "age": age,
+                "gender": gender,
+            },
+        )
+
+    response = await client.get("/api/respondents?age_min=30&gender=female")
+    data = response.json()
+    assert data["total"] == 1
+    assert data["items"][0]["age"] == 35
+
+    response = await client.get("/api/respondents?age_min=30&age_max=50&limit=1&offset=1")
+    data = response.json()
+    assert data["total"] == 2
+    assert len(data["items"]) == 1
+
+    # Same filter combination reuses the same statements
+    key = frozenset({"is_active", "age_min", "gender"})
+    assert list_statements(key) is list_statements(key)
+
+
+@pytest.mark.asyncio
+async def test_batch_get_respondents(client: AsyncClient):
+    """Test fetching many respondents in one request, in request order."""
+    ids = []
+    for i in range(3):
+        response = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Batch{i}", "last_name": "Test", "email": f"batch{i}@example.com"},
+        )
+        ids.append(response.json()["id"])
+
+    response = await client.post(
+        "/api/respondents/batch-get",
+        json={"ids": [ids[2], 99999, ids[0], ids[2]]},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["id"] for r in data["items"]] == [ids[2], ids[0]]
+    assert data["missing"] == [99999]
+
+    response = await client.post("/api/respondents/batch-get", json={"ids": []})
+    assert response.status_code == 422
+    response = await client.post("/api/respondents/batch-get", json={"ids": list(range(1001))})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_respondent_history(client: AsyncClient, db_session):
+    """Test participation history paging and the maintained stats row."""
+    resp = await client.post(
+        "/api/respondents",
+        json={"first_name": "History", "last_name": "Test", "email": "history@example.com"},
+    )
+    respondent_id = resp.json()["id"]
+
+    response = await client.get(f"/api/respondents/{respondent_id}/assignments")
+    assert response.status_code == 200
+    assert response.json()["stats"]["total_invites"] == 0
+
+    assignment_ids = []
+    for i in range(3):
+        study = await client.post(
+            "/api/studies",
+            json={"title": f"History {i}", "client_name": "Client", "methodology": "idi", "target_count": 5},
+        )
+        assigned = await client.post(
+            f"/api/studies/{study.json()['id']}/assign",
+            json={"respondent_ids": [respondent_id]},
+        )
+        assignment_ids.append(assigned.json()[0]["id"])
+
+    await client.patch(f"/api/assignments/{assignment_ids[0]}", json={"status": "completed"})
+    await client.patch(f"/api/assignments/{assignment_ids[1]}", json={"status": "no_show"})
+
+    response = await client.get(f"/api/respondents/{respondent_id}/assignments?limit=2")
+    data = response.json()
+    assert [a["id"] for a in data["items"]] == [assignment_ids[2], assignment_ids[1]]
+    assert data["items"][0]["study"]["title"] == "History 2"
+    assert data["stats"]["total_invites"] == 3
+    assert data["stats"]["completions"] == 1
+    assert data["stats"]["no_shows"] == 1
+    assert data["stats"]["no_show_rate"] == 0.5
+    assert data["stats"]["last_participation_at"] is not None
+
+    response = await client.get(
+        f"/api/respondents/{respondent_id}/assignments?limit=2&cursor={data['next_cursor']}"
+    )
+    data = response.json()
+    assert [a["id"] for a in data["items"]] == [assignment_ids[0]]
+    assert data["next_cursor"] is None
+
+    # Moving out of no_show decrements the counter
+    await client.patch(f"/api/assignments/{assignment_ids[1]}", json={"status": "confirmed"})
+    response = await client.get(f"/api/respondents/{respondent_id}/assignments")
+    assert response.json()["stats"]["no_shows"] == 0
+
+    # Reverting the latest completion falls back to the previous one
+    await client.patch(f"/api/assignments/{assignment_ids[2]}", json={"status": "completed"})
+    first = (await client.get(f"/api/assignments/{assignment_ids[0]}")).json()["completed_at"]
+    latest = (await client.get(f"/api/assignments/{assignment_ids[2]}")).json()["completed_at"]
+    response = await client.get(f"/api/respondents/{respondent_id}/assignments")
+    assert response.json()["stats"]["last_participation_at"] == latest
+
+    await client.patch(f"/api/assignments/{assignment_ids[2]}", json={"status": "confirmed"})
+    stats = (await client.get(f"/api/respondents/{respondent_id}/assignments")).json()["stats"]
+    assert stats["completions"] == 1
+    assert stats["last_participation_at"] == first
+
+    await client.patch(f"/api/assignments/{assignment_ids[0]}", json={"status": "no_show"})
+    stats = (await client.get(f"/api/respondents/{respondent_id}/assignments")).json()["stats"]
+    assert stats["completions"] == 0
+    assert stats["last_participation_at"] is None
+
+    # Deleting assignments outside the services is repaired by a rebuild
+    from sqlalchemy import delete
+    from app.models.study_assignment import StudyAssignment
+    from app.services.respondent_stats_service import RespondentStatsService
+
+    await db_session.execute(delete(StudyAssignment).where(StudyAssignment.respondent_id == respondent_id))
+    await RespondentStatsService(db_session).rebuild([respondent_id])
+    await db_session.commit()
+    stats = (await client.get(f"/api/respondents/{respondent_id}/assignments")).json()["stats"]
+    assert stats["total_invites"] == 0
+    assert stats["no_shows"] == 0
+
+    response = await client.get("/api/respondents/99999/assignments")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_archive_and_restore_respondent(client: AsyncClient, db_session):
+    """Test archiving long-inactive respondents and restoring them on reactivation."""
+    from datetime import datetime, timedelta
+    from sqlalchemy import update
+    from app.models.respondent import Respondent
+    from app.services.respondent_archive_service import RespondentArchiveService
+
+    ids = []
+    for i in range(2):
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Cold{i}", "last_name": "Test", "email": f"cold{i}@example.com", "state": "OR"},
+        )
+        ids.append(resp.json()["id"])
+        await client.delete(f"/api/respondents/{ids[-1]}")
+
+    # Only the second has been in an assignment
+    study = await client.post(
+        "/api/studies",
+        json={"title": "Cold", "client_name": "Client", "methodology": "idi", "target_count": 5},
+    )
+    await client.post(f"/api/studies/{study.json()['id']}/assign", json={"respondent_ids": [ids[1]]})
+
+    await db_session.execute(
+        update(Respondent)
+        .where(Respondent.id.in_(ids))
+        .values(updated_at=datetime.utcnow() - timedelta(days=400))
+    )
+    archived = await RespondentArchiveService(db_session).archive_inactive(365)
+    await db_session.commit()
+    assert archived == 1
+
+    # Archived rows stay readable but refuse writes other than a restore
+    response = await client.get(f"/api/respondents/{ids[0]}")
+    assert response.status_code == 200
+    assert response.json()["archived_at"] is not None
+    assert response.json()["is_active"] is False
+    response = await client.put(f"/api/respondents/{ids[0]}", json={"city": "Salem"})
+    assert response.status_code == 409
+
+    # The respondent with an assignment is skipped and stays live
+    response = await client.get(f"/api/respondents/{ids[1]}")
+    assert response.status_code == 200
+    assert response.json()["archived_at"] is None
+
+    response = await client.post(
+        "/api/respondents",
+        json={"first_name": "Dup", "last_name": "Test", "email": "cold0@example.com"},
+    )
+    assert response.status_code == 400
+
+    response = await client.put(f"/api/respondents/{ids[0]}", json={"is_active": True})
+    assert response.status_code == 200
+    assert response.json()["is_active"] is True
+    assert response.json()["email"] == "cold0@example.com"
+
+    response = await client.get("/api/respondents?state=OR")
+    assert [r["id"] for r in response.json()["items"]] == [ids[0]]
+
+    response = await client.get("/api/respondents?state=OR&is_active=false")
+    assert [r["id"] for r in response.json()["items"]] == [ids[1]]
+
+
+@pytest.mark.asyncio
+async def test_write_paths_keep_error_contract(client: AsyncClient):
+    """Test the single-statement writes still answer 400 and 404 as before."""
+    ids = []
+    for i in range(2):
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Write{i}", "last_name": "Test", "email": f"write{i}@example.com"},
+        )
+        ids.append(resp.json()["id"])
+
+    response = await client.put(f"/api/respondents/{ids[0]}", json={"email": "write1@example.com"})
+    assert response.status_code == 400
+    response = await client.put(f"/api/respondents/{ids[0]}", json={"email": "write0@example.com"})
+    assert response.status_code == 200
+    response = await client.put("/api/respondents/99999", json={"age": 40})
+    assert response.status_code == 404
+    response = await client.delete("/api/respondents/99999")
+    assert response.status_code == 404
+
+    study = await client.post(
+        "/api/studies",
+        json={"title": "Writes", "client_name": "Client", "methodology": "idi", "target_count": 5},
+    )
+    assigned = await client.post(f"/api/studies/{study.json()['id']}/assign", json={"respondent_ids": ids})
+    assignment_id = assigned.json()[0]["id"]
+
+    response = await client.patch(f"/api/assignments/{assignment_id}", json={"status": "completed", "notes": "done"})
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["notes"] == "done"
+    assert data["completed_at"] is not None
+    assert data["confirmed_at"] is not None
+
+    # Re-sending the same status leaves the transition timestamps alone
+    response = await client.patch(f"/api/assignments/{assignment_id}", json={"status": "completed"})
+    assert response.json()["completed_at"] == data["completed_at"]
+    assert response.json()["notes"] == "done"
+
+    response = await client.patch("/api/assignments/99999", json={"status": "confirmed"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_duplicate_detection(client: AsyncClient, db_session):
+    """Test blocking-key duplicate detection, clustering and review."""
+    from app.services.duplicate_service import DuplicateService
+
+    people = [
+        {"first_name": "Maria", "last_name": "Lopez", "email": "maria.lopez@example.com",
+         "phone": "(503) 555-0101", "zip_code": "97201", "age": 34, "city": "Portland"},
+        {"first_name": "Marla", "last_name": "Lopez", "email": "marialopez+panel@example.org",
+         "phone": "503.555.0101", "zip_code": "97201-1234", "age": 35, "city": "portland"},
+        {"first_name": "M", "last_name": "Lopez", "email": "mlopez@example.net",
+         "phone": "+1 503 555 0101", "zip_code": "97201", "age": 34},
+        # Same last name and ZIP, otherwise a different person
+        {"first_name": "Carlos", "last_name": "Lopez", "email": "carlos@example.com",
+         "phone": "971-555-0199", "zip_code": "97201", "age": 61, "city": "Portland"},
+        {"first_name": "Ann", "last_name": "Smith", "email": "ann@example.com", "phone": "212-555-0000"},
+    ]
+    ids = []
+    for person in people:
+        response = await client.post("/api/respondents", json=person)
+        assert response.status_code == 201
+        ids.append(response.json()["id"])
+
+    service = DuplicateService(db_session)
+    await service.refresh_block_keys()
+    stored = await service.score_respondents(ids, lower_only=True)
+    await db_session.commit()
+    assert stored == 3
+
+    response = await client.get("/api/respondents/duplicates")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    cluster = data["items"][0]
+    assert [r["id"] for r in cluster["respondents"]] == ids[:3]
+    strongest = cluster["pairs"][0]
+    assert (strongest["respondent_id"], strongest["duplicate_id"]) == (ids[0], ids[1])
+    assert {"phone", "email_local", "last_name"} <= set(strongest["reasons"])
+
+    # Review in either id order; dismissed pairs survive a rescan
+    response = await client.patch(
+        f"/api/respondents/duplicates/{ids[2]}/{ids[0]}", json={"status": "dismissed"}
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "dismissed"
+    await service.score_respondents([ids[0]])
+    await db_session.commit()
+    response = await client.get("/api/respondents/duplicates?status=dismissed")
+    assert response.json()["total"] == 1
+
+    # Once the second record changes it no longer shares a block with anyone
+    await client.put(
+        f"/api/respondents/{ids[1]}",
+        json={"phone": "646-555-0177", "email": "someone.else@example.org", "last_name": "Reyes"},
+    )
+    await service.refresh_block_keys([ids[1]])
+    await service.score_respondents([ids[1]])
+    await db_session.commit()
+    response = await client.get("/api/respondents/duplicates")
+    assert response.json()["total"] == 0
+
+    response = await client.patch(
+        f"/api/respondents/duplicates/{ids[3]}/{ids[4]}", json={"status": "confirmed"}
+    )
+    assert response.status_code == 404
+
+    response = await client.post("/api/respondents/duplicates/scan", json={"full": True})
+    assert response.status_code == 202
+    assert response.json()["kind"] == "detect_duplicates"
@@ -25,6 +25,49 @@ async def test_create_study(client: AsyncClient):
     assert data["status"] == "draft"
 
 
+@pytest.mark.asyncio
+async def test_create_study_rejects_bad_participation_criteria(client: AsyncClient):
+    """Test that malformed or misplaced participation rules are rejected with 422."""
+    bad_criteria = [
+        {"field_name": "participation", "operator": "not_in_studies", "value": ["abc"]},
+        {"field_name": "participation", "operator": "not_in_studies", "value": []},
+        {"field_name": "participation", "operator": "not_in_studies", "value": 12},
+        {"field_name": "participation", "operator": "not_with_client",
+         "value": {"client_name": "Nike", "within_days": "abc"}},
+        {"field_name": "participation", "operator": "not_with_client",
+         "value": {"client_name": "Nike", "within_days": 0}},
+        {"field_name": "participation", "operator": "not_with_client", "value": {"within_days": 30}},
+        {"field_name": "participation", "operator": "not_with_client",
+         "value": {"client_name": "Nike", "since": "2020"}},
+        {"field_name": "participation", "operator": "not_with_client", "value": "Nike"},
+        {"field_name": "participation", "operator": "eq", "value": 3},
+        {"field_name": "age", "operator": "not_in_studies", "value": [1]},
+        {"field_name": "state", "operator": "not_with_client",
+         "value": {"client_name": "Nike", "within_days": 30}},
+    ]
+    study = {"title": "Bad Rules", "client_name": "Test", "methodology": "survey", "target_count": 5}
+    for criterion in bad_criteria:
+        response = await client.post("/api/studies", json={**study, "criteria": [criterion]})
+        assert response.status_code == 422, criterion
+        # The same rules are checked inside criteria expressions
+        response = await client.post(
+            "/api/studies", json={**study, "criteria_expression": {"op": "and", "children": [criterion]}}
+        )
+        assert response.status_code == 422, criterion
+
+    response = await client.post(
+        "/api/studies",
+        json={**study, "criteria": [
+            {"field_name": "participation", "operator": "not_in_studies", "value": [1, 2]},
+            {"field_name": "participation", "operator": "not_with_client",
+             "value": {"client_name": "Nike", "within_days": 180}},
+            {"field_name": "participation", "operator": "not_with_client",
+             "value": {"client_name": "Adidas"}},
+        ]},
+    )
+    assert response.status_code == 201
+
+
 @pytest.mark.asyncio
 async def test_list_studies(client: AsyncClient):
     """Test listing studies with filters."""
@@ -148,3 +191,245 @@ async def test_assign_respondents(client: AsyncClient):
     data = response.json()
     assert len(data) == 2
     assert all(a["status"] == "invited" for a in data)
+
+
+@pytest.mark.asyncio
+async def test_batch_get_studies(client: AsyncClient):
+    """Test fetching many studies with criteria and assignment counts in one request."""
+    study_ids = []
+    for i in range(2):
+        response = await client.post(
+            "/api/studies",
+            json={
+                "title": f"Batch Study {i}",
+                "client_name": "Client",
+                "methodology": "idi",
+                "target_count": 5,
+                "criteria": [{"field_name": "age", "operator": "gte", "value": 20 + i}],
+            },
+        )
+        study_ids.append(response.json()["id"])
+
+    resp = await client.post(
+        "/api/respondents",
+        json={"first_name": "Batch", "last_name": "Roster", "email": "batchroster@example.com"},
+    )
+    await client.post(
+        f"/api/studies/{study_ids[1]}/assign",
+        json={"respondent_ids": [resp.json()["id"]]},
+    )
+
+    response = await client.post(
+        "/api/studies/batch-get",
+        json={"ids": [study_ids[1], study_ids[0], 99999]},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [s["id"] for s in data["items"]] == [study_ids[1], study_ids[0]]
+    assert data["missing"] == [99999]
+    assert data["items"][0]["criteria"][0]["value"] == 21
+    assert data["items"][0]["assignment_counts"]["invited"] == 1
+    assert data["items"][1]["assignment_counts"]["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_study_roster(client: AsyncClient):
+    """Test the keyset-paged study roster with respondent details."""
+    study_response = await client.post(
+        "/api/studies",
+        json={"title": "Roster", "client_name": "Client", "methodology": "idi", "target_count": 5},
+    )
+    study_id = study_response.json()["id"]
+
+    respondent_ids = []
+    for i in range(3):
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Roster{i}", "last_name": "Test", "email": f"roster{i}@example.com"},
+        )
+        respondent_ids.append(resp.json()["id"])
+    assign_response = await client.post(
+        f"/api/studies/{study_id}/assign", json={"respondent_ids": respondent_ids}
+    )
+    await client.patch(
+        f"/api/assignments/{assign_response.json()[0]['id']}", json={"status": "confirmed"}
+    )
+
+    response = await client.get(f"/api/studies/{study_id}/assignments?limit=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert [a["respondent"]["first_name"] for a in data["items"]] == ["Roster0", "Roster1"]
+    assert data["next_cursor"] == respondent_ids[1]
+
+    response = await client.get(
+        f"/api/studies/{study_id}/assignments?limit=2&cursor={data['next_cursor']}"
+    )
+    data = response.json()
+    assert [a["respondent_id"] for a in data["items"]] == [respondent_ids[2]]
+    assert data["next_cursor"] is None
+
+    response = await client.get(f"/api/studies/{study_id}/assignments?status=confirmed")
+    assert [a["respondent_id"] for a in response.json()["items"]] == [respondent_ids[0]]
+
+    response = await client.get("/api/studies/99999/assignments")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_assignment_partitions(client: AsyncClient, db_session):
+    """Test uniqueness across partitions and monthly partition maintenance."""
+    from datetime import date, datetime
+    from sqlalchemy import select, text
+    from sqlalchemy.exc import IntegrityError
+    from app.models.study_assignment import StudyAssignment
+    from app.services.partition_service import AssignmentPartitionService, month_start
+
+    study = await client.post(
+        "/api/studies",
+        json={"title": "Partitions", "client_name": "Client", "methodology": "idi", "target_count": 5},
+    )
+    study_id = study.json()["id"]
+    resp = await client.post(
+        "/api/respondents",
+        json={"first_name": "Part", "last_name": "Test", "email": "part@example.com"},
+    )
+    respondent_id = resp.json()["id"]
+    await client.post(f"/api/studies/{study_id}/assign", json={"respondent_ids": [respondent_id]})
+
+    # Rows sitting in the default partition move into the new monthly one
+    service = AssignmentPartitionService(db_session)
+    created = await service.ensure_partitions(months_ahead=1)
+    await db_session.commit()
+    this_month = month_start(date.today())
+    assert created == [
+        f"study_assignments_{this_month:%Y_%m}",
+        f"study_assignments_{month_start(this_month, 1):%Y_%m}",
+    ]
+    located = await db_session.execute(text(
+        "SELECT tableoid::regclass::text FROM study_assignments"
+    ))
+    assert located.scalar() == created[0]
+
+    # The same pair in a different month's partition still conflicts
+    db_session.add(StudyAssignment(
+        study_id=study_id,
+        respondent_id=respondent_id,
+        invited_at=datetime(2020, 1, 15),
+    ))
+    with pytest.raises(IntegrityError):
+        await db_session.flush()
+    await db_session.rollback()
+
+    # Detaching hides the rows from the live table but keeps their history
+    detached = await service.detach_before(month_start(this_month, 1))
+    await db_session.commit()
+    assert detached == [created[0]]
+    result = await db_session.execute(select(StudyAssignment.id))
+    assert result.scalars().all() == []
+    await db_session.execute(text(f"DROP TABLE archive.{created[0]}"))
+    await db_session.commit()
+
+    # The pair stays taken
+    response = await client.post(
+        f"/api/studies/{study_id}/assign", json={"respondent_ids": [respondent_id]}
+    )
+    assert response.status_code == 201
+    assert response.json() == []
+
+    # Participation rules still exclude the archived participant
+    for operator, value in (
+        ("not_in_studies", [study_id]),
+        ("not_with_client", {"client_name": "Client", "within_days": 30}),
+    ):
+        other = await client.post(
+            "/api/studies",
+            json={"title": "Follow-up", "client_name": "Other", "methodology": "idi", "target_count": 5,
+                  "criteria": [{"field_name": "participation", "operator": operator, "value": value}]},
+        )
+        response = await client.get(f"/api/studies/{other.json()['id']}/match")
+        assert response.json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_quota_selection(client: AsyncClient):
+    """Test picking a quota-balanced sample across interlocking strata."""
+    people = (
+        [("female", 25)] * 4 + [("female", 50)] * 4
+        + [("male", 25)] * 4 + [("male", 50)] * 1  # one stratum short
+        + [("other", 30)] * 3  # outside every gender bucket
+    )
+    ids = {}
+    for i, (gender, age) in enumerate(people):
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Quota{i}", "last_name": "Test", "email": f"quota{i}@example.com", "gender": gender, "age": age},
+        )
+        ids[resp.json()["id"]] = (gender, age)
+
+    study_response = await client.post(
+        "/api/studies",
+        json={
+            "title": "Quota Test",
+            "client_name": "Test",
+            "methodology": "survey",
+            "target_count": 8,
+            "criteria": [{"field_name": "age", "operator": "gte", "value": 18}],
+            "quotas": [
+                {"field_name": "gender", "buckets": [
+                    {"label": "female", "operator": "eq", "value": "female", "share": 0.5},
+                    {"label": "male", "operator": "eq", "value": "male", "share": 0.5},
+                ]},
+                {"field_name": "age", "buckets": [
+                    {"label": "18-34", "operator": "between", "value": [18, 34], "share": 0.5},
+                    {"label": "35+", "operator": "gte", "value": 35, "share": 0.5},
+                ]},
+            ],
+        },
+    )
+    study_id = study_response.json()["id"]
+
+    response = await client.get(f"/api/studies/{study_id}")
+    assert len(response.json()["quotas"]) == 2
+
+    response = await client.post(f"/api/studies/{study_id}/select", json={})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["size"] == 8
+    assert len(data["respondent_ids"]) == 7
+    assert data["shortfall"] == 1
+    strata = {(s["buckets"]["gender"], s["buckets"]["age"]): (s["target"], s["selected"]) for s in data["strata"]}
+    assert strata == {
+        ("female", "18-34"): (2, 2),
+        ("female", "35+"): (2, 2),
+        ("male", "18-34"): (2, 2),
+        ("male", "35+"): (2, 1),
+    }
+    assert all(ids[rid][0] != "other" for rid in data["respondent_ids"])
+
+    # A seeded random order inside strata is reproducible
+    first = await client.post(f"/api/studies/{study_id}/select", json={"sort": "random", "seed": 3})
+    second = await client.post(f"/api/studies/{study_id}/select", json={"sort": "random", "seed": 3})
+    assert first.json()["respondent_ids"] == second.json()["respondent_ids"]
+    assert first.json()["strata"] == data["strata"]
+
+    # Queue the selection for assignment
+    response = await client.post(f"/api/studies/{study_id}/select", json={"size": 4, "assign": True, "sort": "score"})
+    data = response.json()
+    assert len(data["respondent_ids"]) == 4
+    job = await client.get(f"/api/jobs/{data['job_id']}")
+    assert job.json()["kind"] == "assign_respondents"
+    assert job.json()["total"] == 4
+
+    # Shares must add up to 1
+    response = await client.put(
+        f"/api/studies/{study_id}",
+        json={"quotas": [{"field_name": "gender", "buckets": [
+            {"label": "female", "operator": "eq", "value": "female", "share": 0.7},
+        ]}]},
+    )
+    assert response.status_code == 422
+
+    response = await client.put(f"/api/studies/{study_id}", json={"quotas": []})
+    assert response.status_code == 200
+    response = await client.post(f"/api/studies/{study_id}/select", json={})
+    assert response.status_code == 400
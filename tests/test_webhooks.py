@@ -0,0 +1,74 @@
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import get_settings
+from app.models.outbox_event import OutboxEvent
+from app.services.webhook_service import WebhookDispatcher
+
+
+async def _assign_two(client: AsyncClient) -> int:
+    study_response = await client.post(
+        "/api/studies",
+        json={"title": "Webhook Test", "client_name": "Client", "methodology": "idi", "target_count": 5},
+    )
+    study_id = study_response.json()["id"]
+    respondent_ids = []
+    for i in range(2):
+        resp = await client.post(
+            "/api/respondents",
+            json={"first_name": f"Hook{i}", "last_name": "Test", "email": f"hook{i}@example.com"},
+        )
+        respondent_ids.append(resp.json()["id"])
+    await client.post(f"/api/studies/{study_id}/assign", json={"respondent_ids": respondent_ids})
+    return study_id
+
+
+@pytest.mark.asyncio
+async def test_webhook_batches_delivered(client: AsyncClient, db_session, monkeypatch):
+    """Test that assignment events are batched per endpoint and delivered."""
+    monkeypatch.setattr(get_settings(), "webhook_endpoints", ["http://stub/a", "http://stub/b"])
+    await _assign_two(client)
+
+    received = []
+
+    def stub(request: httpx.Request) -> httpx.Response:
+        received.append((str(request.url), request.read()))
+        return httpx.Response(200)
+
+    dispatcher = WebhookDispatcher(
+        session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+        transport=httpx.MockTransport(stub),
+    )
+    assert await dispatcher.dispatch_once() == 4
+    assert sorted(url for url, _ in received) == ["http://stub/a", "http://stub/b"]
+    assert b"assignment.created" in received[0][1]
+
+    result = await db_session.execute(
+        select(OutboxEvent.status).execution_options(populate_existing=True)
+    )
+    assert set(result.scalars().all()) == {"delivered"}
+
+
+@pytest.mark.asyncio
+async def test_webhook_failure_backs_off(client: AsyncClient, db_session, monkeypatch):
+    """Test that failed deliveries are retried later, not immediately."""
+    monkeypatch.setattr(get_settings(), "webhook_endpoints", ["http://stub/down"])
+    await _assign_two(client)
+
+    dispatcher = WebhookDispatcher(
+        session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+        transport=httpx.MockTransport(lambda request: httpx.Response(503)),
+    )
+    assert await dispatcher.dispatch_once() == 2
+    # Nothing is due until the backoff expires
+    assert await dispatcher.dispatch_once() == 0
+
+    result = await db_session.execute(
+        select(OutboxEvent).execution_options(populate_existing=True)
+    )
+    events = list(result.scalars().all())
+    assert all(e.status == "pending" and e.attempts == 1 for e in events)
+    assert all(e.last_error for e in events)